@@ -1,8 +1,23 @@
 from .action import Action
+from .budget import DecisionBudget
+from .cost import Cost
 from .devcard import DevCard
 from .devcardpile import DevCardPile
+from .gameresult import GameResult
 from .gamestats import GameStats
 from .port import Port
 from .tile import Tile
+from .zobrist import Zobrist
 
-__all__ = ["Action", "DevCard", "DevCardPile", "GameStats", "Port", "Tile"]
+__all__ = [
+    "Action",
+    "DecisionBudget",
+    "Cost",
+    "DevCard",
+    "DevCardPile",
+    "GameResult",
+    "GameStats",
+    "Port",
+    "Tile",
+    "Zobrist",
+]
@@ -16,6 +16,11 @@ class Action:
     GET_DEV_CARD = 14
     SETTLE_INIT = 15
     BUILD_ROAD_INIT = 16
+    # later parts of a factored action, see `Player.factored`
+    DEV_ROAD_STEP = 17
+    PLENTY_STEP = 18
+    TRADE_STEP = 19
+    STEPS = (DEV_ROAD_STEP, PLENTY_STEP, TRADE_STEP)
 
     def __init__(self, action: int, **params):
         self.action = action
@@ -40,6 +45,9 @@ class Action:
             14: "Get dev card",
             15: "Initial settlement",
             16: "Initial road",
+            17: "Second dev road",
+            18: "Second year of plenty resource",
+            19: "Trade for",
         }
         return h[self.action]
 
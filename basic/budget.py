@@ -0,0 +1,116 @@
+import signal
+import threading
+import time
+
+import numpy as np
+
+
+class BudgetExceeded(BaseException):
+    # not an Exception, so a strategy's own error handling cannot swallow it
+    pass
+
+
+# latency histogram bucket edges in seconds, each about 5% above the last
+LATENCY_EDGES = np.geomspace(1e-7, 1e3, 461)
+
+
+def _raise_budget_exceeded(signum, frame):
+    raise BudgetExceeded()
+
+
+class DecisionBudget:
+    """
+    Times every decision a game asks of its players and enforces per-call and per-game
+    limits in seconds, None for no limit. On the main thread a call over budget is cut
+    off with a timer signal, elsewhere its answer is thrown away once it returns. Either
+    way the game carries on with the default decision. Latencies are kept as a fixed
+    histogram per seat, so long runs take constant memory.
+    """
+
+    def __init__(
+        self,
+        num_players: int,
+        per_call: float | None = None,
+        per_game: float | None = None,
+    ) -> None:
+        self.per_call = per_call
+        self.per_game = per_game
+        # one extra bucket on each end for latencies outside the edges
+        self.histograms = np.zeros((num_players, len(LATENCY_EDGES) + 1), np.int64)
+        self.spent = [0.0] * num_players
+        self.overruns = [0] * num_players
+        # decisions cut off mid-way, which may leave the strategy's own state half-written
+        self.interrupts = [0] * num_players
+
+    def limit(self, seat: int) -> float | None:
+        limits = [self.per_call] if self.per_call is not None else []
+        if self.per_game is not None:
+            limits.append(self.per_game - self.spent[seat])
+        return min(limits) if limits else None
+
+    def call(self, seat: int, default, decide, *args):
+        """`decide(*args)` within the seat's budget, else `default()`"""
+        limit = self.limit(seat)
+        if limit is not None and limit <= 0:
+            # the seat used up its game budget, every decision from here is the default
+            self.overruns[seat] += 1
+            return default()
+        interrupt = limit is not None and (
+            threading.current_thread() is threading.main_thread()
+            and hasattr(signal, "setitimer")
+        )
+        start = time.perf_counter()
+        timed_out = False
+        if interrupt:
+            previous = signal.signal(signal.SIGALRM, _raise_budget_exceeded)
+        try:
+            try:
+                if interrupt:
+                    signal.setitimer(signal.ITIMER_REAL, limit)
+                decision = decide(*args)
+            finally:
+                # still guarded, the timer can go off right as the decision returns
+                if interrupt:
+                    signal.setitimer(signal.ITIMER_REAL, 0)
+        except BudgetExceeded:
+            timed_out = True
+        finally:
+            if interrupt:
+                signal.signal(signal.SIGALRM, previous)
+        elapsed = time.perf_counter() - start
+        self.histograms[seat, np.searchsorted(LATENCY_EDGES, elapsed)] += 1
+        self.spent[seat] += elapsed
+        if timed_out:
+            self.interrupts[seat] += 1
+        if timed_out or (limit is not None and elapsed > limit):
+            self.overruns[seat] += 1
+            return default()
+        return decision
+
+    @staticmethod
+    def percentile(histogram: np.ndarray, q: float) -> float:
+        """Geometric middle of the bucket holding the `q`th percentile, within about 2.5%"""
+        calls = histogram.sum()
+        if not calls:
+            return 0.0
+        bucket = int(np.searchsorted(histogram.cumsum(), q / 100 * calls))
+        low = LATENCY_EDGES[max(bucket - 1, 0)]
+        high = LATENCY_EDGES[min(bucket, len(LATENCY_EDGES) - 1)]
+        return float(np.sqrt(low * high))
+
+    def report(self, strategies: list[str]) -> dict[str, dict[str, float]]:
+        """Latency percentiles in seconds and overrun counts, pooled by strategy name"""
+        pooled: dict[str, np.ndarray] = {}
+        overruns: dict[str, int] = {}
+        for seat, name in enumerate(strategies):
+            pooled[name] = pooled.get(name, 0) + self.histograms[seat]
+            overruns[name] = overruns.get(name, 0) + self.overruns[seat]
+        report = {}
+        for name, histogram in pooled.items():
+            report[name] = {
+                "calls": int(histogram.sum()),
+                "p50": self.percentile(histogram, 50),
+                "p99": self.percentile(histogram, 99),
+                "overruns": overruns[name],
+            }
+        return report
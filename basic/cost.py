@@ -0,0 +1,25 @@
+import numpy as np
+
+
+class Cost:
+    ROAD = 0
+    SETTLEMENT = 1
+    CITY = 2
+    DEV_CARD = 3
+
+    # Resource cost of each build, columns are Wheat, Tree, Sheep, Mud, Rock
+    MATRIX = np.array(
+        [
+            [0, 1, 0, 1, 0],
+            [1, 1, 1, 1, 0],
+            [2, 0, 0, 0, 3],
+            [1, 0, 1, 0, 1],
+        ],
+        dtype=np.int64,
+    )
+    MATRIX.flags.writeable = False
+
+    @staticmethod
+    def to_name(build: int) -> str:
+        h = {0: "Road", 1: "Settlement", 2: "City", 3: "Dev card"}
+        return h[build]
@@ -5,7 +5,7 @@ from .devcard import DevCard
 
 
 class DevCardPile:
-    def __init__(self):
+    def __init__(self, rng: random.Random | None = None):
         self.pile: list[int] = list(
             chain(
                 [DevCard.KNIGHT] * 14,
@@ -15,7 +15,7 @@ class DevCardPile:
                 [DevCard.MONOPOLY] * 2,
             )
         )
-        random.shuffle(self.pile)
+        (rng or random).shuffle(self.pile)
 
     def has_cards(self) -> bool:
         return len(self.pile) > 0
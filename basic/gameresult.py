@@ -0,0 +1,26 @@
+class GameResult:
+    """Outcome of one game, with every player referred to by seat index"""
+
+    def __init__(
+        self,
+        strategies: list[str],
+        winner: int | None,
+        rounds: int,
+        vps: list[int],
+        longest_road: int | None,
+        largest_army: int | None,
+        force_quit: bool,
+        decision_latency: dict[str, dict[str, float]] | None = None,
+    ) -> None:
+        self.strategies = strategies  # strategy name in each seat
+        self.winner = winner
+        self.rounds = rounds
+        self.vps = vps
+        self.longest_road = longest_road
+        self.largest_army = largest_army
+        self.force_quit = force_quit
+        # per strategy: calls, p50 and p99 seconds per decision, and calls over budget
+        self.decision_latency = decision_latency or {}
+
+    def __repr__(self):
+        return "GameResult[{}]".format(self.__dict__)
@@ -1,6 +1,24 @@
+from .zobrist import Zobrist, count_key
+
+
 class GameStats:
     longest_road_count = 0
     longest_road_player = -1
     largest_army_count = 0
     largest_army_player = -1
     num_dev_cards = 25
+
+    @property
+    def state_hash(self) -> int:
+        """Zobrist hash of the stats, computed on the fly since there are only a few"""
+        values = [
+            self.longest_road_count,
+            self.longest_road_player,
+            self.largest_army_count,
+            self.largest_army_player,
+            self.num_dev_cards,
+        ]
+        h = 0
+        for keys, value in zip(Zobrist.STATS, values):
+            h ^= count_key(keys, value + 1)
+        return h
@@ -0,0 +1,52 @@
+import numpy as np
+
+MAX_PLAYERS = 6
+MAX_COUNT = 32  # counts at or above this share a key, a collision rather than an error
+
+
+def random_keys(shape: tuple[int, ...], seed: int) -> list:
+    """
+    Nested lists of random 64-bit keys as Python ints, which XOR faster than NumPy scalars.
+    The key of a count of 0 along the last axis is always 0, so absent pieces hash to nothing.
+    """
+    rng = np.random.default_rng(seed)
+    keys = np.frombuffer(rng.bytes(8 * int(np.prod(shape))), dtype=np.uint64)
+    keys = keys.reshape(shape).copy()
+    keys[..., 0] = 0
+    return keys.tolist()
+
+
+def count_key(keys: list[int], count: int) -> int:
+    return keys[min(max(count, 0), MAX_COUNT - 1)]
+
+
+class Zobrist:
+    """
+    Keys for incrementally hashing a game. Each piece of state, e.g. player 2 holding 3
+    wheat, has a fixed key, and the state hash is the XOR of the keys of everything present,
+    so a change costs one XOR out of the old key and one XOR in of the new one.
+    Seeded, so the same state hashes the same in every process.
+    """
+
+    # [player][resource][count]
+    RESOURCES = random_keys((MAX_PLAYERS, 5, MAX_COUNT), 1)
+    # [player][usable][card][count], cards bought this turn are not usable yet
+    DEV_CARDS = random_keys((MAX_PLAYERS, 2, 5, MAX_COUNT), 2)
+    # [player][knights played]
+    KNIGHTS = random_keys((MAX_PLAYERS, MAX_COUNT), 3)
+    # [seat], the first key is used too so random_keys' zero column is skipped
+    TURN = random_keys((MAX_PLAYERS + 1,), 4)[1:]
+    # [stat][value + 1], in the order of `GameStats` attributes
+    STATS = random_keys((5, MAX_COUNT), 5)
+
+    def __init__(self, num_vertices: int, num_edges: int, num_tiles: int) -> None:
+        # [vertex][player][1 + fixture type]
+        self.vertices = random_keys((num_vertices, MAX_PLAYERS, 3), 6)
+        # [edge][1 + player]
+        self.edges = random_keys((num_edges, MAX_PLAYERS + 1), 7)
+        # [1 + tile]
+        self.robber = random_keys((num_tiles + 1,), 8)
+
+    def __deepcopy__(self, memo) -> "Zobrist":
+        # keys never change, copies of a board share them
+        return self
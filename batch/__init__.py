@@ -0,0 +1,4 @@
+from .stats import BatchStats, PlayerStats, RunningStat
+from .tournament import Matchup, Tournament
+
+__all__ = ["BatchStats", "PlayerStats", "RunningStat", "Matchup", "Tournament"]
@@ -0,0 +1,34 @@
+import os
+import pickle
+
+CHECKPOINT_FILE = "checkpoint.pkl"
+
+
+def atomic_write(path: str, data: bytes) -> None:
+    """Replaces the file at `path` with `data` so that readers only ever see a whole file"""
+    directory = os.path.dirname(path) or "."
+    tmp_path = "{}.tmp{}".format(path, os.getpid())
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    # make the rename itself durable
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def save_checkpoint(directory: str, state) -> None:
+    os.makedirs(directory, exist_ok=True)
+    atomic_write(
+        os.path.join(directory, CHECKPOINT_FILE),
+        pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL),
+    )
+
+
+def load_checkpoint(directory: str):
+    with open(os.path.join(directory, CHECKPOINT_FILE), "rb") as f:
+        return pickle.load(f)
@@ -0,0 +1,265 @@
+import os
+
+import numpy as np
+
+from basic import Action, GameResult
+from basic.zobrist import MAX_PLAYERS
+from board import Board
+
+ACTION_WIDTH = 5  # action type followed by up to 4 encoded parameters
+
+
+def turn_dtype(num_vertices: int, num_edges: int) -> np.dtype:
+    """Fixed-width record of the state before one action, the action, and how the game ended"""
+    return np.dtype(
+        [
+            ("game", np.int64),
+            ("step", np.int32),  # index of the action within its game
+            ("round", np.int32),
+            ("vertex_owner", np.int8, (num_vertices,)),  # -1 when empty
+            ("vertex_type", np.int8, (num_vertices,)),  # -1 empty, 0 house, 1 city
+            ("edge_owner", np.int8, (num_edges,)),  # -1 when empty
+            ("robber", np.int8),
+            ("resources", np.int16, (MAX_PLAYERS, 5)),
+            ("dev_cards", np.int8, (MAX_PLAYERS, 5)),
+            ("knights_played", np.int8, (MAX_PLAYERS,)),
+            ("stats", np.int16, (5,)),
+            ("actor", np.int8),
+            ("action", np.int32, (ACTION_WIDTH,)),
+            ("winner", np.int8),  # -1 when the game was force quit
+        ]
+    )
+
+
+RESOURCE_BITS = 6  # bits per resource count in a packed trade, 5 counts fit an int32
+
+
+def _pack_resources(resources: list[int]) -> int:
+    """Packs a list of resource cards into a 6-bit count per resource, resource 0 lowest"""
+    counts = np.bincount(resources, minlength=5)
+    assert counts.max(initial=0) < 1 << RESOURCE_BITS, "Too many cards to pack"
+    return sum(int(count) << (RESOURCE_BITS * res) for res, count in enumerate(counts))
+
+
+def encode_action(board: Board, action: Action) -> list[int]:
+    """Encodes an action as its type followed by integer parameters, padded with -1"""
+    p = action.params
+    a = action.action
+    if a in [Action.SETTLE, Action.BUILD_CITY]:
+        args = [board.get_position(p["pos"]).index]
+    elif a == Action.SETTLE_INIT:
+        args = [board.get_position(p["pos"]).index, int(p["second"])]
+    elif a in [Action.BUILD_ROAD, Action.BUILD_ROAD_INIT]:
+        args = [board.edge_index(p["pos"], p["road_name"])]
+    elif a in [Action.FOUR_TO_ONE, Action.THREE_TO_ONE, Action.TWO_TO_ONE]:
+        args = [p["source"]]
+        if p["dest"] is not None:
+            args.append(p["dest"])
+    elif a in [Action.USE_KNIGHT, Action.ROB]:
+        steal_from_id = p["steal_from_id"]
+        args = [
+            board.tile_indices[p["tile"]],
+            -1 if steal_from_id is None else steal_from_id,
+        ]
+    elif a == Action.USE_MONOPOLY:
+        args = [p["resource"]]
+    elif a == Action.USE_YEAR_OF_PLENTY:
+        args = [p["resource1"]]
+        if p["resource2"] is not None:
+            args.append(p["resource2"])
+    elif a == Action.PLENTY_STEP:
+        args = [p["resource"]]
+    elif a == Action.TRADE_STEP:
+        args = [p["dest"]]
+    elif a == Action.DEV_ROAD_STEP:
+        args = [board.edge_index(p["pos"], p["road_name"])]
+    elif a == Action.USE_DEV_ROADS:
+        args = [board.edge_index(p["pos1"], p["road1"])]
+        if p["pos2"] is not None:
+            args.append(board.edge_index(p["pos2"], p["road2"]))
+    elif a in [Action.PROPOSE_TRADE, Action.TRADE]:
+        args = [_pack_resources(p["mine"]), _pack_resources(p["theirs"])]
+        if a == Action.TRADE:
+            args.append(p["with_player"])
+    else:
+        args = []
+    return [a] + args + [-1] * (ACTION_WIDTH - 1 - len(args))
+
+
+def fill_record(record: np.ndarray, game, player, action: Action) -> None:
+    """Writes the current state of `game` and the action `player` is about to take into a record"""
+    board: Board = game.board
+    for pos in board.vertices:
+        record["vertex_owner"][pos.index] = -1 if pos.fixture is None else pos.fixture
+        record["vertex_type"][pos.index] = (
+            -1 if pos.fixture_type is None else pos.fixture_type
+        )
+    for i, (pos, road_name) in enumerate(board.edges):
+        owner = getattr(pos, road_name)
+        record["edge_owner"][i] = -1 if owner is None else owner
+    record["robber"] = (
+        -1 if board.robber is None else board.tile_indices[board.robber.pos]
+    )
+    record["resources"] = 0
+    record["dev_cards"] = 0
+    for seat, p in enumerate(game.players):
+        record["resources"][seat] = p.resources
+        record["dev_cards"][seat] = np.bincount(
+            p.cards + p.unusable_dev_cards, minlength=5
+        )
+        record["knights_played"][seat] = p.knights_played
+    stats = game.stats
+    record["stats"] = [
+        stats.longest_road_count,
+        stats.longest_road_player,
+        stats.largest_army_count,
+        stats.largest_army_player,
+        stats.num_dev_cards,
+    ]
+    record["round"] = game.rounds
+    record["actor"] = game.players.index(player)
+    record["action"] = encode_action(board, action)
+
+
+class TurnRecorder:
+    """Collects the records of the game in progress until its outcome is known"""
+
+    def __init__(self, dtype: np.dtype, capacity: int = 1024) -> None:
+        self.records = np.zeros(capacity, dtype=dtype)
+        self.count = 0
+        self.game_id = 0
+
+    def record(self, game, player, action: Action) -> None:
+        if self.count == len(self.records):
+            self.records = np.concatenate([self.records, np.zeros_like(self.records)])
+        row = self.records[self.count]
+        fill_record(row, game, player, action)
+        row["game"] = self.game_id
+        row["step"] = self.count
+        self.count += 1
+
+    def finish(self, result: GameResult) -> np.ndarray:
+        """Stamps the outcome on every record of the game and returns them"""
+        records = self.records[: self.count]
+        records["winner"] = -1 if result.winner is None else result.winner
+        self.count = 0
+        return records
+
+    def discard(self) -> None:
+        """Drops the records of a game that will not finish"""
+        self.count = 0
+
+
+class ShardWriter:
+    """Appends records to a fixed-size shard and writes each full shard as one `.npy` file per field"""
+
+    def __init__(
+        self, directory: str, dtype: np.dtype, shard_size: int = 1 << 16
+    ) -> None:
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.dtype = dtype
+        self.shard = np.zeros(shard_size, dtype=dtype)
+        self.shard_count = 0
+        self.shards_written = len(TurnDataset.shard_dirs(directory))
+
+    def next_game_id(self) -> int:
+        """First game ID after the games already written to the directory"""
+        shard_dirs = TurnDataset.shard_dirs(self.directory)
+        if not shard_dirs:
+            return 0
+        games = np.load(os.path.join(shard_dirs[-1], "game.npy"))
+        return int(games.max()) + 1 if len(games) else 0
+
+    def write(self, records: np.ndarray) -> None:
+        while len(records):
+            n = min(len(records), len(self.shard) - self.shard_count)
+            self.shard[self.shard_count : self.shard_count + n] = records[:n]
+            self.shard_count += n
+            records = records[n:]
+            if self.shard_count == len(self.shard):
+                self.flush()
+
+    def flush(self) -> None:
+        """Writes out the partially filled shard, call once the last records are in"""
+        if not self.shard_count:
+            return
+        shard_dir = os.path.join(
+            self.directory, "shard_{:05d}".format(self.shards_written)
+        )
+        os.makedirs(shard_dir, exist_ok=True)
+        for name in self.dtype.names:
+            np.save(
+                os.path.join(shard_dir, name + ".npy"),
+                np.ascontiguousarray(self.shard[name][: self.shard_count]),
+            )
+        self.shards_written += 1
+        self.shard_count = 0
+
+
+class TurnExporter:
+    """
+    Hooked into `Game` to write one record per action into columnar shards, one `.npy` file
+    per field per shard, so that `TurnDataset` can memory-map them back without unpickling.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        board: Board,
+        shard_size: int = 1 << 16,
+        first_game_id: int | None = None,
+    ) -> None:
+        dtype = turn_dtype(len(board.vertices), len(board.edges))
+        self.writer = ShardWriter(directory, dtype, shard_size)
+        self.recorder = TurnRecorder(dtype)
+        self.recorder.game_id = (
+            self.writer.next_game_id() if first_game_id is None else first_game_id
+        )
+
+    def record(self, game, player, action: Action) -> None:
+        self.recorder.record(game, player, action)
+
+    def end_game(self, result: GameResult) -> None:
+        self.writer.write(self.recorder.finish(result))
+        self.recorder.game_id += 1
+
+    def flush(self) -> None:
+        self.writer.flush()
+
+
+class TurnDataset:
+    """Reads exported shards back as memory-mapped columns"""
+
+    def __init__(self, directory: str) -> None:
+        self.shards: list[dict[str, np.ndarray]] = [
+            {
+                name[: -len(".npy")]: np.load(
+                    os.path.join(shard_dir, name), mmap_mode="r"
+                )
+                for name in os.listdir(shard_dir)
+                if name.endswith(".npy")
+            }
+            for shard_dir in TurnDataset.shard_dirs(directory)
+        ]
+
+    @staticmethod
+    def shard_dirs(directory: str) -> list[str]:
+        return [
+            os.path.join(directory, name)
+            for name in sorted(os.listdir(directory))
+            if name.startswith("shard_")
+        ]
+
+    def __len__(self) -> int:
+        return sum(len(shard["game"]) for shard in self.shards)
+
+    def batches(self, batch_size: int, fields: list[str] | None = None):
+        """Yields dicts of field to array, reading each shard sequentially from disk"""
+        for shard in self.shards:
+            names = fields or list(shard)
+            for start in range(0, len(shard["game"]), batch_size):
+                yield {
+                    name: np.asarray(shard[name][start : start + batch_size])
+                    for name in names
+                }
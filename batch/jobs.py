@@ -0,0 +1,371 @@
+from abc import ABC, abstractmethod
+import asyncio
+import json
+import os
+import socket
+import threading
+import time
+
+from board import MapSpec
+import strategy
+
+from remote.protocol import decode, encode
+
+from .checkpoint import atomic_write
+from .stats import BatchStats
+from .tournament import play_game
+
+
+class Job:
+    """A range of game indices of one sweep, played by one worker at a time"""
+
+    def __init__(self, job_id: int, start: int, stop: int) -> None:
+        self.job_id = job_id
+        self.start = start
+        self.stop = stop
+
+    def to_dict(self) -> dict:
+        return dict(self.__dict__)
+
+    @staticmethod
+    def from_dict(data: dict) -> "Job":
+        return Job(data["job_id"], data["start"], data["stop"])
+
+
+def sweep_config(
+    lineup: list[str],
+    num_games: int,
+    job_size: int = 50,
+    seed: int = 0,
+    force_quit_after_round: int = 1000,
+    map_name: str = "standard",
+    lease_seconds: float = 60.0,
+) -> dict:
+    """Everything a worker needs to play its share of a sweep, `lineup` by class name"""
+    return {
+        "lineup": lineup,
+        "num_games": num_games,
+        "job_size": job_size,
+        "seed": seed,
+        "force_quit_after_round": force_quit_after_round,
+        "map": map_name,
+        "lease_seconds": lease_seconds,
+    }
+
+
+def play_job(config: dict, job: Job) -> dict:
+    """
+    Plays the games of `job`, rotating the lineup through the seats by game index, and
+    returns their aggregate with the indices of any games that raised
+    """
+    lineup = tuple(getattr(strategy, name) for name in config["lineup"])
+    map_spec = MapSpec.parse(config["map"])
+    stats = BatchStats()
+    failed = []
+    for index in range(job.start, job.stop):
+        k = index % len(lineup)
+        try:
+            result = play_game(
+                lineup[k:] + lineup[:k],
+                "{}-{}".format(config["seed"], index),
+                config["force_quit_after_round"],
+                map_spec=map_spec,
+            )
+        except Exception:
+            # playing it again elsewhere would fail the same way, so report it instead
+            failed.append(index)
+        else:
+            stats.add(result)
+    return {"stats": stats.to_dict(), "failed": failed}
+
+
+class JobQueue(ABC):
+    """
+    Hands out the jobs of a sweep under leases. A lease that is not renewed within
+    `lease_seconds` expires and the job goes to the next worker that asks. Jobs are
+    deterministic, so a job finished twice keeps whichever result came in first.
+    """
+
+    def __init__(self, config: dict) -> None:
+        self.config = config
+        size = config["job_size"]
+        self.jobs = [
+            Job(i, start, min(start + size, config["num_games"]))
+            for i, start in enumerate(range(0, config["num_games"], size))
+        ]
+        self.lease_seconds = config["lease_seconds"]
+
+    @abstractmethod
+    def lease(self, worker: str) -> Job | None:
+        """A job no one holds a live lease on, None while there is none"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def renew(self, job: Job) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def complete(self, job: Job, result: dict) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def finished(self) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def results(self) -> list[dict]:
+        raise NotImplementedError
+
+    def stats(self) -> BatchStats:
+        """Aggregates over every game played so far, the same however the jobs were split"""
+        stats = BatchStats()
+        for result in self.results():
+            stats.merge(BatchStats.from_dict(result["stats"]))
+        return stats
+
+    def failed(self) -> list[int]:
+        return sorted(index for result in self.results() for index in result["failed"])
+
+
+class LocalJobQueue(JobQueue):
+    """Queue held in the coordinator's memory, shared with workers by `serve_jobs`"""
+
+    def __init__(self, config: dict) -> None:
+        super().__init__(config)
+        self.deadlines: dict[int, float] = {}
+        self.done: dict[int, dict] = {}
+
+    def lease(self, worker: str) -> Job | None:
+        now = time.monotonic()
+        for job in self.jobs:
+            if job.job_id in self.done:
+                continue
+            if self.deadlines.get(job.job_id, now) <= now:
+                self.deadlines[job.job_id] = now + self.lease_seconds
+                return job
+        return None
+
+    def renew(self, job: Job) -> None:
+        if job.job_id not in self.done:
+            self.deadlines[job.job_id] = time.monotonic() + self.lease_seconds
+
+    def complete(self, job: Job, result: dict) -> None:
+        self.done.setdefault(job.job_id, result)
+        self.deadlines.pop(job.job_id, None)
+
+    def finished(self) -> bool:
+        return len(self.done) == len(self.jobs)
+
+    def results(self) -> list[dict]:
+        return list(self.done.values())
+
+
+class DirectoryJobQueue(JobQueue):
+    """
+    Queue kept in a directory every node can reach, with no coordinator process. A lease
+    is a file created exclusively, renewed by touching it and taken over by renaming it
+    once stale. Results are written atomically next to it. Leases expire by wall clock, so
+    node clocks should agree to well within `lease_seconds`.
+    """
+
+    def __init__(self, path: str, config: dict | None = None) -> None:
+        config_path = os.path.join(path, "config.json")
+        if config is not None and not os.path.exists(config_path):
+            os.makedirs(os.path.join(path, "leases"), exist_ok=True)
+            os.makedirs(os.path.join(path, "results"), exist_ok=True)
+            atomic_write(config_path, json.dumps(config).encode())
+        with open(config_path) as f:
+            super().__init__(json.load(f))
+        self.path = path
+
+    def lease_path(self, job: Job) -> str:
+        return os.path.join(self.path, "leases", str(job.job_id))
+
+    def result_path(self, job: Job) -> str:
+        return os.path.join(self.path, "results", "{}.json".format(job.job_id))
+
+    def claim(self, path: str, worker: str) -> bool:
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                if time.time() - os.stat(path).st_mtime < self.lease_seconds:
+                    return False
+                # only one of the workers racing for a stale lease wins the rename, and at
+                # worst a job is played twice with both copies writing the same result
+                stale = "{}.{}.{}".format(path, socket.gethostname(), os.getpid())
+                os.rename(path, stale)
+                os.unlink(stale)
+            except FileNotFoundError:
+                return False
+            return self.claim(path, worker)
+        with os.fdopen(fd, "w") as f:
+            f.write(worker)
+        return True
+
+    def lease(self, worker: str) -> Job | None:
+        for job in self.jobs:
+            if os.path.exists(self.result_path(job)):
+                continue
+            if self.claim(self.lease_path(job), worker):
+                return job
+        return None
+
+    def renew(self, job: Job) -> None:
+        try:
+            os.utime(self.lease_path(job))
+        except FileNotFoundError:
+            pass
+
+    def complete(self, job: Job, result: dict) -> None:
+        atomic_write(self.result_path(job), json.dumps(result).encode())
+        try:
+            os.unlink(self.lease_path(job))
+        except FileNotFoundError:
+            pass
+
+    def finished(self) -> bool:
+        return all(os.path.exists(self.result_path(job)) for job in self.jobs)
+
+    def results(self) -> list[dict]:
+        results = []
+        for job in self.jobs:
+            if os.path.exists(self.result_path(job)):
+                with open(self.result_path(job)) as f:
+                    results.append(json.load(f))
+        return results
+
+
+class RemoteJobQueue(JobQueue):
+    """
+    Worker side of `serve_jobs`, one JSON line per request and per answer. Safe to share
+    between threads, so leases can be renewed while a job plays.
+    """
+
+    def __init__(self, host: str, port: int) -> None:
+        self.socket = socket.create_connection((host, port))
+        self.stream = self.socket.makefile("rwb")
+        self.lock = threading.Lock()
+        super().__init__(self.request({"type": "config"})["config"])
+
+    def request(self, message: dict) -> dict:
+        try:
+            with self.lock:
+                self.stream.write(encode(message))
+                self.stream.flush()
+                line = self.stream.readline()
+        except OSError:
+            raise ConnectionError("Coordinator went away")
+        if not line:
+            raise ConnectionError("Coordinator went away")
+        return decode(line)
+
+    def lease(self, worker: str) -> Job | None:
+        job = self.request({"type": "lease", "worker": worker})["job"]
+        return None if job is None else Job.from_dict(job)
+
+    def renew(self, job: Job) -> None:
+        self.request({"type": "renew", "job": job.to_dict()})
+
+    def complete(self, job: Job, result: dict) -> None:
+        self.request({"type": "complete", "job": job.to_dict(), "result": result})
+
+    def finished(self) -> bool:
+        return self.request({"type": "finished"})["finished"]
+
+    def results(self) -> list[dict]:
+        return self.request({"type": "results"})["results"]
+
+    def close(self) -> None:
+        self.stream.close()
+        self.socket.close()
+
+
+async def serve_jobs(queue: LocalJobQueue, host: str, port: int) -> None:
+    """Answers workers on HOST:PORT until every job of the queue has a result"""
+    done = asyncio.Event()
+    connections: dict[asyncio.StreamWriter, asyncio.Task] = {}
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        connections[writer] = asyncio.current_task()
+        try:
+            while line := await reader.readline():
+                message = decode(line)
+                kind = message["type"]
+                response: dict = {}
+                if kind == "config":
+                    response["config"] = queue.config
+                elif kind == "lease":
+                    job = queue.lease(message["worker"])
+                    response["job"] = None if job is None else job.to_dict()
+                elif kind == "renew":
+                    queue.renew(Job.from_dict(message["job"]))
+                elif kind == "complete":
+                    queue.complete(Job.from_dict(message["job"]), message["result"])
+                    if queue.finished():
+                        done.set()
+                elif kind == "results":
+                    response["results"] = queue.results()
+                response["finished"] = queue.finished()
+                writer.write(encode(response))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            connections.pop(writer, None)
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    async with server:
+        if not queue.finished():
+            await done.wait()
+        # hang up on idle workers so they stop polling, then let their handlers wind down
+        handlers = list(connections.values())
+        for writer in list(connections):
+            writer.close()
+        await asyncio.gather(*handlers, return_exceptions=True)
+
+
+def renew_lease(queue: JobQueue, job: Job, stop: threading.Event) -> None:
+    """Renews the lease on `job` three times per `lease_seconds` until `stop` is set"""
+    while not stop.wait(queue.lease_seconds / 3):
+        try:
+            queue.renew(job)
+        except ConnectionError:
+            return
+
+
+def run_worker(queue: JobQueue, worker: str, poll: float = 1.0) -> int:
+    """Plays leased jobs until the sweep is finished or its coordinator goes away, returns jobs played"""
+    played = 0
+    try:
+        while not queue.finished():
+            job = queue.lease(worker)
+            if job is None:
+                # everything left is leased, wait in case a lease expires
+                time.sleep(poll)
+                continue
+            # renewed from another thread, so a slow game cannot outlive its lease
+            stop = threading.Event()
+            heartbeat = threading.Thread(
+                target=renew_lease, args=(queue, job, stop), daemon=True
+            )
+            heartbeat.start()
+            try:
+                result = play_job(queue.config, job)
+            finally:
+                stop.set()
+                heartbeat.join()
+            queue.complete(job, result)
+            played += 1
+    except ConnectionError:
+        pass
+    return played
+
+
+def open_queue(address: str, config: dict | None = None) -> JobQueue:
+    """`dir:PATH` for a shared directory, HOST:PORT for a coordinator's `serve_jobs`"""
+    if address.startswith("dir:"):
+        return DirectoryJobQueue(address[len("dir:") :], config)
+    host, port = address.rsplit(":", 1)
+    return RemoteJobQueue(host, int(port))
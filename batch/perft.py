@@ -0,0 +1,138 @@
+from copy import deepcopy
+import time
+
+from basic import Action, DevCard
+from board import MapSpec, RandomBoard
+from board.spec import STANDARD
+from game import Game
+from strategy import Player
+
+from .tournament import seed_game
+
+ROLLS = list(range(2, 13))
+
+# what the player to move decides at a node
+ROBBER = 0  # where to move the robber after rolling a 7
+TURN = 1  # the next action of the turn, DO_NOTHING ends it
+OVER = 2  # someone has won, nothing left to decide
+
+
+def perft_position(
+    lineup: tuple[type[Player], ...],
+    seed: str,
+    rounds: int,
+    map_spec: MapSpec = STANDARD,
+    validate_every: int = 0,
+    factored: bool = False,
+) -> Game:
+    """
+    The game `lineup` reaches after the initial placements and `rounds` rounds of play,
+    at the start of seat 0's turn before it rolls. The same arguments give the same
+    position, whatever the legal action generation looks like.
+    """
+    seed_game(seed)
+    Player.reset_ids()
+    players = [strategy() for strategy in lineup]
+    for player in players:
+        player.factored = factored
+    game = Game(
+        players,
+        RandomBoard(map_spec),
+        None,
+        float("inf"),
+        float("inf"),
+        validate_every=validate_every,
+    )
+    game.init_game()
+    while game.rounds < rounds:
+        if not game.game_loop(game.turn):
+            raise ValueError("Game ended in round {}".format(game.rounds))
+        game.next_turn()
+    return game
+
+
+class Perft:
+    """
+    Counts the positions reachable in `depth` decisions of the players to move, expanding
+    every legal action on a copy of the game. Ending a turn rolls each of `rolls` for the
+    next player, a 7 adds the robber move as a decision. Discards and steals are left to
+    the strategies and the random number generator, reseeded from the position and the
+    move every time, so a count only depends on the legal actions generated along the way
+    and not on the order they come in. Positions one decision from the last depth
+    are only counted, not played out, like the bulk counting of chess perft.
+    """
+
+    def __init__(self, rolls: list[int], seed: str = "perft") -> None:
+        self.rolls = rolls
+        self.seed = seed
+        self.movegen_seconds = 0.0
+
+    def reseed(self, game: Game, move) -> None:
+        seed_game("{}-{}-{!r}".format(self.seed, game.state_hash, move))
+
+    def moves(self, game: Game, phase: int) -> list[Action]:
+        player = game.players[game.turn]
+        start = time.perf_counter()
+        if phase == ROBBER:
+            moves = player.get_robber_options(game.board)
+        elif phase == TURN:
+            moves = [Action(Action.DO_NOTHING)] + player.get_legal_actions(
+                game.board, game.stats
+            )
+        else:
+            moves = []
+        self.movegen_seconds += time.perf_counter() - start
+        return moves
+
+    def rolled(self, game: Game) -> list[tuple[Game, int]]:
+        """Copies of `game` after each of the rolls that start its current turn"""
+        children = []
+        for d6 in self.rolls:
+            child = deepcopy(game)
+            self.reseed(child, d6)
+            child.roll(d6)
+            children.append((child, ROBBER if d6 == 7 else TURN))
+        return children
+
+    def play(self, game: Game, action: Action) -> list[tuple[Game, int]]:
+        """Copies of `game` after the player to move takes `action`, one per roll it leads to"""
+        child = deepcopy(game)
+        player = child.players[child.turn]
+        if action.action != Action.DO_NOTHING:
+            self.reseed(child, action)
+            child.handle_action(action, player)
+            return [(child, TURN)]
+        if not child.end_turn(child.turn):
+            return [(child, OVER)]
+        child.next_turn()
+        return self.rolled(child)
+
+    def num_children(self, game: Game, action: Action) -> int:
+        """Number of positions `play` would give, without copying the game"""
+        if action.action != Action.DO_NOTHING:
+            return 1
+        # what `Game.end_turn` checks, with the cards bought this turn counted as usable
+        player = game.players[game.turn]
+        vps = player.fast_vps(game.stats) + player.unusable_dev_cards.count(DevCard.VP)
+        return 1 if vps >= 10 else len(self.rolls)
+
+    def count(self, game: Game, phase: int, ply: int, counts: list[int]) -> None:
+        """Adds (`game`, `phase`) at `ply` and the positions below it to `counts`"""
+        counts[ply] += 1
+        if ply == len(counts) - 1:
+            return
+        if ply == len(counts) - 2:
+            counts[ply + 1] += sum(
+                self.num_children(game, action) for action in self.moves(game, phase)
+            )
+            return
+        for action in self.moves(game, phase):
+            for child, child_phase in self.play(game, action):
+                self.count(child, child_phase, ply + 1, counts)
+
+    def run(self, game: Game, depth: int) -> list[int]:
+        """Positions at each depth from 0 to `depth`, from every roll of the turn about to start"""
+        counts = [0] * (depth + 1)
+        for child, phase in self.rolled(game):
+            self.count(child, phase, 0, counts)
+        return counts
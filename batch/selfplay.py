@@ -0,0 +1,288 @@
+from multiprocessing import Lock, Pipe, Process
+from multiprocessing.connection import Connection, wait
+from multiprocessing.shared_memory import SharedMemory
+import time
+
+import numpy as np
+
+from basic import Action, GameResult
+from board import MapSpec, RandomBoard
+from board.spec import STANDARD
+from game import Game
+from strategy import Player
+
+from .export import ShardWriter, TurnRecorder, turn_dtype
+from .tournament import seed_game
+
+HEADER_BYTES = 64
+HEAD = 0  # records written by the producer
+TAIL = 1  # records read by the consumer
+DONE = 2  # set once the producer has no more records
+
+
+class SharedRing:
+    """
+    Single-producer single-consumer ring buffer of fixed-width records in shared memory.
+    Counters only grow, the lock orders the counter updates against the record copies.
+    """
+
+    def __init__(
+        self,
+        dtype: np.dtype,
+        capacity: int,
+        name: str | None = None,
+        lock=None,
+    ) -> None:
+        self.dtype = dtype
+        self.capacity = capacity
+        self.lock = lock or Lock()
+        size = HEADER_BYTES + capacity * dtype.itemsize
+        self.shm = SharedMemory(name=name, create=name is None, size=size)
+        self.header = np.ndarray((3,), dtype=np.int64, buffer=self.shm.buf)
+        self.records = np.ndarray(
+            (capacity,), dtype=dtype, buffer=self.shm.buf, offset=HEADER_BYTES
+        )
+        if name is None:
+            self.header[:] = 0
+
+    def __reduce__(self):
+        # processes attach to the same block by name instead of copying it
+        return SharedRing, (self.dtype, self.capacity, self.shm.name, self.lock)
+
+    def push(self, records: np.ndarray) -> None:
+        """Copies records into the ring, waiting whenever the consumer falls a full ring behind"""
+        while len(records):
+            with self.lock:
+                head, tail = int(self.header[HEAD]), int(self.header[TAIL])
+            free = self.capacity - (head - tail)
+            if not free:
+                time.sleep(0.001)
+                continue
+            start = head % self.capacity
+            n = min(len(records), free, self.capacity - start)
+            self.records[start : start + n] = records[:n]
+            with self.lock:
+                self.header[HEAD] = head + n
+            records = records[n:]
+
+    def pop(self, max_records: int) -> np.ndarray:
+        """Copies out up to `max_records` of the oldest unread records"""
+        with self.lock:
+            head, tail = int(self.header[HEAD]), int(self.header[TAIL])
+        start = tail % self.capacity
+        n = min(head - tail, max_records, self.capacity - start)
+        out = self.records[start : start + n].copy()
+        with self.lock:
+            self.header[TAIL] = tail + n
+        return out
+
+    def close(self) -> None:
+        with self.lock:
+            self.header[DONE] = 1
+
+    @property
+    def drained(self) -> bool:
+        with self.lock:
+            return bool(self.header[DONE]) and self.header[HEAD] == self.header[TAIL]
+
+    def release(self, unlink: bool = False) -> None:
+        del self.header, self.records
+        self.shm.close()
+        if unlink:
+            self.shm.unlink()
+
+
+class RingExporter:
+    """Game exporter that hands each finished game's records to a shared ring"""
+
+    def __init__(self, ring: SharedRing, first_game_id: int) -> None:
+        self.ring = ring
+        self.recorder = TurnRecorder(ring.dtype)
+        self.recorder.game_id = first_game_id
+
+    def record(self, game, player, action: Action) -> None:
+        self.recorder.record(game, player, action)
+
+    def end_game(self, result: GameResult) -> None:
+        self.ring.push(self.recorder.finish(result))
+
+
+def _produce(
+    ring: SharedRing,
+    game_ids: list[int],
+    lineup: tuple[type[Player], ...],
+    seed: int,
+    force_quit_after_round: int,
+    map_spec: MapSpec,
+    validate_every: int,
+    factored: bool,
+    report: Connection,
+) -> None:
+    exporter = RingExporter(ring, 0)
+    failed = []
+    for game_id in game_ids:
+        seed_game("{}-{}".format(seed, game_id))
+        Player.reset_ids()
+        # rotate the lineup like a tournament so every strategy plays every seat
+        k = game_id % len(lineup)
+        players = [strategy() for strategy in lineup[k:] + lineup[:k]]
+        for player in players:
+            player.factored = factored
+        exporter.recorder.game_id = game_id
+        game = Game(
+            players,
+            RandomBoard(map_spec),
+            None,
+            force_quit_after_round,
+            float("inf"),
+            exporter,
+            validate_every=validate_every,
+        )
+        try:
+            game.play()
+        except ValueError:
+            if game.rounds < force_quit_after_round:
+                exporter.recorder.discard()
+                failed.append(game_id)
+        except Exception:
+            exporter.recorder.discard()
+            failed.append(game_id)
+    report.send(failed)
+    report.close()
+    ring.close()
+    ring.release()
+
+
+def _consume(rings: list[SharedRing], sink, batch_size: int) -> None:
+    batch = np.zeros(batch_size, dtype=rings[0].dtype)
+    count = 0
+    active = list(rings)
+    while active:
+        moved = 0
+        for ring in list(active):
+            records = ring.pop(batch_size - count)
+            batch[count : count + len(records)] = records
+            count += len(records)
+            moved += len(records)
+            if count == batch_size:
+                sink(batch)
+                count = 0
+            if not len(records) and ring.drained:
+                active.remove(ring)
+        if not moved:
+            time.sleep(0.001)
+    if count:
+        sink(batch[:count])
+    if hasattr(sink, "close"):
+        sink.close()
+    for ring in rings:
+        ring.release()
+
+
+class ShardSink:
+    """Consumer that writes drained batches to columnar shards, see `TurnDataset`"""
+
+    def __init__(self, directory: str, dtype: np.dtype, shard_size: int = 1 << 16):
+        self.directory = directory
+        self.dtype = dtype
+        self.shard_size = shard_size
+        self.writer: ShardWriter | None = None
+
+    def __call__(self, batch: np.ndarray) -> None:
+        if self.writer is None:
+            # opened in the consumer process rather than pickled across
+            self.writer = ShardWriter(self.directory, self.dtype, self.shard_size)
+        self.writer.write(batch)
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.flush()
+
+
+def run_selfplay(
+    num_games: int,
+    lineup: tuple[type[Player], ...],
+    sink,
+    workers: int = 4,
+    seed: int = 0,
+    ring_capacity: int = 1 << 14,
+    batch_size: int = 1 << 12,
+    force_quit_after_round: int = 1000,
+    map_spec: MapSpec = STANDARD,
+    validate_every: int = 0,
+    factored: bool = False,
+) -> list[int]:
+    """
+    Plays `num_games` games of `lineup` across `workers` producer processes, rotating the
+    lineup through the seats by game ID. Each producer writes per-action records into its
+    own shared-memory ring, and one consumer process drains all rings in batches of
+    `batch_size` records and passes each batch to `sink`. Returns the IDs of the games
+    that raised, which leave no records. Raises if a producer died, losing its games.
+    """
+    board = RandomBoard(map_spec)
+    dtype = turn_dtype(len(board.vertices), len(board.edges))
+    rings = [SharedRing(dtype, ring_capacity) for _ in range(workers)]
+    # one pipe per producer for its failed games, read while the producers run
+    pipes = [Pipe(duplex=False) for _ in range(workers)]
+    failed: list[int] = []
+    lost: list[int] = []
+    producers: list[Process] = []
+    try:
+        consumer = Process(target=_consume, args=(rings, sink, batch_size))
+        consumer.start()
+        producers = [
+            Process(
+                target=_produce,
+                args=(
+                    ring,
+                    list(range(w, num_games, workers)),
+                    lineup,
+                    seed,
+                    force_quit_after_round,
+                    map_spec,
+                    validate_every,
+                    factored,
+                    pipes[w][1],
+                ),
+            )
+            for w, ring in enumerate(rings)
+        ]
+        for producer in producers:
+            producer.start()
+        for _, writer in pipes:
+            # only the producer holds it now, so its reader sees EOF if it dies
+            writer.close()
+        unreported = {pipes[w][0]: w for w in range(workers)}
+        while unreported:
+            ready = wait(list(unreported) + [consumer.sentinel])
+            if consumer.sentinel in ready:
+                # producers would wait forever on full rings
+                raise RuntimeError("The consumer died, the exported data is incomplete")
+            for reader in ready:
+                w = unreported.pop(reader)
+                try:
+                    failed += reader.recv()
+                except EOFError:
+                    # the producer died before reporting
+                    lost += range(w, num_games, workers)
+        for w, producer in enumerate(producers):
+            producer.join()
+            if producer.exitcode:
+                # let the consumer finish with whatever was produced
+                rings[w].close()
+        consumer.join()
+        if consumer.exitcode:
+            raise RuntimeError("The consumer died, the exported data is incomplete")
+    finally:
+        for producer in producers:
+            if producer.is_alive():
+                producer.terminate()
+        for reader, _ in pipes:
+            reader.close()
+        for ring in rings:
+            ring.release(unlink=True)
+    if lost:
+        raise RuntimeError(
+            "A producer died, some of games {} may be missing".format(sorted(lost))
+        )
+    return sorted(failed)
@@ -0,0 +1,176 @@
+from collections import Counter
+from math import sqrt
+
+from basic import GameResult
+
+
+class RunningStat:
+    """
+    Count, mean and variance of an integer metric in constant memory. Keeps exact integer
+    sums rather than floating point moments so that merging partial aggregates is exact.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0
+        self.total_sq = 0
+        self.min: int | None = None
+        self.max: int | None = None
+
+    def add(self, x: int) -> None:
+        self.count += 1
+        self.total += x
+        self.total_sq += x * x
+        self.min = x if self.min is None else min(self.min, x)
+        self.max = x if self.max is None else max(self.max, x)
+
+    def merge(self, other: "RunningStat") -> None:
+        self.count += other.count
+        self.total += other.total
+        self.total_sq += other.total_sq
+        for bound in [other.min, other.max]:
+            if bound is not None:
+                self.min = bound if self.min is None else min(self.min, bound)
+                self.max = bound if self.max is None else max(self.max, bound)
+
+    def to_dict(self) -> dict:
+        return dict(self.__dict__)
+
+    @staticmethod
+    def from_dict(data: dict) -> "RunningStat":
+        stat = RunningStat()
+        stat.__dict__.update(data)
+        return stat
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        if self.count < 2:
+            return 0.0
+        var = (self.total_sq - self.total * self.total / self.count) / (self.count - 1)
+        return sqrt(max(var, 0.0))
+
+    def __str__(self) -> str:
+        return "{:.2f}±{:.2f} [{}, {}]".format(self.mean, self.std, self.min, self.max)
+
+
+class PlayerStats:
+    """Metrics over every game a strategy or seat took part in"""
+
+    def __init__(self) -> None:
+        self.games = 0
+        self.wins = 0
+        self.force_quits = 0
+        self.longest_road = 0
+        self.largest_army = 0
+        self.rounds = RunningStat()
+        self.vps = RunningStat()
+        self.vp_counts: Counter[int] = Counter()
+
+    def add(self, result: GameResult, seat: int) -> None:
+        self.games += 1
+        self.wins += result.winner == seat
+        self.force_quits += result.force_quit
+        self.longest_road += result.longest_road == seat
+        self.largest_army += result.largest_army == seat
+        self.rounds.add(result.rounds)
+        self.vps.add(result.vps[seat])
+        self.vp_counts[result.vps[seat]] += 1
+
+    def merge(self, other: "PlayerStats") -> None:
+        self.games += other.games
+        self.wins += other.wins
+        self.force_quits += other.force_quits
+        self.longest_road += other.longest_road
+        self.largest_army += other.largest_army
+        self.rounds.merge(other.rounds)
+        self.vps.merge(other.vps)
+        self.vp_counts.update(other.vp_counts)
+
+    def to_dict(self) -> dict:
+        data = dict(self.__dict__)
+        data["rounds"] = self.rounds.to_dict()
+        data["vps"] = self.vps.to_dict()
+        data["vp_counts"] = {str(vps): n for vps, n in self.vp_counts.items()}
+        return data
+
+    @staticmethod
+    def from_dict(data: dict) -> "PlayerStats":
+        stats = PlayerStats()
+        stats.__dict__.update(data)
+        stats.rounds = RunningStat.from_dict(data["rounds"])
+        stats.vps = RunningStat.from_dict(data["vps"])
+        stats.vp_counts = Counter({int(vps): n for vps, n in data["vp_counts"].items()})
+        return stats
+
+    def rate(self, count: int) -> float:
+        return count / self.games if self.games else 0.0
+
+    def __str__(self) -> str:
+        return "games={} win_rate={:.3f} rounds={} vps={} vp_distribution={} longest_road={:.3f} largest_army={:.3f} force_quit={:.3f}".format(
+            self.games,
+            self.rate(self.wins),
+            self.rounds,
+            self.vps,
+            dict(sorted(self.vp_counts.items())),
+            self.rate(self.longest_road),
+            self.rate(self.largest_army),
+            self.rate(self.force_quits),
+        )
+
+
+class BatchStats:
+    """Per-strategy and per-seat aggregates of a batch of games, mergeable across workers"""
+
+    def __init__(self) -> None:
+        self.games = 0
+        self.by_strategy: dict[str, PlayerStats] = {}
+        self.by_seat: dict[int, PlayerStats] = {}
+
+    def add(self, result: GameResult) -> None:
+        self.games += 1
+        for seat, strategy in enumerate(result.strategies):
+            self.by_strategy.setdefault(strategy, PlayerStats()).add(result, seat)
+            self.by_seat.setdefault(seat, PlayerStats()).add(result, seat)
+
+    def merge(self, other: "BatchStats") -> None:
+        self.games += other.games
+        for strategy, stats in other.by_strategy.items():
+            self.by_strategy.setdefault(strategy, PlayerStats()).merge(stats)
+        for seat, stats in other.by_seat.items():
+            self.by_seat.setdefault(seat, PlayerStats()).merge(stats)
+
+    def to_dict(self) -> dict:
+        """JSON-safe form, for shipping partial aggregates between machines"""
+        return {
+            "games": self.games,
+            "by_strategy": {
+                s: stats.to_dict() for s, stats in self.by_strategy.items()
+            },
+            "by_seat": {
+                str(seat): stats.to_dict() for seat, stats in self.by_seat.items()
+            },
+        }
+
+    @staticmethod
+    def from_dict(data: dict) -> "BatchStats":
+        stats = BatchStats()
+        stats.games = data["games"]
+        stats.by_strategy = {
+            s: PlayerStats.from_dict(d) for s, d in data["by_strategy"].items()
+        }
+        stats.by_seat = {
+            int(seat): PlayerStats.from_dict(d) for seat, d in data["by_seat"].items()
+        }
+        return stats
+
+    def summary(self) -> str:
+        lines = ["{} games".format(self.games)]
+        for strategy, stats in sorted(self.by_strategy.items()):
+            lines.append("\t{}: {}".format(strategy, stats))
+        for seat, stats in sorted(self.by_seat.items()):
+            lines.append("\tSeat {}: {}".format(seat, stats))
+        return "\n".join(lines)
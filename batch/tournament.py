@@ -0,0 +1,332 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from itertools import combinations_with_replacement
+from math import sqrt
+import os
+import random
+import time
+
+import numpy as np
+
+from basic import DecisionBudget, GameResult
+from basic.zobrist import MAX_PLAYERS
+from board import MapSpec, RandomBoard
+from board.spec import STANDARD
+from game import Game
+from strategy import Player
+
+from .checkpoint import load_checkpoint, save_checkpoint
+from .stats import BatchStats
+
+# z-score of the two-sided 95% confidence interval
+Z_95 = 1.96
+
+
+def seed_game(seed: str) -> None:
+    """Seeds both random number generators used by the engine from a single string seed"""
+    random.seed(seed)
+    np.random.seed(random.getrandbits(32))
+
+
+def play_game(
+    lineup: tuple[type[Player], ...],
+    seed: str,
+    force_quit_after_round: int,
+    per_call_budget: float | None = None,
+    per_game_budget: float | None = None,
+    validate_every: int = 0,
+    map_spec: MapSpec = STANDARD,
+    factored: bool = False,
+) -> GameResult:
+    """Plays one headless game with `lineup` seated in order"""
+    seed_game(seed)
+    Player.reset_ids()
+    players = [strategy() for strategy in lineup]
+    for player in players:
+        player.factored = factored
+    budget = DecisionBudget(len(players), per_call_budget, per_game_budget)
+    game = Game(
+        players,
+        RandomBoard(map_spec),
+        None,
+        force_quit_after_round,
+        float("inf"),
+        budget=budget,
+        validate_every=validate_every,
+    )
+    try:
+        return game.play()
+    except ValueError:
+        if game.rounds < force_quit_after_round:
+            raise
+        return game.result()
+
+
+def wilson_interval(wins: int, games: int, z: float = Z_95) -> tuple[float, float]:
+    """Wilson score interval for a win rate of `wins` out of `games`"""
+    if games == 0:
+        return 0.0, 1.0
+    p = wins / games
+    denominator = 1 + z * z / games
+    center = (p + z * z / (2 * games)) / denominator
+    half_width = z * sqrt(p * (1 - p) / games + z * z / (4 * games * games))
+    half_width /= denominator
+    return max(0.0, center - half_width), min(1.0, center + half_width)
+
+
+class Matchup:
+    def __init__(self, matchup_id: int, lineup: tuple[type[Player], ...]) -> None:
+        self.matchup_id = matchup_id
+        self.lineup = lineup
+        self.strategies: list[type[Player]] = list(dict.fromkeys(lineup))
+        self.games_started = 0
+        self.games_played = 0
+        self.draws = 0
+        self.wins: dict[type[Player], int] = {s: 0 for s in self.strategies}
+        self.seat_wins: list[int] = [0] * len(lineup)
+        # finished games at each rotation of the lineup, see `seating`
+        self.rotation_games: list[int] = [0] * len(lineup)
+        self.stats = BatchStats()
+        self.done = False
+        # game indices recorded, and those started but lost to a restart
+        self.completed: set[int] = set()
+        # results are recorded in game index order, these came in ahead of their turn
+        self.next_index = 0
+        self.arrived: dict[int, tuple[GameResult | None, str | None]] = {}
+        self.retry: list[int] = []
+        self.failures: list[tuple[int, str]] = []
+
+    def __str__(self) -> str:
+        return "[{}]".format(", ".join(s.__name__ for s in self.lineup))
+
+    def seating(self, game_index: int) -> tuple[type[Player], ...]:
+        """Rotates the lineup so every strategy spends equal time in every seat"""
+        k = game_index % len(self.lineup)
+        return self.lineup[k:] + self.lineup[:k]
+
+    def next_game(self) -> int:
+        if self.retry:
+            return self.retry.pop(0)
+        self.games_started += 1
+        return self.games_started - 1
+
+    def record(self, game_index: int, result: GameResult) -> None:
+        self.completed.add(game_index)
+        self.rotation_games[game_index % len(self.lineup)] += 1
+        self.games_played += 1
+        self.stats.add(result)
+        if result.winner is None:
+            self.draws += 1
+            return
+        self.wins[self.seating(game_index)[result.winner]] += 1
+        self.seat_wins[result.winner] += 1
+
+    def fail(self, game_index: int, error: str) -> None:
+        """Keeps a game that raised out of the aggregates, so one bad game cannot end the run"""
+        self.completed.add(game_index)
+        self.rotation_games[game_index % len(self.lineup)] += 1
+        self.failures.append((game_index, error))
+
+    def win_rate(self, strategy: type[Player]) -> float:
+        return self.wins[strategy] / self.games_played if self.games_played else 0.0
+
+    def interval(self, strategy: type[Player]) -> tuple[float, float]:
+        return wilson_interval(self.wins[strategy], self.games_played)
+
+    def converged(self, half_width: float) -> bool:
+        for strategy in self.strategies:
+            low, high = self.interval(strategy)
+            if (high - low) / 2 > half_width:
+                return False
+        return True
+
+
+class Tournament:
+    def __init__(
+        self,
+        strategies: list[type[Player]],
+        seat_counts: list[int],
+        seed: int = 0,
+        half_width: float = 0.05,
+        min_games: int = 30,
+        max_games: int = 2000,
+        force_quit_after_round: int = 1000,
+        workers: int | None = None,
+        per_call_budget: float | None = None,
+        per_game_budget: float | None = None,
+        validate_every: int = 0,
+        map_spec: MapSpec = STANDARD,
+        checkpoint_dir: str | None = None,
+        checkpoint_every: float = 60.0,
+        factored: bool = False,
+    ) -> None:
+        self.seed = seed
+        self.half_width = half_width
+        self.min_games = min_games
+        self.max_games = max_games
+        self.force_quit_after_round = force_quit_after_round
+        self.workers = workers or os.cpu_count() or 1
+        self.per_call_budget = per_call_budget
+        self.per_game_budget = per_game_budget
+        self.validate_every = validate_every
+        self.map_spec = map_spec
+        self.checkpoint_dir = checkpoint_dir
+        self.checkpoint_every = checkpoint_every
+        self.factored = factored
+        self.matchups: list[Matchup] = []
+        for seats in seat_counts:
+            assert (
+                2 <= seats <= MAX_PLAYERS
+            ), "Games need between 2 and {} seats".format(MAX_PLAYERS)
+            for lineup in combinations_with_replacement(strategies, seats):
+                # a lineup of a single strategy only ever plays itself
+                if len(set(lineup)) > 1:
+                    self.matchups.append(Matchup(len(self.matchups), lineup))
+
+    @staticmethod
+    def resume(directory: str, workers: int | None = None) -> "Tournament":
+        """Loads the tournament checkpointed in `directory`, `run` then carries on from there"""
+        tournament: Tournament = load_checkpoint(directory)
+        tournament.checkpoint_dir = directory
+        if workers:
+            tournament.workers = workers
+        return tournament
+
+    def save_checkpoint(self) -> None:
+        if self.checkpoint_dir is not None:
+            save_checkpoint(self.checkpoint_dir, self)
+
+    def game_seed(self, matchup: Matchup, game_index: int) -> str:
+        return "{}-{}-{}".format(self.seed, matchup.matchup_id, game_index)
+
+    def should_stop(self, matchup: Matchup) -> bool:
+        if len(matchup.completed) >= self.max_games:
+            return True
+        # only stop on whole rotations so that seat advantage cancels out
+        if min(matchup.rotation_games) != max(matchup.rotation_games):
+            return False
+        return matchup.games_played >= self.min_games and matchup.converged(
+            self.half_width
+        )
+
+    def consume(self, matchup: Matchup) -> None:
+        """
+        Records the matchup's arrived results in game index order and stops it at the
+        first game that settles it, so where it stops does not depend on which games
+        happened to finish first
+        """
+        while not matchup.done and matchup.next_index in matchup.arrived:
+            result, error = matchup.arrived.pop(matchup.next_index)
+            if error is None:
+                matchup.record(matchup.next_index, result)
+            else:
+                matchup.fail(matchup.next_index, error)
+            matchup.next_index += 1
+            matchup.done = self.should_stop(matchup)
+        if matchup.done:
+            matchup.arrived.clear()
+
+    def run(self) -> list[Matchup]:
+        """
+        Plays every matchup across a process pool until each one converges. With a
+        `checkpoint_dir` the progress is saved every `checkpoint_every` seconds and on the
+        way out; games are seeded by index and recorded in index order, so a resumed run
+        ends with the same results as one that was never stopped.
+        """
+        for matchup in self.matchups:
+            if not matchup.done:
+                matchup.retry = sorted(
+                    set(range(matchup.games_started))
+                    - matchup.completed
+                    - set(matchup.arrived)
+                )
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            max_in_flight = 2 * self.workers
+            in_flight: dict[Future, tuple[Matchup, int]] = {}
+            last_checkpoint = time.monotonic()
+
+            def submit_next() -> bool:
+                active = [
+                    m
+                    for m in self.matchups
+                    if not m.done and (m.retry or m.games_started < self.max_games)
+                ]
+                if not active:
+                    return False
+                matchup = min(active, key=lambda m: m.games_started - len(m.retry))
+                game_index = matchup.next_game()
+                future = pool.submit(
+                    play_game,
+                    matchup.seating(game_index),
+                    self.game_seed(matchup, game_index),
+                    self.force_quit_after_round,
+                    self.per_call_budget,
+                    self.per_game_budget,
+                    self.validate_every,
+                    self.map_spec,
+                    self.factored,
+                )
+                in_flight[future] = (matchup, game_index)
+                return True
+
+            try:
+                while len(in_flight) < max_in_flight and submit_next():
+                    pass
+                while in_flight:
+                    finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        matchup, game_index = in_flight.pop(future)
+                        if matchup.done:
+                            continue
+                        error = future.exception()
+                        if isinstance(error, BrokenProcessPool):
+                            # a worker died rather than the game failing, replay it on resume
+                            raise error
+                        if error is not None:
+                            matchup.arrived[game_index] = None, repr(error)
+                        else:
+                            matchup.arrived[game_index] = future.result(), None
+                        self.consume(matchup)
+                    if time.monotonic() - last_checkpoint >= self.checkpoint_every:
+                        self.save_checkpoint()
+                        last_checkpoint = time.monotonic()
+                    while len(in_flight) < max_in_flight and submit_next():
+                        pass
+            finally:
+                self.save_checkpoint()
+        return self.matchups
+
+    def stats(self) -> BatchStats:
+        """Aggregates over every game played in the tournament"""
+        stats = BatchStats()
+        for matchup in self.matchups:
+            stats.merge(matchup.stats)
+        return stats
+
+    def summary(self) -> str:
+        lines = []
+        for matchup in self.matchups:
+            lines.append(
+                "Matchup {} after {} games ({} force quit), seat wins {}".format(
+                    matchup, matchup.games_played, matchup.draws, matchup.seat_wins
+                )
+            )
+            for game_index, error in matchup.failures:
+                lines.append(
+                    "\tGame {} (seed {}) failed: {}".format(
+                        game_index, self.game_seed(matchup, game_index), error
+                    )
+                )
+            for strategy in matchup.strategies:
+                low, high = matchup.interval(strategy)
+                lines.append(
+                    "\t{} x{} wins {:.3f} (95% CI {:.3f}-{:.3f})".format(
+                        strategy.__name__,
+                        matchup.lineup.count(strategy),
+                        matchup.win_rate(strategy),
+                        low,
+                        high,
+                    )
+                )
+        lines.append("Overall after {}".format(self.stats().summary()))
+        return "\n".join(lines)
@@ -1,5 +1,7 @@
 from .board import Board
+from .layouts import LayoutBatch
 from .position import Position
 from .random import RandomBoard
+from .spec import MapSpec
 
-__all__ = ["Board", "Position", "RandomBoard"]
+__all__ = ["Board", "LayoutBatch", "MapSpec", "Position", "RandomBoard"]
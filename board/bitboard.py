@@ -0,0 +1,154 @@
+from basic.zobrist import MAX_PLAYERS
+
+ROADS = [
+    ("left", "left_road"),
+    ("right", "right_road"),
+    ("up", "up_road"),
+    ("down", "down_road"),
+]
+ROAD_DIRECTIONS = {road_name: direction for direction, road_name in ROADS}
+
+
+def bits(mask: int):
+    """Indices of the set bits of `mask`, lowest first"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def nth_bit(mask: int, n: int) -> int:
+    """Index of the `n`-th lowest set bit of `mask`, counting from 0"""
+    for _ in range(n):
+        mask &= mask - 1
+    return (mask & -mask).bit_length() - 1
+
+
+class Bitboard:
+    """
+    Pieces on a board as Python ints with bit `i` for vertex or edge `i`, so the placement
+    rules are a few bitwise operations instead of walks over `Position`s. The board keeps
+    it in step as pieces go down, `Game.validate` checks it against a fresh one.
+    """
+
+    def __init__(self, board) -> None:
+        # static topology
+        self.neighbors: list[int] = []
+        # each vertex's roads in left, right, up, down order, as (road name, edge index)
+        self.roads: list[list[tuple[str, int]]] = []
+        for pos in board.vertices:
+            neighbors = 0
+            roads = []
+            for direction, road_name in ROADS:
+                other = getattr(pos, direction)
+                if other is not None:
+                    neighbors |= 1 << other.index
+                    roads.append((road_name, board.edge_index(pos.pos, road_name)))
+            self.neighbors.append(neighbors)
+            self.roads.append(roads)
+        self.edge_ends: list[int] = [
+            (1 << pos.index) | (1 << getattr(pos, ROAD_DIRECTIONS[road_name]).index)
+            for pos, road_name in board.edges
+        ]
+
+        # pieces
+        self.occupied = 0  # vertices with a settlement or city
+        self.blocked = 0  # occupied vertices and their neighbors, the distance rule
+        self.built = 0  # edges with a road
+        self.settlements = [0] * MAX_PLAYERS
+        self.edges = [0] * MAX_PLAYERS
+        # vertices touching exactly one, and two or more, of the player's roads
+        self.one_road = [0] * MAX_PLAYERS
+        self.more_roads = [0] * MAX_PLAYERS
+        for pos in board.vertices:
+            if pos.fixture is not None:
+                self.settle(pos.index, pos.fixture)
+        for e, (pos, road_name) in enumerate(board.edges):
+            owner = getattr(pos, road_name)
+            if owner is not None:
+                self.build_road(e, owner)
+
+    def __deepcopy__(self, memo) -> "Bitboard":
+        # the topology never changes, so copies share it
+        copy = Bitboard.__new__(Bitboard)
+        copy.__dict__.update(self.__dict__)
+        copy.settlements = list(self.settlements)
+        copy.edges = list(self.edges)
+        copy.one_road = list(self.one_road)
+        copy.more_roads = list(self.more_roads)
+        return copy
+
+    def state(self) -> tuple:
+        """Everything that changes as pieces go down, for comparing against a recompute"""
+        return (
+            self.occupied,
+            self.blocked,
+            self.built,
+            self.settlements,
+            self.edges,
+            self.one_road,
+            self.more_roads,
+        )
+
+    def settle(self, v: int, player_id: int) -> None:
+        self.occupied |= 1 << v
+        self.blocked |= (1 << v) | self.neighbors[v]
+        self.settlements[player_id] |= 1 << v
+
+    def build_road(self, e: int, player_id: int) -> None:
+        self.built |= 1 << e
+        self.edges[player_id] |= 1 << e
+        for v in bits(self.edge_ends[e]):
+            self.more_roads[player_id] |= self.one_road[player_id] & (1 << v)
+            self.one_road[player_id] = (self.one_road[player_id] | (1 << v)) & ~(
+                self.more_roads[player_id]
+            )
+
+    def can_settle(self, v: int) -> bool:
+        return not self.blocked >> v & 1
+
+    def settlement_options(self, player_id: int) -> int:
+        """Free vertices at the end of exactly one of the player's roads"""
+        return self.one_road[player_id] & ~self.blocked
+
+    def road_frontier(self, player_id: int) -> int:
+        """Vertices touching one of the player's roads"""
+        return self.one_road[player_id] | self.more_roads[player_id]
+
+    def road_options(self, player_id: int) -> list[tuple[int, str]]:
+        """
+        Empty roads next to the player's roads as (vertex, road name), vertex by vertex in
+        row-major order. A road between two frontier vertices is listed from both ends.
+        """
+        return [(v, road_name) for v, road_name, _ in self.road_edges(player_id)]
+
+    def road_edges(self, player_id: int) -> list[tuple[int, str, int]]:
+        """`road_options` with the edge index of each"""
+        options = []
+        for v in bits(self.road_frontier(player_id)):
+            for road_name, e in self.roads[v]:
+                if not self.built >> e & 1:
+                    options.append((v, road_name, e))
+        return options
+
+    def empty_roads(self, v: int) -> int:
+        return sum(1 for _, e in self.roads[v] if not self.built >> e & 1)
+
+    def second_road_counts(self, player_id: int) -> list[int]:
+        """
+        How many road options each of `road_options` leaves once built, i.e. the number of
+        Road Building pairs starting with it, without building anything
+        """
+        options = self.road_edges(player_id)
+        frontier = self.road_frontier(player_id)
+        counts = []
+        for v, _, e in options:
+            far_end = self.edge_ends[e] & ~(1 << v)
+            if far_end & frontier:
+                # the road was listed from both ends
+                counts.append(len(options) - 2)
+            else:
+                # the far end joins the frontier with its other empty roads
+                w = far_end.bit_length() - 1
+                counts.append(len(options) - 2 + self.empty_roads(w))
+        return counts
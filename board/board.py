@@ -1,25 +1,50 @@
-from basic import Tile, Port
+from basic import Tile, Port, Zobrist
 
+from .bitboard import Bitboard, bits
 from .position import Position
+from .spec import STANDARD, MapSpec
 
 
 class Board:
-    def __init__(self, tiles: list[list[Tile]]) -> None:
-        assert len(tiles) == 5, "Board must have 5 rows"
+    def __init__(self, tiles: list[list[Tile]], spec: MapSpec = STANDARD) -> None:
+        assert len(tiles) == len(spec.row_widths), "Board must have {} rows".format(
+            len(spec.row_widths)
+        )
         for i, row in enumerate(tiles):
-            assert len(row) == 5 - abs(i - 2), "Row {} must have {} tiles".format(
-                i, 5 - abs(i - 2)
+            assert len(row) == spec.row_widths[i], "Row {} must have {} tiles".format(
+                i, spec.row_widths[i]
             )
 
+        self.spec = spec
         self.tiles: list[list[Tile]] = tiles
         self.positions: list[list[Position]] = []
+        # flat indexing of the board in row-major order
+        self.vertices: list[Position] = []
+        self.edges: list[tuple[Position, str]] = []  # each road once, as right or down
+        self.edge_indices: dict[tuple[tuple[int, int], str], int] = {}
+        self.tile_indices: dict[tuple[int, int], int] = {
+            tile.pos: i for i, tile in enumerate(t for row in tiles for t in row)
+        }
+        self.robber: Tile | None = next(
+            (tile for row in tiles for tile in row if tile.has_knight), None
+        )
+        # knight options per player, dropped whenever the robber moves or a settlement lands
+        self.knight_options: dict[int, list[tuple[Tile, int | None]]] = {}
 
         self._set_up_positions()
+        self._index_positions()
+        self.bitboard = Bitboard(self)
+
+        # Zobrist hash of the pieces on the board, see `compute_state_hash`
+        self.zobrist = Zobrist(
+            len(self.vertices), len(self.edges), len(self.tile_indices)
+        )
+        self.state_hash = self.compute_state_hash()
 
     def __str__(self) -> str:
         s = ""
         for r, row in enumerate(self.tiles):
-            pad = " " * (abs(r - 2) * 2)
+            pad = " " * (abs(r - self.spec.radius) * 2)
             s += pad + " ".join(list(map(str, row))) + pad + "\n"
         return s
 
@@ -31,28 +56,80 @@ class Board:
         r, c = pos
         return self.tiles[r][c]
 
+    def edge_index(self, pos: tuple[int, int], road_name: str) -> int:
+        return self.edge_indices[(pos, road_name)]
+
     def get_positions_owned_by_player(self, player_id: int) -> list[Position]:
         return [
             pos for row in self.positions for pos in row if player_id == pos.fixture
         ]
 
     def get_road_options(self, player_id: int) -> list[tuple[Position, str]]:
-        options: list[tuple[Position, str]] = []
-        for row in self.positions:
-            for pos in row:
-                owns_road = (
-                    (pos.left_road == player_id)
-                    or (pos.right_road == player_id)
-                    or (pos.up_road == player_id)
-                    or (pos.down_road == player_id)
-                )
-                empty_road_names = pos.get_available_roads()
-                if owns_road:
-                    for road_name in empty_road_names:
-                        options.append((pos, road_name))
-        return options
+        return [
+            (self.vertices[v], road_name)
+            for v, road_name in self.bitboard.road_options(player_id)
+        ]
+
+    def get_settlement_options(self, player_id: int) -> list[Position]:
+        """Free vertices at the end of exactly one of the player's roads, row-major"""
+        return [
+            self.vertices[v] for v in bits(self.bitboard.settlement_options(player_id))
+        ]
+
+    def robber_key(self) -> int:
+        if self.robber is None:
+            return self.zobrist.robber[0]
+        return self.zobrist.robber[1 + self.tile_indices[self.robber.pos]]
+
+    def move_robber(self, pos: tuple[int, int]) -> None:
+        self.state_hash ^= self.robber_key()
+        if self.robber is not None:
+            self.robber.has_knight = False
+        self.robber = self.get_tile(pos)
+        self.robber.has_knight = True
+        self.state_hash ^= self.robber_key()
+        self.knight_options.clear()
+
+    def add_settlement(self, pos: Position, player_id: int) -> None:
+        pos.fixture = player_id
+        pos.fixture_type = 0
+        self.state_hash ^= self.zobrist.vertices[pos.index][player_id][1]
+        self.bitboard.settle(pos.index, player_id)
+        for tile in pos.adjacent_tiles:
+            tile.owning_player_ids.add(player_id)
+        self.knight_options.clear()
+
+    def build_city(self, pos: Position) -> None:
+        assert pos.fixture is not None and pos.fixture_type == 0
+        keys = self.zobrist.vertices[pos.index][pos.fixture]
+        pos.fixture_type = 1
+        self.state_hash ^= keys[1] ^ keys[2]
+
+    def road_built(self, pos: Position, road_name: str, player_id: int) -> None:
+        """Called by `Position.build_road` to hash in the new road"""
+        e = self.edge_index(pos.pos, road_name)
+        self.state_hash ^= self.zobrist.edges[e][1 + player_id]
+        self.bitboard.build_road(e, player_id)
+
+    def compute_state_hash(self) -> int:
+        """Hash of the board from scratch, which `state_hash` keeps equal to incrementally"""
+        h = self.robber_key()
+        for pos in self.vertices:
+            if pos.fixture is not None:
+                h ^= self.zobrist.vertices[pos.index][pos.fixture][1 + pos.fixture_type]
+        for i, (pos, road_name) in enumerate(self.edges):
+            owner = getattr(pos, road_name)
+            if owner is not None:
+                h ^= self.zobrist.edges[i][1 + owner]
+        return h
 
     def get_knight_options(self, player_id: int) -> list[tuple[Tile, int | None]]:
+        """Tiles the robber can move to with the player to steal from, shared between calls so do not modify"""
+        if player_id not in self.knight_options:
+            self.knight_options[player_id] = self._find_knight_options(player_id)
+        return self.knight_options[player_id]
+
+    def _find_knight_options(self, player_id: int) -> list[tuple[Tile, int | None]]:
         knight_options: list[tuple[Tile, int | None]] = []
         for row in self.tiles:
             for tile in row:
@@ -65,13 +142,52 @@ class Board:
                         knight_options.append((tile, None))
         return knight_options
 
+    def _index_positions(self) -> None:
+        opposite = {
+            "right_road": ("right", "left_road"),
+            "down_road": ("down", "up_road"),
+        }
+        for row in self.positions:
+            for pos in row:
+                pos.index = len(self.vertices)
+                pos.board = self
+                self.vertices.append(pos)
+        for pos in self.vertices:
+            for road_name, (direction, other_road_name) in opposite.items():
+                other = getattr(pos, direction)
+                if other is not None:
+                    self.edge_indices[(pos.pos, road_name)] = len(self.edges)
+                    self.edge_indices[(other.pos, other_road_name)] = len(self.edges)
+                    self.edges.append((pos, road_name))
+
+    def coast(self) -> list[Position]:
+        """Vertices along the edge of the map in order, clockwise from the top left"""
+        start = self.positions[0][0]
+        coast = [start]
+        prev, pos = None, start
+        while True:
+            for other in [pos.right, pos.down, pos.left, pos.up]:
+                # a coast edge borders a single tile
+                if (
+                    other is not None
+                    and other is not prev
+                    and sum(t in other.adjacent_tiles for t in pos.adjacent_tiles) == 1
+                ):
+                    prev, pos = pos, other
+                    break
+            if pos is start:
+                return coast
+            coast.append(pos)
+
     def _set_up_positions(self) -> None:
+        R = self.spec.radius
         self.positions = [
-            [Position(r, c) for c in range(j)]
-            for r, j in [(0, 7), (1, 9), (2, 11), (3, 11), (4, 9), (5, 7)]
+            [Position(r, c) for c in range(self.spec.vertex_row_width(r))]
+            for r in range(self.spec.num_vertex_rows())
         ]
-        grow = {0: 0, 1: 1, 2: 2, 3: 2, 4: 3, 5: 4}
-        gadj = {1: 0, 2: 1, 3: 3, 4: 4}
+        # tile rows below and above each vertex row
+        grow = {r: r if r <= R else r - 1 for r in range(len(self.positions))}
+        gadj = {r: r - 1 if r <= R else r for r in range(1, len(self.positions) - 1)}
         # figure out adjacent tiles
         for r, row in enumerate(self.positions):
             for c, pos in enumerate(row):
@@ -94,31 +210,23 @@ class Board:
                 if c + 1 < len(row):
                     pos.right = row[c + 1]
                     row[c + 1].left = pos
-                if c % 2 == 0 and r < 2:
+                if c % 2 == 0 and r < R:
                     pos.down = self.positions[r + 1][c + 1]
                     self.positions[r + 1][c + 1].up = pos
-                if c % 2 == 0 and r == 2:
+                if c % 2 == 0 and r == R:
                     pos.down = self.positions[r + 1][c]
                     self.positions[r + 1][c].up = pos
-                if c % 2 == 0 and r > 3:
+                if c % 2 == 0 and r > R + 1:
                     pos.up = self.positions[r - 1][c + 1]
                     self.positions[r - 1][c + 1].down = pos
         # add ports
-        self.positions[0][2].adjacent_port = Port.THREE_ONE
-        self.positions[0][3].adjacent_port = Port.THREE_ONE
-        self.positions[0][5].adjacent_port = Port.THREE_ONE
-        self.positions[0][6].adjacent_port = Port.THREE_ONE
-        self.positions[1][0].adjacent_port = Port.SHEEP
-        self.positions[1][1].adjacent_port = Port.SHEEP
-        self.positions[1][8].adjacent_port = Port.MUD
-        self.positions[2][0].adjacent_port = Port.THREE_ONE
-        self.positions[2][9].adjacent_port = Port.MUD
-        self.positions[3][0].adjacent_port = Port.THREE_ONE
-        self.positions[3][9].adjacent_port = Port.TREE
-        self.positions[4][0].adjacent_port = Port.ROCK
-        self.positions[4][1].adjacent_port = Port.ROCK
-        self.positions[4][8].adjacent_port = Port.TREE
-        self.positions[5][2].adjacent_port = Port.WHEAT
-        self.positions[5][3].adjacent_port = Port.WHEAT
-        self.positions[5][5].adjacent_port = Port.THREE_ONE
-        self.positions[5][6].adjacent_port = Port.THREE_ONE
+        if self.spec.port_vertices is not None:
+            for pos, port in self.spec.port_vertices.items():
+                self.get_position(pos).adjacent_port = port
+        else:
+            # spread along the coast, each port on the two ends of one coast edge
+            coast = self.coast()
+            for i, port in enumerate(self.spec.ports):
+                k = i * len(coast) // len(self.spec.ports)
+                coast[k].adjacent_port = port
+                coast[(k + 1) % len(coast)].adjacent_port = port
@@ -0,0 +1,174 @@
+from collections import OrderedDict
+from itertools import chain
+import os
+import threading
+
+import numpy as np
+
+from basic import Port, Tile
+
+from .board import Board
+from .layouts import _fnv1a, layout_hash
+
+# Columns of the per-vertex feature matrix
+PIPS = 0  # total pips of the adjacent tiles
+RESOURCE_PIPS = 1  # pips of the adjacent tiles by resource, one column per resource
+DESERTS = 6  # number of adjacent desert tiles
+PORTS = 7  # one-hot adjacent port type, one column per port type
+NUM_FEATURES = PORTS + 6
+
+
+def pips(value: int) -> int:
+    """Number of the 36 dice combinations that roll `value`, shifted so the desert still scores"""
+    return 10 - abs(value - 7)
+
+
+def compute_vertex_features(board: Board) -> np.ndarray:
+    """Static features of every vertex in row-major position order, shape (vertices, NUM_FEATURES)"""
+    positions = list(chain(*board.positions))
+    features = np.zeros((len(positions), NUM_FEATURES), dtype=np.float32)
+    for v, pos in enumerate(positions):
+        for tile in pos.adjacent_tiles:
+            if tile.tile == Tile.DESERT:
+                features[v, DESERTS] += 1
+                continue
+            features[v, PIPS] += pips(tile.value)
+            features[v, RESOURCE_PIPS + tile.tile] += pips(tile.value)
+        if pos.adjacent_port is not None:
+            features[v, PORTS + pos.adjacent_port] = 1
+    return features
+
+
+def feature_key(board: Board) -> int:
+    """
+    Layout hash mixed with the shape of the map and where its ports are, which the features
+    also depend on. Never 0, which marks an empty disk slot.
+    """
+    # built-in hash() of None differs between processes, so hash explicit codes instead
+    h = layout_hash(board)
+    codes = np.array(
+        [h & 0xFFFFFFFF, h >> 32, len(board.spec.row_widths)]
+        + list(board.spec.row_widths)
+        + [
+            -1 if pos.adjacent_port is None else pos.adjacent_port
+            for pos in board.vertices
+        ],
+        dtype=np.int64,
+    )
+    return int(_fnv1a(codes[None, :])[0]) or 1
+
+
+class FeatureCache:
+    """
+    Per-vertex feature matrices keyed by `feature_key`, with an in-memory LRU in front of
+    an optional memory-mapped store on disk. The disk store keeps one open-addressed table
+    of `slots` entries per number of vertices, and should only have one writer at a time.
+    Safe to share between threads.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 256,
+        path: str | None = None,
+        slots: int = 4096,
+    ) -> None:
+        self.capacity = capacity
+        self.path = path
+        self.slots = slots
+        self.lock = threading.Lock()
+        self.memory: OrderedDict[int, np.ndarray] = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        # (keys, features) memory maps by number of vertices, opened on first use
+        self.stores: dict[int, tuple[np.ndarray, np.ndarray]] = {}
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+
+    def get(self, board: Board) -> np.ndarray:
+        """Returns the (read-only) feature matrix for the board's layout, computing it on a miss"""
+        key = feature_key(board)
+        with self.lock:
+            features = self.memory.get(key)
+            if features is not None:
+                self.memory.move_to_end(key)
+                self.hits += 1
+                return features
+            store = self._store_for(len(board.vertices))
+            features = self._load(store, key)
+            if features is not None:
+                self.disk_hits += 1
+            else:
+                self.misses += 1
+                features = compute_vertex_features(board)
+                self._save(store, key, features)
+            features.flags.writeable = False
+            self.memory[key] = features
+            if len(self.memory) > self.capacity:
+                self.memory.popitem(last=False)
+            return features
+
+    def _store_for(self, num_vertices: int) -> tuple[np.ndarray, np.ndarray] | None:
+        if self.path is None:
+            return None
+        if num_vertices not in self.stores:
+            keys_path = os.path.join(self.path, "keys-{}.npy".format(num_vertices))
+            features_path = os.path.join(
+                self.path, "features-{}.npy".format(num_vertices)
+            )
+            if os.path.exists(keys_path):
+                keys = np.load(keys_path, mmap_mode="r+")
+                features = np.load(features_path, mmap_mode="r+")
+            else:
+                keys = np.lib.format.open_memmap(
+                    keys_path, mode="w+", dtype=np.uint64, shape=(self.slots,)
+                )
+                features = np.lib.format.open_memmap(
+                    features_path,
+                    mode="w+",
+                    dtype=np.float32,
+                    shape=(self.slots, num_vertices, NUM_FEATURES),
+                )
+            self.stores[num_vertices] = (keys, features)
+        return self.stores[num_vertices]
+
+    @staticmethod
+    def _probe(keys: np.ndarray, key: int) -> int:
+        """Slot holding `key`, else the first empty slot on its probe sequence, else its home slot"""
+        slots = len(keys)
+        home = key % slots
+        for i in range(slots):
+            slot = (home + i) % slots
+            if keys[slot] == key or keys[slot] == 0:
+                return slot
+        return home
+
+    def _load(
+        self, store: tuple[np.ndarray, np.ndarray] | None, key: int
+    ) -> np.ndarray | None:
+        if store is None:
+            return None
+        keys, features = store
+        slot = self._probe(keys, key)
+        if keys[slot] != key:
+            return None
+        return np.array(features[slot])
+
+    def _save(
+        self,
+        store: tuple[np.ndarray, np.ndarray] | None,
+        key: int,
+        features: np.ndarray,
+    ) -> None:
+        if store is None:
+            return
+        keys, stored = store
+        slot = self._probe(keys, key)
+        stored[slot] = features
+        keys[slot] = key
+
+    def flush(self) -> None:
+        with self.lock:
+            for keys, features in self.stores.values():
+                keys.flush()
+                features.flush()
@@ -0,0 +1,163 @@
+import numpy as np
+
+from basic import Tile
+
+from .board import Board
+from .spec import STANDARD
+
+# Layouts of the standard map, tiles row-major over rows of 3, 4, 5, 4 and 3 tiles
+ROW_WIDTHS = STANDARD.row_widths
+NUM_TILES = STANDARD.num_tiles
+
+TILE_POOL = np.array(STANDARD.tile_pool, dtype=np.int8)
+NUMBER_POOL = np.array(STANDARD.number_pool, dtype=np.int8)
+
+FNV_OFFSET = np.uint64(0xCBF29CE484222325)
+FNV_PRIME = np.uint64(0x100000001B3)
+
+
+def _tile_coordinates() -> list[tuple[int, int, int]]:
+    """Cube coordinates of each tile index, with the center tile at the origin"""
+    coords = []
+    for r, width in enumerate(ROW_WIDTHS):
+        y = r - 2
+        for c in range(width):
+            x = max(-2, -2 - y) + c
+            coords.append((x, y, -x - y))
+    return coords
+
+
+def _symmetries() -> np.ndarray:
+    """Index permutations for the 12 rotations and reflections of the board"""
+    coords = _tile_coordinates()
+    index = {coord: i for i, coord in enumerate(coords)}
+    perms = []
+    for reflect in [False, True]:
+        for rotation in range(6):
+            perm = []
+            for x, y, z in coords:
+                if reflect:
+                    y, z = z, y
+                for _ in range(rotation):
+                    x, y, z = -z, -x, -y
+                perm.append(index[(x, y, z)])
+            perms.append(perm)
+    return np.array(perms, dtype=np.intp)
+
+
+SYMMETRIES = _symmetries()
+
+
+def generate_layouts(
+    n: int, rng: np.random.Generator | None = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Draws `n` random layouts in one vectorized call. Returns `(tiles, values)`,
+    two int8 arrays of shape (n, 19) in row-major tile order with -1 for the desert value.
+    """
+    rng = rng or np.random.default_rng()
+    tiles = rng.permuted(np.tile(TILE_POOL, (n, 1)), axis=1)
+    numbers = rng.permuted(np.tile(NUMBER_POOL, (n, 1)), axis=1)
+    values = np.full((n, NUM_TILES), -1, dtype=np.int8)
+    # every row has exactly 18 non-desert tiles, so row-major assignment keeps rows apart
+    values[tiles != Tile.DESERT] = numbers.ravel()
+    return tiles, values
+
+
+def _codes(tiles: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Packs each tile into one byte, resource in the high bits and number in the low bits"""
+    return (tiles.astype(np.uint8) << 4) | np.maximum(values, 0).astype(np.uint8)
+
+
+def _fnv1a(codes: np.ndarray) -> np.ndarray:
+    h = np.full(codes.shape[0], FNV_OFFSET, dtype=np.uint64)
+    for j in range(codes.shape[1]):
+        h ^= codes[:, j].astype(np.uint64)
+        h *= FNV_PRIME
+    return h
+
+
+def layout_hashes(tiles: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """64-bit hash of each exact layout, as a uint64 array"""
+    return _fnv1a(_codes(np.atleast_2d(tiles), np.atleast_2d(values)))
+
+
+def canonical_hashes(tiles: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """
+    64-bit hash of each layout that is invariant under the board's rotations and reflections,
+    computed by hashing the lexicographically smallest of the 12 symmetric layouts.
+    Ports are fixed to the frame rather than the tiles, so symmetric layouts can still play differently.
+    """
+    codes = _codes(np.atleast_2d(tiles), np.atleast_2d(values))
+    rows = np.arange(codes.shape[0])
+    best = codes[:, SYMMETRIES[0]]
+    for perm in SYMMETRIES[1:]:
+        candidate = codes[:, perm]
+        differs = candidate != best
+        first = differs.argmax(axis=1)
+        smaller = differs.any(axis=1) & (candidate[rows, first] < best[rows, first])
+        best[smaller] = candidate[smaller]
+    return _fnv1a(best)
+
+
+def layout_of(board: Board) -> tuple[np.ndarray, np.ndarray]:
+    """Reads the `(tiles, values)` layout back out of a board"""
+    tiles = np.array([t.tile for row in board.tiles for t in row], dtype=np.int8)
+    values = np.array([t.value for row in board.tiles for t in row], dtype=np.int8)
+    return tiles, values
+
+
+def layout_hash(board: Board) -> int:
+    return int(layout_hashes(*layout_of(board))[0])
+
+
+def build_board(tiles: np.ndarray, values: np.ndarray) -> Board:
+    """Constructs the board for a single layout, with the robber starting on the desert"""
+    rows: list[list[Tile]] = []
+    i = 0
+    for r, width in enumerate(ROW_WIDTHS):
+        row = []
+        for c in range(width):
+            tile = int(tiles[i])
+            row.append(Tile(tile, int(values[i]), tile == Tile.DESERT, (r, c)))
+            i += 1
+        rows.append(row)
+    return Board(rows)
+
+
+class LayoutBatch:
+    """A batch of layouts held as arrays, boards are only built when a layout is used"""
+
+    def __init__(self, tiles: np.ndarray, values: np.ndarray) -> None:
+        self.tiles = tiles
+        self.values = values
+        self._hashes: np.ndarray | None = None
+        self._canonical_hashes: np.ndarray | None = None
+
+    @staticmethod
+    def random(n: int, rng: np.random.Generator | None = None) -> "LayoutBatch":
+        return LayoutBatch(*generate_layouts(n, rng))
+
+    def __len__(self) -> int:
+        return len(self.tiles)
+
+    @property
+    def hashes(self) -> np.ndarray:
+        if self._hashes is None:
+            self._hashes = layout_hashes(self.tiles, self.values)
+        return self._hashes
+
+    @property
+    def canonical_hashes(self) -> np.ndarray:
+        if self._canonical_hashes is None:
+            self._canonical_hashes = canonical_hashes(self.tiles, self.values)
+        return self._canonical_hashes
+
+    def board(self, i: int) -> Board:
+        return build_board(self.tiles[i], self.values[i])
+
+    def unique(self) -> "LayoutBatch":
+        """Drops layouts that are rotations or reflections of an earlier layout in the batch"""
+        _, first = np.unique(self.canonical_hashes, return_index=True)
+        first.sort()
+        return LayoutBatch(self.tiles[first], self.values[first])
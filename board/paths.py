@@ -0,0 +1,167 @@
+from collections import deque
+
+import numpy as np
+
+from .bitboard import ROAD_DIRECTIONS, ROADS
+from .board import Board
+from .position import Position
+
+# tables depend only on the shape of the map, shared by every board of that shape
+_neighbors: dict[tuple[int, ...], list[list[tuple[int, str]]]] = {}
+_distances: dict[tuple[int, ...], np.ndarray] = {}
+# route searches by map shape, pieces on the board and player, see `route_tree`
+_trees: dict[tuple[tuple[int, ...], int, int], tuple[list[int], list]] = {}
+MAX_TREES = 4096
+
+
+def vertex_neighbors(board: Board) -> list[list[tuple[int, str]]]:
+    """Index of each vertex's neighbors with the road leading to them"""
+    shape = tuple(board.spec.row_widths)
+    if shape not in _neighbors:
+        _neighbors[shape] = [
+            [
+                (getattr(pos, direction).index, road_name)
+                for direction, road_name in ROADS
+                if getattr(pos, direction) is not None
+            ]
+            for pos in board.vertices
+        ]
+    return _neighbors[shape]
+
+
+def distance_table(board: Board) -> np.ndarray:
+    """Read-only matrix of the number of roads between every pair of vertices"""
+    shape = tuple(board.spec.row_widths)
+    if shape not in _distances:
+        neighbors = vertex_neighbors(board)
+        n = len(neighbors)
+        distances = np.full((n, n), -1, dtype=np.int16)
+        for source in range(n):
+            row = distances[source]
+            row[source] = 0
+            queue = deque([source])
+            while queue:
+                v = queue.popleft()
+                for w, _ in neighbors[v]:
+                    if row[w] < 0:
+                        row[w] = row[v] + 1
+                        queue.append(w)
+        distances.flags.writeable = False
+        _distances[shape] = distances
+    return _distances[shape]
+
+
+def road_network(board: Board, player_id: int) -> list[Position]:
+    """Vertices the player can build a road from"""
+    return [
+        pos
+        for pos in board.vertices
+        if pos.fixture == player_id
+        or (
+            pos.fixture is None
+            and any(getattr(pos, road_name) == player_id for _, road_name in ROADS)
+        )
+    ]
+
+
+def search(
+    board: Board, player_id: int, sources: list[Position], goal: int | None = None
+) -> tuple[list[int], list[tuple[int, str] | None]]:
+    """
+    0-1 BFS from `sources` giving the cost of reaching each vertex and the step that
+    reached it, stopping once `goal` is settled. The player's own roads cost nothing,
+    empty ones cost one, and opponents' roads and settlements block the way.
+    """
+    neighbors = vertex_neighbors(board)
+    cost = [len(neighbors)] * len(neighbors)
+    # the step that reached each vertex, a 0-1 BFS keeps only the cheapest
+    parent: list[tuple[int, str] | None] = [None] * len(neighbors)
+    queue: deque[int] = deque()
+    for pos in sources:
+        cost[pos.index] = 0
+        queue.append(pos.index)
+    while queue:
+        v = queue.popleft()
+        if v == goal:
+            break
+        pos = board.vertices[v]
+        for w, road_name in neighbors[v]:
+            owner = getattr(pos, road_name)
+            fixture = board.vertices[w].fixture
+            if (owner is not None and owner != player_id) or (
+                fixture is not None and fixture != player_id
+            ):
+                continue
+            step = 0 if owner == player_id else 1
+            if cost[v] + step < cost[w]:
+                cost[w] = cost[v] + step
+                parent[w] = (v, road_name)
+                if step:
+                    queue.append(w)
+                else:
+                    queue.appendleft(w)
+    return cost, parent
+
+
+def route_tree(
+    board: Board, player_id: int
+) -> tuple[list[int], list[tuple[int, str] | None]]:
+    """
+    `search` over the whole map from the player's road network, cached by the pieces on the
+    board so every target shares one search until someone builds. A vertex's cost and
+    step are settled the first time it leaves the deque, so the tree holds the same
+    steps a search stopped at any one goal would.
+    """
+    # the robber does not block roads, take it out of the hash
+    key = (
+        tuple(board.spec.row_widths),
+        board.state_hash ^ board.robber_key(),
+        player_id,
+    )
+    if key not in _trees:
+        if len(_trees) >= MAX_TREES:
+            _trees.clear()
+        _trees[key] = search(board, player_id, road_network(board, player_id))
+    return _trees[key]
+
+
+def route(
+    board: Board,
+    player_id: int,
+    target: tuple[int, int],
+    sources: list[Position] | None = None,
+) -> list[tuple[Position, str]] | None:
+    """
+    Cheapest roads from `sources`, the player's road network by default, to `target`, as
+    (position, road name) steps in order, see `search` for the costs. None if there is
+    no way. From the road network this walks the cached `route_tree`, so it takes time in
+    the length of the route.
+    """
+    goal = board.get_position(target).index
+    if sources is None:
+        cost, parent = route_tree(board, player_id)
+    else:
+        cost, parent = search(board, player_id, sources, goal)
+    if cost[goal] == len(cost):
+        return None
+    steps = []
+    v = goal
+    while parent[v] is not None and cost[v] > 0:
+        u, road_name = parent[v]
+        steps.append((board.vertices[u], road_name))
+        v = u
+    steps.reverse()
+    return steps
+
+
+def next_road(
+    board: Board,
+    player_id: int,
+    target: tuple[int, int],
+    sources: list[Position] | None = None,
+) -> tuple[Position, str] | None:
+    """First road the player still has to build on the cheapest way to `target`"""
+    steps = route(board, player_id, target, sources)
+    if not steps:
+        return None
+    return steps[0]
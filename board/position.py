@@ -14,6 +14,8 @@ class Position:
         down=None,
     ):
         self.pos = (row, col)
+        self.index = -1  # row-major vertex index, set by the board
+        self.board = None  # board this position belongs to, kept in step with new roads
         self.adjacent_tiles: list[Tile] = adjacent_tiles or []
         self.adjacent_port = adjacent_port
         self.left = left
@@ -45,27 +47,6 @@ class Position:
             adj.append(self.down)
         return adj
 
-    @staticmethod
-    def add_adjacent_pos_to_queue(player: int, pos, next_q, seen, pos_path):
-        def can_go(new_pos, route):
-            if (
-                new_pos
-                and (new_pos.pos not in seen)
-                and (route is None or route == player)
-                and (new_pos.fixture is None or new_pos.fixture == player)
-            ):
-                return True
-            return False
-
-        if can_go(pos.left, pos.left_road):
-            next_q.append(pos_path + [pos.left])
-        if can_go(pos.right, pos.right_road):
-            next_q.append(pos_path + [pos.right])
-        if can_go(pos.up, pos.up_road):
-            next_q.append(pos_path + [pos.up])
-        if can_go(pos.down, pos.down_road):
-            next_q.append(pos_path + [pos.down])
-
     def get_available_roads(self) -> list[str]:
         empty_road_names = ["left_road", "right_road", "up_road", "down_road"]
         road_to_dir = {
@@ -99,11 +80,15 @@ class Position:
             assert self.down and self.down_road is None
             self.down_road = player_id
             self.down.up_road = player_id
+        if self.board is not None:
+            self.board.road_built(self, road_name, player_id)
 
     def can_settle(self):
+        if self.board is not None:
+            return self.board.bitboard.can_settle(self.index)
         if self.fixture is None:
             for adj in self.adjacent_pos():
-                if adj.fixture:
+                if adj.fixture is not None:
                     return False
             return True
         return False
@@ -1,45 +1,45 @@
+import random
+
 import numpy as np
-from itertools import chain
 
 from basic import Tile
 
 from .board import Board
+from .spec import STANDARD, MapSpec
 
 
 class RandomBoard(Board):
-    def __init__(self) -> None:
-        super().__init__(RandomBoard._generate())
+    def __init__(
+        self, spec: MapSpec = STANDARD, rng: random.Random | None = None
+    ) -> None:
+        super().__init__(RandomBoard._generate(spec, rng), spec)
 
     @staticmethod
-    def _generate() -> list[list[Tile]]:
-        tiles = list(
-            chain(
-                [Tile.WHEAT] * 4,
-                [Tile.TREE] * 4,
-                [Tile.SHEEP] * 4,
-                [Tile.MUD] * 3,
-                [Tile.ROCK] * 3,
-                [Tile.DESERT],
-            )
-        )
-        nums = [2, 3, 3, 4, 4, 5, 5, 6, 6, 8, 8, 9, 9, 10, 10, 11, 11, 12]
+    def _generate(spec: MapSpec, rng: random.Random | None) -> list[list[Tile]]:
+        # NumPy's global generator unless the game brings its own
+        randrange = rng.randrange if rng else lambda n: np.random.randint(0, n)
+        tiles = list(spec.tile_pool)
+        nums = list(spec.number_pool)
+        robber_placed = False
         r = 0
         c = 0
         row = []
         cols = []
         while len(tiles):
-            rand = np.random.randint(0, len(tiles))
+            rand = randrange(len(tiles))
             tile = tiles.pop(rand)
             if tile == Tile.DESERT:
                 num = -1
-                has_knight = True
+                # the robber starts on the first desert
+                has_knight = not robber_placed
+                robber_placed = True
             else:
-                rand = np.random.randint(0, len(nums))
+                rand = randrange(len(nums))
                 num = nums.pop(rand)
                 has_knight = False
             row.append(Tile(tile, num, has_knight, (r, c)))
             c += 1
-            if len(row) == 5 - abs(r - 2):
+            if len(row) == spec.row_widths[r]:
                 cols.append(row)
                 row = []
                 r += 1
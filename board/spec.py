@@ -0,0 +1,162 @@
+from itertools import cycle, islice
+
+from basic import Port, Tile
+
+# Pools of the standard map, in the order `RandomBoard` draws from them
+STANDARD_TILES = (
+    [Tile.WHEAT] * 4
+    + [Tile.TREE] * 4
+    + [Tile.SHEEP] * 4
+    + [Tile.MUD] * 3
+    + [Tile.ROCK] * 3
+    + [Tile.DESERT]
+)
+STANDARD_NUMBERS = [2, 3, 3, 4, 4, 5, 5, 6, 6, 8, 8, 9, 9, 10, 10, 11, 11, 12]
+STANDARD_PORT_VERTICES = {
+    (0, 2): Port.THREE_ONE,
+    (0, 3): Port.THREE_ONE,
+    (0, 5): Port.THREE_ONE,
+    (0, 6): Port.THREE_ONE,
+    (1, 0): Port.SHEEP,
+    (1, 1): Port.SHEEP,
+    (1, 8): Port.MUD,
+    (2, 0): Port.THREE_ONE,
+    (2, 9): Port.MUD,
+    (3, 0): Port.THREE_ONE,
+    (3, 9): Port.TREE,
+    (4, 0): Port.ROCK,
+    (4, 1): Port.ROCK,
+    (4, 8): Port.TREE,
+    (5, 2): Port.WHEAT,
+    (5, 3): Port.WHEAT,
+    (5, 5): Port.THREE_ONE,
+    (5, 6): Port.THREE_ONE,
+}
+
+# Interleaved so that any prefix keeps the standard proportions as closely as it can
+SCALED_RESOURCES = [Tile.WHEAT, Tile.TREE, Tile.SHEEP, Tile.MUD, Tile.ROCK] * 3 + [
+    Tile.WHEAT,
+    Tile.TREE,
+    Tile.SHEEP,
+]
+SCALED_NUMBERS = [2, 3, 4, 5, 6, 8, 9, 10, 11, 12, 3, 4, 5, 6, 8, 9, 10, 11]
+SCALED_PORTS = [
+    Port.THREE_ONE,
+    Port.WHEAT,
+    Port.THREE_ONE,
+    Port.TREE,
+    Port.SHEEP,
+    Port.THREE_ONE,
+    Port.MUD,
+    Port.THREE_ONE,
+    Port.ROCK,
+]
+
+
+class MapSpec:
+    """
+    Shape and contents of a map. Tiles sit in `2 * radius + 1` rows that grow by one tile
+    from `min_width` down to the middle row and shrink back, a regular hexagon by default.
+    Ports either sit on explicit vertices or are spread evenly along the coast in the order
+    of `ports`. Pools left out are scaled up from the standard map.
+    """
+
+    def __init__(
+        self,
+        radius: int = 2,
+        min_width: int | None = None,
+        tile_pool: list[int] | None = None,
+        number_pool: list[int] | None = None,
+        ports: list[int] | None = None,
+        port_vertices: dict[tuple[int, int], int] | None = None,
+    ) -> None:
+        assert radius >= 1, "Maps need a radius of at least 1"
+        self.radius = radius
+        self.min_width = radius + 1 if min_width is None else min_width
+        assert self.min_width >= 1, "Rows need at least 1 tile"
+        self.row_widths = [
+            self.min_width + radius - abs(r - radius) for r in range(2 * radius + 1)
+        ]
+        self.num_tiles = sum(self.row_widths)
+        if tile_pool is None:
+            deserts = max(1, round(self.num_tiles / len(STANDARD_TILES)))
+            tile_pool = (
+                list(islice(cycle(SCALED_RESOURCES), self.num_tiles - deserts))
+                + [Tile.DESERT] * deserts
+            )
+        assert len(tile_pool) == self.num_tiles, "Map has {} tiles".format(
+            self.num_tiles
+        )
+        assert Tile.DESERT in tile_pool, "The robber starts on a desert"
+        self.tile_pool = tile_pool
+        num_numbers = self.num_tiles - tile_pool.count(Tile.DESERT)
+        if number_pool is None:
+            number_pool = list(islice(cycle(SCALED_NUMBERS), num_numbers))
+        assert len(number_pool) == num_numbers, "Map needs {} numbers".format(
+            num_numbers
+        )
+        self.number_pool = number_pool
+        self.port_vertices = port_vertices
+        if ports is None and port_vertices is None:
+            # the standard map has 9 ports along 30 coast edges
+            coast = 4 * self.min_width + 8 * radius + 2
+            ports = list(islice(cycle(SCALED_PORTS), round(coast * 9 / 30)))
+        self.ports = ports or []
+
+    def __deepcopy__(self, memo) -> "MapSpec":
+        # never changes after construction, so boards share it
+        return self
+
+    def num_vertex_rows(self) -> int:
+        return len(self.row_widths) + 1
+
+    def vertex_row_width(self, r: int) -> int:
+        """Vertex rows run along the top of each tile row, then along the bottom row"""
+        return 2 * self.row_widths[r if r <= self.radius else r - 1] + 1
+
+    @staticmethod
+    def parse(name: str) -> "MapSpec":
+        """A preset from `MAPS` by name, or the default hexagon of the given radius"""
+        if name in MAPS:
+            return MAPS[name]
+        if name.isdigit():
+            return MapSpec(int(name))
+        raise ValueError(
+            "Unknown map {}, pick one of {} or a radius".format(name, ", ".join(MAPS))
+        )
+
+
+STANDARD = MapSpec(
+    2,
+    tile_pool=STANDARD_TILES,
+    number_pool=STANDARD_NUMBERS,
+    port_vertices=STANDARD_PORT_VERTICES,
+)
+
+# The 5-6 player extension, 30 tiles in rows of 3 to 6 with 11 ports
+EXTENSION = MapSpec(
+    3,
+    min_width=3,
+    tile_pool=[Tile.WHEAT] * 6
+    + [Tile.TREE] * 6
+    + [Tile.SHEEP] * 6
+    + [Tile.MUD] * 5
+    + [Tile.ROCK] * 5
+    + [Tile.DESERT] * 2,
+    number_pool=[2] * 2 + [3, 4, 5, 6, 8, 9, 10, 11] * 3 + [12] * 2,
+    ports=[
+        Port.THREE_ONE,
+        Port.WHEAT,
+        Port.THREE_ONE,
+        Port.SHEEP,
+        Port.TREE,
+        Port.THREE_ONE,
+        Port.MUD,
+        Port.SHEEP,
+        Port.THREE_ONE,
+        Port.ROCK,
+        Port.THREE_ONE,
+    ],
+)
+
+MAPS = {"standard": STANDARD, "extension": EXTENSION}
@@ -1,34 +1,68 @@
 import random
 import time
-
-from basic import Action, DevCardPile, DevCard, GameStats, Tile
-from board import Board, RandomBoard, Position
+from typing import TYPE_CHECKING
+
+from basic import (
+    Action,
+    Cost,
+    DecisionBudget,
+    DevCardPile,
+    DevCard,
+    GameResult,
+    GameStats,
+    Tile,
+    Zobrist,
+)
+from board import Board, MapSpec, RandomBoard, Position
+from board.bitboard import Bitboard
+from board.spec import STANDARD
 from strategy import Player, RandomStrategy, HeuristicStrategy
-from gui import init_gui, draw_gui, quit_gui, add_messages
+from render import Renderer, load_renderer
 import logger
 
+if TYPE_CHECKING:
+    from batch.export import TurnExporter
+
 
 class Game:
     def __init__(
         self,
         players: list[Player],
         board: Board,
-        gui: bool,
+        renderer: Renderer | None,
         force_quit_after_round: int,
         speed: float,
+        exporter: "TurnExporter | None" = None,
+        budget: DecisionBudget | None = None,
+        validate_every: int = 0,
+        rng: random.Random | None = None,
     ) -> None:
         self.players = players
         self.board = board
-        self.gui = gui
+        self.renderer = renderer or Renderer()
         self.force_quit_after_round = force_quit_after_round
         self.speed = speed
+        self.exporter = exporter  # records every action taken, for training data
+        # times every decision, and cuts off the ones over budget if it has limits
+        self.budget = budget or DecisionBudget(len(players))
+        # 0 skips all audits, otherwise every N actions the incrementally kept state is
+        # recomputed from scratch and compared, see `validate`
+        self.validate_every = validate_every
+        self.actions = 0  # actions handled so far
+        # dice, dev cards and steals, the module generator unless games run side by side
+        self.rng = rng
+        if rng is not None:
+            for player in players:
+                player.rng = rng
 
         logger.game("Board is\n{}".format(board))
 
-        self.cards = DevCardPile()
+        self.cards = DevCardPile(rng)
         self.stats = GameStats()
 
-        self.turn = 0  # player id of current turn
+        self.turn = 0  # seat of the player whose turn it is
+        self.rounds = 0  # number of completed rounds
+        self.winner: Player | None = None
 
     ###################
     # General Methods #
@@ -40,93 +74,178 @@ class Game:
                 return player
         raise ValueError("No player with specified ID")
 
+    def decide(self, player: Player, default, decide, *args):
+        """Asks a player for a decision within its time budget, see `DecisionBudget`"""
+        seat = self.players.index(player)
+        interrupts = self.budget.interrupts[seat]
+        decision = self.budget.call(seat, default, decide, *args)
+        if self.budget.interrupts[seat] > interrupts:
+            player.interrupted()
+        return decision
+
+    @property
+    def state_hash(self) -> int:
+        """64-bit Zobrist hash of the game state, kept up to date move by move so reading it is constant time"""
+        h = self.board.state_hash ^ Zobrist.TURN[self.turn] ^ self.stats.state_hash
+        for player in self.players:
+            h ^= player.state_hash
+        return h
+
+    def compute_state_hash(self) -> int:
+        """`state_hash` recomputed from scratch, to check the incremental updates against"""
+        h = self.board.compute_state_hash() ^ Zobrist.TURN[self.turn]
+        h ^= self.stats.state_hash
+        for player in self.players:
+            h ^= player.compute_state_hash()
+        return h
+
     #####################
     # Game Loop Methods #
     #####################
 
     def init_game(self) -> None:
-        if self.gui:
-            init_gui()
+        self.renderer.start(self.board)
 
         logger.game("Initializing settlements and roads")
         for second in [False, True]:
             order = -1 if second else 1
             for player in self.players[::order]:
-                if self.gui:
-                    quit_gui()
-                for action in player.settle(self.board, second):
+                self.renderer.poll()
+                settle = self.decide(
+                    player,
+                    lambda: player.default_settle(self.board, second),
+                    player.settle,
+                    self.board,
+                    second,
+                )
+                for action in settle:
                     self.handle_action(action, player)
-                    if self.gui:
-                        self.write()
-                        draw_gui(self.board)
+                    self.write()
+                    self.renderer.update(self.board)
                 time.sleep(1 / self.speed)
         for player in self.players:
             logger.debug(player)
 
     def game_loop(self, turn: int) -> bool:
-        if self.gui:
-            quit_gui()
-        d6 = random.randint(1, 6) + random.randint(1, 6)
-        logger.game("{} rolled".format(d6))
-        for player in self.players:
-            player.handle_dice_roll(self.board, d6)
+        self.renderer.poll()
+        rng = self.rng or random
+        d6 = rng.randint(1, 6) + rng.randint(1, 6)
+        self.roll(d6)
+        player = self.players[turn]
         if d6 == 7:
             self.handle_action(
-                self.players[turn].choose_robber_action(self.board),
-                self.players[turn],
+                self.decide(
+                    player,
+                    lambda: player.default_robber_action(self.board),
+                    player.choose_robber_action,
+                    self.board,
+                ),
+                player,
             )
-        action = self.players[turn].do(self.board, self.stats)
+
+        def do() -> Action:
+            return self.decide(
+                player,
+                lambda: Action(Action.DO_NOTHING),
+                player.do,
+                self.board,
+                self.stats,
+            )
+
+        action = do()
         while action.action != Action.DO_NOTHING:
-            self.handle_action(action, self.players[turn])
-            action = self.players[turn].do(self.board, self.stats)
-        if self.gui:
-            self.write()
-            draw_gui(self.board)
+            self.handle_action(action, player)
+            action = do()
+        # ending the turn is a decision too, and the most common one
+        if self.exporter:
+            self.exporter.record(self, player, action)
+        return self.end_turn(turn)
+
+    def roll(self, d6: int) -> None:
+        """Pays out a roll of `d6`, or makes players discard on a 7"""
+        logger.game("{} rolled".format(d6))
+        for player in self.players:
+            if d6 != 7:
+                player.collect_resources(self.board, d6)
+                continue
+            num_resources = player.num_resources()
+            if num_resources > 7:
+                num = num_resources // 2
+                discard = self.decide(
+                    player,
+                    lambda: player.default_discard(num),
+                    player.discard_cards,
+                    num,
+                )
+                player.add_resources(-discard)
+
+    def end_turn(self, turn: int) -> bool:
+        """Wraps up the turn of the player in seat `turn`, False once they have won"""
+        self.players[turn].pending = None
+        self.write()
+        self.renderer.update(self.board)
         time.sleep(1 / self.speed)
         for player in self.players:
-            player.check_all_ok()
             player.turn_ended()
         for player in self.players:
             logger.debug(player)
         self.stats.num_dev_cards = len(self.cards.pile)
         logger.debug("Game stats: {}".format(self.stats))
-        vps = self.players[turn].vps(self.board, self.stats)
+        vps = self.players[turn].fast_vps(self.stats)
         if vps >= 10:
             logger.game("Player {} won!".format(self.players[turn].color))
+            self.winner = self.players[turn]
             return False
         else:
             return True
 
     def post_game(self) -> None:
-        if self.gui:
-            while True:
-                # Wait for user to close the window
-                quit_gui()
-                draw_gui(self.board)
+        self.renderer.finish(self.board)
 
     def write(self) -> None:
-        if self.gui:
-            add_messages(logger.messages)
-            logger.print_all()
-            logger.flush()
-        else:
-            logger.print_all()
-            logger.flush()
+        self.renderer.add_messages(logger.messages)
+        logger.print_all()
+        logger.flush()
+
+    def result(self) -> GameResult:
+        """Summarizes the game so far, a game without a winner counts as force quit"""
+
+        def seat(player_id: int) -> int | None:
+            if player_id < 0:
+                return None
+            return self.players.index(self.get_player_by_id(player_id))
+
+        strategies = [type(player).__name__ for player in self.players]
+        return GameResult(
+            strategies=strategies,
+            winner=(
+                self.players.index(self.winner) if self.winner is not None else None
+            ),
+            rounds=self.rounds,
+            vps=[player.vps(self.board, self.stats) for player in self.players],
+            longest_road=seat(self.stats.longest_road_player),
+            largest_army=seat(self.stats.largest_army_player),
+            force_quit=self.winner is None,
+            decision_latency=self.budget.report(strategies),
+        )
 
-    def play(self) -> None:
+    def play(self) -> GameResult:
+        """Plays the game to completion and returns its result"""
         try:
             self.init_game()
-            rnd = 0
-            turn = 0
-            while self.game_loop(turn):
-                self.write()
-                turn = (turn + 1) % len(self.players)
-                if turn == 0:
-                    rnd += 1
-                if rnd >= self.force_quit_after_round:
+            self.turn = 0
+            while self.game_loop(self.turn):
+                self.next_turn()
+                if self.rounds >= self.force_quit_after_round:
+                    if self.exporter:
+                        self.exporter.end_game(self.result())
                     raise ValueError("Game Lasted Too Long")
             self.write()
+            result = self.result()
+            if self.exporter:
+                self.exporter.end_game(result)
             self.post_game()
+            return result
         except:
             logger.game("Game crashed")
             for player in self.players:
@@ -134,14 +253,88 @@ class Game:
             logger.print_all()
             raise
 
+    def next_turn(self) -> None:
+        self.write()
+        self.turn = (self.turn + 1) % len(self.players)
+        if self.turn == 0:
+            self.rounds += 1
+
     ########################
     # Verification Methods #
     ########################
 
-    def check_longest_road(self, player: Player):
+    def validate(self) -> None:
         """
-        Computes the longest continuous road for this player and updates stats if necessary.
+        Recomputes everything the engine keeps incrementally the slow way and raises if any
+        of it disagrees: VPs, piece counts, longest road and largest army, the knight
+        options cache, the robber, the bitboard, and the state hash that covers resources
+        and dev cards.
         """
+        errors: list[str] = []
+
+        def expect(what: str, kept, recomputed) -> None:
+            if kept != recomputed:
+                errors.append(
+                    "{}: kept {} but recomputed {}".format(what, kept, recomputed)
+                )
+
+        board = self.board
+        for player in self.players:
+            try:
+                player.check_all_ok()
+            except ValueError as e:
+                errors.append("Player {}: {}".format(player.color, e))
+            owned = board.get_positions_owned_by_player(player.player_id)
+            name = "Player {} ".format(player.color)
+            expect(
+                name + "settlements",
+                5 - player.settlements_remaining,
+                sum(pos.fixture_type == 0 for pos in owned),
+            )
+            expect(
+                name + "cities",
+                4 - player.cities_remaining,
+                sum(pos.fixture_type == 1 for pos in owned),
+            )
+            expect(
+                name + "VPs", player.fast_vps(self.stats), player.vps(board, self.stats)
+            )
+            if player.longest_road_length > 1:
+                expect(
+                    name + "longest road",
+                    player.longest_road_length,
+                    self.longest_road(player),
+                )
+            if player.player_id in board.knight_options:
+                expect(
+                    name + "knight options",
+                    board.knight_options[player.player_id],
+                    board._find_knight_options(player.player_id),
+                )
+            expect(name + "hash", player.state_hash, player.compute_state_hash())
+        robbers = [tile for row in board.tiles for tile in row if tile.has_knight]
+        expect("Robber", [board.robber] if board.robber else [], robbers)
+        expect("Board hash", board.state_hash, board.compute_state_hash())
+        expect("Bitboard", board.bitboard.state(), Bitboard(board).state())
+        expect(
+            "Largest army",
+            self.stats.largest_army_count,
+            max(player.knights_played for player in self.players),
+        )
+        if self.stats.longest_road_player >= 0:
+            holder = self.get_player_by_id(self.stats.longest_road_player)
+            expect(
+                "Longest road", self.stats.longest_road_count, self.longest_road(holder)
+            )
+        if errors:
+            raise ValueError(
+                "State diverged after {} actions:\n{}".format(
+                    self.actions, "\n".join(errors)
+                )
+            )
+
+    def longest_road(self, player: Player) -> int:
+        """Length of the longest continuous road of this player, from a full search"""
 
         def traverse(player, pos, prev_pos, visited_edges):
             max_length = 0
@@ -189,7 +382,13 @@ class Game:
                             visited_edges.add((pos.pos, next_pos.pos))
                             length = 1 + traverse(player, next_pos, pos, visited_edges)
                             max_road_size = max(max_road_size, length)
+        return max_road_size
 
+    def check_longest_road(self, player: Player):
+        """
+        Computes the longest continuous road for this player and updates stats if necessary.
+        """
+        max_road_size = self.longest_road(player)
         if max_road_size > self.stats.longest_road_count and max_road_size >= 5:
             self.stats.longest_road_count = max_road_size
             self.stats.longest_road_player = player.player_id
@@ -213,23 +412,17 @@ class Game:
         player.settlements_remaining -= 1
         pos_tuple: tuple[int, int] = action.params["pos"]
         pos: Position = self.board.get_position(pos_tuple)
-        pos.fixture = player.player_id
-        pos.fixture_type = 0
+        self.board.add_settlement(pos, player.player_id)
         if pos.adjacent_port:
             player.controlled_ports.add(pos.adjacent_port)
-        for tile in pos.adjacent_tiles:
-            tile.owning_player_ids.add(player.player_id)
         if action.action == Action.SETTLE:
-            player.resources[Tile.MUD] -= 1
-            player.resources[Tile.TREE] -= 1
-            player.resources[Tile.WHEAT] -= 1
-            player.resources[Tile.SHEEP] -= 1
+            player.pay(Cost.SETTLEMENT)
         if action.action == Action.SETTLE_INIT:
             second: bool = action.params["second"]
             if second:
                 for tile in pos.adjacent_tiles:
                     if tile.tile != Tile.DESERT:
-                        player.resources[tile.tile] += 1
+                        player.add_resource(tile.tile)
 
     def handle_build_road(self, action: Action, player: Player) -> None:
         if player.roads_remaining == 0:
@@ -241,11 +434,10 @@ class Game:
         pos.build_road(road_name, player.player_id)
         self.check_longest_road(player)
         if action.action == Action.BUILD_ROAD:
-            player.resources[Tile.MUD] -= 1
-            player.resources[Tile.TREE] -= 1
+            player.pay(Cost.ROAD)
 
     def handle_use_dev_roads(self, action: Action, player: Player) -> None:
-        player.cards.remove(DevCard.ROADS)
+        player.use_dev_card(DevCard.ROADS)
         if player.roads_remaining == 0:
             return
         pos1_tuple: tuple[int, int] = action.params["pos1"]
@@ -253,20 +445,26 @@ class Game:
         road1: str = action.params["road1"]
         pos1.build_road(road1, player.player_id)
         player.roads_remaining -= 1
-        if player.roads_remaining == 0:
-            return
-        pos2_tuple: tuple[int, int] = action.params["pos2"]
-        pos2: Position = self.board.get_position(pos2_tuple)
-        road2: str = action.params["road2"]
-        pos2.build_road(road2, player.player_id)
-        player.roads_remaining -= 1
+        if player.roads_remaining > 0 and action.params["pos2"] is None:
+            # factored, the second road is the player's next decision
+            player.pending = action
+        elif player.roads_remaining > 0:
+            pos2_tuple: tuple[int, int] = action.params["pos2"]
+            pos2: Position = self.board.get_position(pos2_tuple)
+            road2: str = action.params["road2"]
+            pos2.build_road(road2, player.player_id)
+            player.roads_remaining -= 1
+        self.check_longest_road(player)
+
+    def handle_dev_road_step(self, action: Action, player: Player) -> None:
+        player.pending = None
+        self.handle_build_road(action, player)
 
     def handle_get_dev_card(self, action: Action, player: Player) -> None:
-        player.resources[Tile.ROCK] -= 1
-        player.resources[Tile.SHEEP] -= 1
-        player.resources[Tile.WHEAT] -= 1
+        player.pay(Cost.DEV_CARD)
         card = self.cards.draw_top()
-        player.unusable_dev_cards.append(card)
+        self.stats.num_dev_cards = len(self.cards.pile)
+        player.add_dev_card(card)
         logger.debug(
             "Player {} got card {}".format(player.color, DevCard.to_name(card))
         )
@@ -274,58 +472,75 @@ class Game:
     def handle_build_city(self, action: Action, player: Player) -> None:
         player.cities_remaining -= 1
         player.settlements_remaining += 1
-        player.resources[Tile.ROCK] -= 3
-        player.resources[Tile.WHEAT] -= 2
+        player.pay(Cost.CITY)
         pos_tuple: tuple[int, int] = action.params["pos"]
         pos: Position = self.board.get_position(pos_tuple)
-        pos.fixture_type = 1
+        self.board.build_city(pos)
 
-    def handle_four_to_one(self, action: Action, player: Player) -> None:
+    def exchange(self, action: Action, player: Player, rate: int) -> None:
         source: int = action.params["source"]
-        dest: int = action.params["dest"]
-        player.resources[source] -= 4
-        player.resources[dest] += 1
+        dest: int | None = action.params["dest"]
+        if dest is None:
+            # factored, nothing changes hands until the player picks what to get
+            player.pending = action
+            return
+        player.add_resource(source, -rate)
+        player.add_resource(dest)
+
+    def handle_four_to_one(self, action: Action, player: Player) -> None:
+        self.exchange(action, player, 4)
 
     def handle_three_to_one(self, action: Action, player: Player) -> None:
-        source: int = action.params["source"]
-        dest: int = action.params["dest"]
-        player.resources[source] -= 3
-        player.resources[dest] += 1
+        self.exchange(action, player, 3)
 
     def handle_two_to_one(self, action: Action, player: Player) -> None:
-        source: int = action.params["source"]
-        dest: int = action.params["dest"]
-        player.resources[source] -= 2
-        player.resources[dest] += 1
+        self.exchange(action, player, 2)
+
+    def handle_trade_step(self, action: Action, player: Player) -> None:
+        exchange = player.pending
+        player.pending = None
+        handlers = {
+            Action.FOUR_TO_ONE: self.handle_four_to_one,
+            Action.THREE_TO_ONE: self.handle_three_to_one,
+            Action.TWO_TO_ONE: self.handle_two_to_one,
+        }
+        handlers[exchange.action](
+            Action(
+                exchange.action,
+                source=exchange.params["source"],
+                dest=action.params["dest"],
+            ),
+            player,
+        )
 
     def handle_year_of_plenty(self, action: Action, player: Player) -> None:
         resource1: int = action.params["resource1"]
-        resource2: int = action.params["resource2"]
-        player.cards.remove(DevCard.PLENTY)
-        player.resources[resource1] += 1
-        player.resources[resource2] += 1
+        resource2: int | None = action.params["resource2"]
+        player.use_dev_card(DevCard.PLENTY)
+        player.add_resource(resource1)
+        if resource2 is None:
+            # factored, the second resource is the player's next decision
+            player.pending = action
+        else:
+            player.add_resource(resource2)
+
+    def handle_plenty_step(self, action: Action, player: Player) -> None:
+        player.pending = None
+        player.add_resource(action.params["resource"])
 
     def handle_rob(self, action: Action, player: Player) -> None:
         if action.action == Action.USE_KNIGHT:
-            player.cards.remove(DevCard.KNIGHT)
-            player.knights_played += 1
+            player.use_dev_card(DevCard.KNIGHT)
             self.check_largest_army(player)
-        for row in self.board.tiles:
-            for tile in row:
-                tile.has_knight = False
         tile_tuple: tuple[int, int] = action.params["tile"]
-        tile: Tile = self.board.get_tile(tile_tuple)
+        self.board.move_robber(tile_tuple)
         steal_from_id: int | None = action.params["steal_from_id"]
-        tile.has_knight = True
         if steal_from_id is not None:
             player_to_steal_from: "Player" = self.get_player_by_id(steal_from_id)
-            op_resource_cards = player_to_steal_from.get_resource_cards()
-            if len(op_resource_cards):
-                stolen_card = op_resource_cards.pop(
-                    random.randrange(len(op_resource_cards))
-                )
-                player_to_steal_from.set_resource_cards(op_resource_cards)
-                player.resources[stolen_card] += 1
+            stolen_card = player_to_steal_from.random_resource()
+            if stolen_card is not None:
+                player_to_steal_from.add_resource(stolen_card, -1)
+                player.add_resource(stolen_card)
                 logger.debug(
                     "Player {} stole a {} from Player {}".format(
                         player.color,
@@ -347,13 +562,13 @@ class Game:
 
     def handle_monopoly(self, action: Action, player: Player) -> None:
         resource: int = action.params["resource"]
-        player.cards.remove(DevCard.MONOPOLY)
+        player.use_dev_card(DevCard.MONOPOLY)
         total = 0
         for player_to_steal_from in self.players:
             if player_to_steal_from.player_id == player.player_id:
                 continue
-            stealing = player_to_steal_from.resources[resource]
-            player_to_steal_from.resources[resource] = 0
+            stealing = int(player_to_steal_from.resources[resource])
+            player_to_steal_from.add_resource(resource, -stealing)
             total += stealing
             logger.game(
                 "Stole {} {} from Player {} with Monopoly".format(
@@ -362,7 +577,7 @@ class Game:
                     player_to_steal_from.color,
                 )
             )
-        player.resources[resource] += total
+        player.add_resource(resource, total)
 
     def handle_trade(self, action: Action, player: Player) -> None:
         with_player_id: int = action.params["with_player"]
@@ -370,37 +585,44 @@ class Game:
         theirs: list[int] = action.params["theirs"]
         other_player = self.get_player_by_id(with_player_id)
         for res in mine:
-            player.resources[res] -= 1
-            other_player.resources[res] += 1
+            player.add_resource(res, -1)
+            other_player.add_resource(res)
         for res in theirs:
-            other_player.resources[res] -= 1
-            player.resources[res] += 1
+            other_player.add_resource(res, -1)
+            player.add_resource(res)
 
     def handle_propose_trade(self, action: Action, player: Player) -> None:
         logger.game("Player {} proposes trade {}".format(player.color, action))
         logger.debug(
             "Player {} has cards {}".format(
                 player.color,
-                player.get_resource_cards(),
+                player.resources_by_name(),
             )
         )
         accepting_players: list[int] = []
         for other_player in self.players:
             if other_player.player_id == player.player_id:
                 continue
-            if other_player.can_accept_trade(action) and other_player.accepts_trade(
-                action
+            if other_player.can_accept_trade(action) and self.decide(
+                other_player, lambda: False, other_player.accepts_trade, action
             ):
                 logger.game("Player {} accepts the trade".format(other_player.color))
                 accepting_players.append(other_player.player_id)
         if not accepting_players:
             logger.game("No players accepted the trade")
         else:
-            action = player.finalizes_trade(action, accepting_players)
+            proposal = action
+            action = self.decide(
+                player,
+                lambda: player.default_finalizes_trade(proposal, accepting_players),
+                player.finalizes_trade,
+                proposal,
+                accepting_players,
+            )
             logger.debug(
                 "Other player chosen for trade {} with cards {}".format(
                     self.players[action.params["with_player"]].color,
-                    self.players[action.params["with_player"]].get_resource_cards(),
+                    self.players[action.params["with_player"]].resources_by_name(),
                 )
             )
             self.handle_action(action, player)
@@ -424,31 +646,116 @@ class Game:
             Action.GET_DEV_CARD: self.handle_get_dev_card,
             Action.SETTLE_INIT: self.handle_settlement,
             Action.BUILD_ROAD_INIT: self.handle_build_road,
+            Action.DEV_ROAD_STEP: self.handle_dev_road_step,
+            Action.PLENTY_STEP: self.handle_plenty_step,
+            Action.TRADE_STEP: self.handle_trade_step,
         }
 
         if action.action not in action_handlers:
             raise ValueError("Invalid action {}".format(action))
+        if player.pending is not None and action.action not in Action.STEPS:
+            # answering a factored action with anything else gives up its remaining part
+            player.pending = None
         logger.game("Player {} takes action {}".format(player.color, action))
+        if self.exporter:
+            self.exporter.record(self, player, action)
         action_handlers[action.action](action, player)
-
-
-def play(gui: bool, force_quit_after_round: int, speed: float) -> None:
-    board = RandomBoard()
+        self.actions += 1
+        if self.validate_every and self.actions % self.validate_every == 0:
+            self.validate()
+
+
+def play(
+    renderer: str,
+    force_quit_after_round: int,
+    speed: float,
+    export_dir: str | None = None,
+    per_call_budget: float | None = None,
+    per_game_budget: float | None = None,
+    validate_every: int = 0,
+    map_spec: MapSpec = STANDARD,
+    factored: bool = False,
+) -> None:
+    board = RandomBoard(map_spec)
     players: list[Player] = [
         HeuristicStrategy(),
         RandomStrategy(),
         RandomStrategy(),
     ]
-    Game(players, board, gui, force_quit_after_round, speed).play()
-
-
-def play_cli(force_quit_after_round: int, speed: float) -> None:
+    for player in players:
+        player.factored = factored
+    exporter = None
+    if export_dir:
+        from batch.export import TurnExporter
+
+        exporter = TurnExporter(export_dir, board)
+    budget = DecisionBudget(len(players), per_call_budget, per_game_budget)
+    try:
+        result = Game(
+            players,
+            board,
+            load_renderer(renderer),
+            force_quit_after_round,
+            speed,
+            exporter,
+            budget,
+            validate_every,
+        ).play()
+        for strategy, latency in result.decision_latency.items():
+            logger.game("{} decision latency {}".format(strategy, latency))
+        logger.print_all()
+        logger.flush()
+    finally:
+        if exporter:
+            exporter.flush()
+
+
+def play_cli(
+    force_quit_after_round: int,
+    speed: float,
+    export_dir: str | None = None,
+    per_call_budget: float | None = None,
+    per_game_budget: float | None = None,
+    validate_every: int = 0,
+    renderer: str = "none",
+    map_spec: MapSpec = STANDARD,
+    factored: bool = False,
+) -> None:
     try:
-        play(gui=False, force_quit_after_round=force_quit_after_round, speed=speed)
+        play(
+            renderer=renderer,
+            force_quit_after_round=force_quit_after_round,
+            speed=speed,
+            export_dir=export_dir,
+            per_call_budget=per_call_budget,
+            per_game_budget=per_game_budget,
+            validate_every=validate_every,
+            map_spec=map_spec,
+            factored=factored,
+        )
     except:
         logger.print_all()
         raise
 
 
-def play_gui(force_quit_after_round: int, speed: float) -> None:
-    play(gui=True, force_quit_after_round=force_quit_after_round, speed=speed)
+def play_gui(
+    force_quit_after_round: int,
+    speed: float,
+    export_dir: str | None = None,
+    per_call_budget: float | None = None,
+    per_game_budget: float | None = None,
+    validate_every: int = 0,
+    map_spec: MapSpec = STANDARD,
+    factored: bool = False,
+) -> None:
+    play(
+        renderer="pygame",
+        force_quit_after_round=force_quit_after_round,
+        speed=speed,
+        export_dir=export_dir,
+        per_call_budget=per_call_budget,
+        per_game_budget=per_game_budget,
+        validate_every=validate_every,
+        map_spec=map_spec,
+        factored=factored,
+    )
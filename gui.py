@@ -134,10 +134,11 @@ def draw_gui(board: Board) -> None:
     if not root:
         return
     root.fill(BG_COLOR)
+    radius = board.spec.radius
     for row in board.tiles:
         for tile in row:
             r, c = tile.pos
-            pad_row = abs(r - 2) * 30
+            pad_row = abs(r - radius) * 30
             draw_regular_polygon(
                 root,
                 RESOURCE_COLORS[tile.tile],
@@ -156,9 +157,9 @@ def draw_gui(board: Board) -> None:
     for row in board.positions:
         for pos in row:
             r, c = pos.pos
-            pad_row = abs(r - 2) * 30
+            pad_row = abs(r - radius) * 30
             dot_pos = (0, 0)
-            if r < 3:
+            if r <= radius:
                 even_pad = -15 if c % 2 else 0
                 dot_pos = (
                     LEFT_CORNER[0] + pad_row + c * 30 - 30,
@@ -177,7 +178,7 @@ def draw_gui(board: Board) -> None:
                 pygame.draw.circle(root, (50, 50, 50), dot_pos, 3)
             if pos.right_road is not None:
                 d = 1 if c % 2 else -1
-                d = d if r < 3 else -d
+                d = d if r <= radius else -d
                 pygame.draw.line(
                     root,
                     PLAYER_COLORS[pos.right_road],
@@ -1,25 +1,414 @@
 import argparse
 import logger
 
+from board import MapSpec
 from game import play_cli, play_gui
+from strategy import (
+    ExpectimaxStrategy,
+    HeuristicStrategy,
+    RandomStrategy,
+    ValueStrategy,
+)
+from strategy.value import load_evaluator
 
 DEFAULT_VERBOSITY = 3
 DEFAULT_FORCE_QUIT_AFTER_ROUND = 1000
 
+STRATEGIES = {
+    "expectimax": ExpectimaxStrategy,
+    "heuristic": HeuristicStrategy,
+    "random": RandomStrategy,
+    "value": ValueStrategy,
+}
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="CatanSim")
     parser.add_argument("--verbosity", type=int, default=DEFAULT_VERBOSITY)
     parser.add_argument("--no-gui", action="store_false", default=True, dest="gui")
+    parser.add_argument(
+        "--renderer",
+        choices=["none", "terminal", "pygame"],
+        default=None,
+        help="Front end for a single game, pygame unless --no-gui",
+    )
     parser.add_argument(
         "--force-quit-after-round", type=int, default=DEFAULT_FORCE_QUIT_AFTER_ROUND
     )
     parser.add_argument(
         "--speed", type=float, default=100, help="Speed multiplier for the game"
     )
+    parser.add_argument(
+        "--export",
+        default=None,
+        metavar="DIR",
+        help="Write a per-action state record of the game to NumPy shards in DIR",
+    )
+    parser.add_argument(
+        "--call-budget",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Longest a strategy may take over one decision before it gets the default",
+    )
+    parser.add_argument(
+        "--game-budget",
+        type=float,
+        default=None,
+        metavar="SECONDS",
+        help="Total time a strategy may spend deciding over one game",
+    )
+    parser.add_argument(
+        "--map",
+        default="standard",
+        help="Map to play on: standard, extension for 5-6 players, or a hexagon radius",
+    )
+    parser.add_argument(
+        "--validate-every",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Recompute the incrementally kept state every N actions and fail on a mismatch, 0 to skip",
+    )
+    parser.add_argument(
+        "--value-weights",
+        default=None,
+        metavar="NPZ",
+        help="Linear or MLP weights for the value strategy, see strategy.value.load_evaluator",
+    )
+    parser.add_argument(
+        "--factored",
+        action="store_true",
+        help="Offer Road Building, Year of Plenty and bank trades one part at a time",
+    )
+    tournament = parser.add_argument_group("tournament")
+    tournament.add_argument(
+        "--tournament",
+        action="store_true",
+        help="Play a round-robin tournament between strategies instead of one game",
+    )
+    tournament.add_argument(
+        "--strategies", nargs="+", choices=STRATEGIES, default=list(STRATEGIES)
+    )
+    tournament.add_argument("--seats", type=int, nargs="+", default=[3])
+    tournament.add_argument("--workers", type=int, default=None)
+    tournament.add_argument("--seed", type=int, default=0)
+    tournament.add_argument(
+        "--ci-half-width",
+        type=float,
+        default=0.05,
+        help="Stop a matchup once every 95%% win-rate interval is this tight",
+    )
+    tournament.add_argument("--min-games", type=int, default=30)
+    tournament.add_argument("--max-games", type=int, default=2000)
+    tournament.add_argument(
+        "--checkpoint",
+        default=None,
+        metavar="DIR",
+        help="Save the tournament's progress to DIR as it runs, see --resume",
+    )
+    tournament.add_argument(
+        "--checkpoint-every", type=float, default=60.0, metavar="SECONDS"
+    )
+    tournament.add_argument(
+        "--resume",
+        default=None,
+        metavar="DIR",
+        help="Carry on the tournament checkpointed in DIR with its original settings",
+    )
+    parser.add_argument(
+        "--selfplay",
+        type=int,
+        default=0,
+        metavar="GAMES",
+        help="Generate GAMES games of --strategies across --workers into --export",
+    )
+    server = parser.add_argument_group("server")
+    server.add_argument(
+        "--serve",
+        default=None,
+        metavar="ADDRESS",
+        help="Host games between remote bots on HOST:PORT or unix:PATH, see remote/bot.py",
+    )
+    server.add_argument(
+        "--pipe-bot",
+        default=None,
+        metavar="COMMAND",
+        help="Play --games games of the bot executable against --strategies over one pipe",
+    )
+    server.add_argument("--decision-timeout", type=float, default=1.0)
+    server.add_argument("--concurrent-games", type=int, default=64)
+    server.add_argument("--games", type=int, default=None)
+    distributed = parser.add_argument_group("distributed")
+    distributed.add_argument(
+        "--coordinate",
+        default=None,
+        metavar="QUEUE",
+        help="Split --sweep games of --strategies into jobs on dir:PATH or HOST:PORT and wait for --work",
+    )
+    distributed.add_argument(
+        "--work",
+        default=None,
+        metavar="QUEUE",
+        help="Play jobs from a --coordinate queue until it is finished",
+    )
+    distributed.add_argument("--sweep", type=int, default=1000, metavar="GAMES")
+    distributed.add_argument("--job-size", type=int, default=50, metavar="GAMES")
+    distributed.add_argument("--lease", type=float, default=60.0, metavar="SECONDS")
+    perft = parser.add_argument_group("perft")
+    perft.add_argument(
+        "--perft",
+        type=int,
+        default=0,
+        metavar="DEPTH",
+        help="Count the positions DEPTH decisions deep from a seeded position and time it",
+    )
+    perft.add_argument(
+        "--perft-rounds",
+        type=int,
+        default=3,
+        metavar="ROUNDS",
+        help="Rounds --strategies play from --seed to reach the position counted from",
+    )
+    perft.add_argument(
+        "--dice",
+        default="all",
+        help="Roll starting every turn while counting, 2-12, or all to branch on each",
+    )
+    perft.add_argument(
+        "--expect",
+        type=int,
+        default=None,
+        metavar="POSITIONS",
+        help="Fail unless the count at DEPTH is POSITIONS",
+    )
     args = parser.parse_args()
+    try:
+        args.map_spec = MapSpec.parse(args.map)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.value_weights:
+        try:
+            load_evaluator(args.value_weights)
+        except (OSError, KeyError, ValueError) as e:
+            parser.error(str(e))
+        # read by every ValueStrategy built without an evaluator, workers included
+        ValueStrategy.weights_path = args.value_weights
+    if args.dice == "all":
+        args.rolls = list(range(2, 13))
+    elif args.dice.isdigit() and 2 <= int(args.dice) <= 12:
+        args.rolls = [int(args.dice)]
+    else:
+        parser.error("--dice takes a roll from 2 to 12 or all")
 
     logger.set_verbosity(args.verbosity)
-    if args.gui:
-        play_gui(args.force_quit_after_round, args.speed)
+    if args.coordinate:
+        import asyncio
+        import time
+
+        from batch.jobs import LocalJobQueue, open_queue, serve_jobs, sweep_config
+
+        config = sweep_config(
+            [STRATEGIES[name].__name__ for name in args.strategies],
+            args.sweep,
+            job_size=args.job_size,
+            seed=args.seed,
+            force_quit_after_round=args.force_quit_after_round,
+            map_name=args.map,
+            lease_seconds=args.lease,
+        )
+        if args.coordinate.startswith("dir:"):
+            queue = open_queue(args.coordinate, config)
+            while not queue.finished():
+                time.sleep(1.0)
+        else:
+            queue = LocalJobQueue(config)
+            host, port = args.coordinate.rsplit(":", 1)
+            asyncio.run(serve_jobs(queue, host, int(port)))
+        print("Sweep after {}".format(queue.stats().summary()))
+        if queue.failed():
+            print("Failed games {}".format(queue.failed()))
+    elif args.work:
+        import os
+        import socket
+        import time
+
+        from batch.jobs import open_queue, run_worker
+
+        logger.set_verbosity(-1)
+        while True:
+            try:
+                queue = open_queue(args.work)
+                break
+            except (ConnectionError, FileNotFoundError):
+                # the coordinator may not be up yet
+                time.sleep(1.0)
+        worker = "{}:{}".format(socket.gethostname(), os.getpid())
+        print("{} played {} jobs".format(worker, run_worker(queue, worker)))
+    elif args.pipe_bot:
+        import shlex
+
+        from remote.pipe import play_pipe_games
+
+        logger.set_verbosity(-1)
+        results = play_pipe_games(
+            shlex.split(args.pipe_bot),
+            (None,) + tuple(STRATEGIES[name] for name in args.strategies),
+            args.games or 1,
+            concurrent_games=args.concurrent_games,
+            timeout=args.decision_timeout,
+            force_quit_after_round=args.force_quit_after_round,
+        )
+        wins = [0] * (1 + len(args.strategies))
+        for result in results:
+            if result.winner is not None:
+                wins[result.winner] += 1
+        print("Played {} games, wins by seat {}".format(len(results), wins))
+    elif args.serve:
+        import asyncio
+
+        from remote.server import GameServer
+
+        logger.set_verbosity(-1)
+
+        async def serve() -> None:
+            game_server = GameServer(
+                num_players=args.seats[0],
+                timeout=args.decision_timeout,
+                max_concurrent_games=args.concurrent_games,
+                max_games=args.games,
+                force_quit_after_round=args.force_quit_after_round,
+                seed=args.seed,
+            )
+            if args.serve.startswith("unix:"):
+                server = await game_server.start_unix(args.serve[len("unix:") :])
+            else:
+                host, port = args.serve.rsplit(":", 1)
+                server = await game_server.start_tcp(host, int(port))
+            results = await game_server.serve(server)
+            wins = [0] * args.seats[0]
+            for result in results:
+                if result.winner is not None:
+                    wins[result.winner] += 1
+            print("Played {} games, wins by seat {}".format(len(results), wins))
+            if game_server.failures:
+                print("{} games failed".format(len(game_server.failures)))
+
+        asyncio.run(serve())
+    elif args.selfplay:
+        from batch.export import turn_dtype
+        from batch.selfplay import ShardSink, run_selfplay
+        from board import RandomBoard
+
+        if not args.export:
+            parser.error("--selfplay needs --export DIR")
+        if len(args.seats) > 1:
+            parser.error("--selfplay plays a single number of --seats")
+        logger.set_verbosity(-1)
+        board = RandomBoard(args.map_spec)
+        failed = run_selfplay(
+            args.selfplay,
+            tuple(
+                STRATEGIES[args.strategies[seat % len(args.strategies)]]
+                for seat in range(args.seats[0])
+            ),
+            ShardSink(args.export, turn_dtype(len(board.vertices), len(board.edges))),
+            workers=args.workers or 4,
+            seed=args.seed,
+            force_quit_after_round=args.force_quit_after_round,
+            map_spec=args.map_spec,
+            validate_every=args.validate_every,
+            factored=args.factored,
+        )
+        if failed:
+            print(
+                "{} games failed and were not exported: {}".format(len(failed), failed)
+            )
+    elif args.perft:
+        import sys
+        import time
+
+        from batch.perft import Perft, perft_position
+
+        logger.set_verbosity(-1)
+        game = perft_position(
+            tuple(
+                STRATEGIES[args.strategies[seat % len(args.strategies)]]
+                for seat in range(args.seats[0])
+            ),
+            str(args.seed),
+            args.perft_rounds,
+            args.map_spec,
+            args.validate_every,
+            args.factored,
+        )
+        perft = Perft(args.rolls, str(args.seed))
+        start = time.perf_counter()
+        counts = perft.run(game, args.perft)
+        elapsed = time.perf_counter() - start
+        for depth, count in enumerate(counts):
+            print("Depth {}: {} positions".format(depth, count))
+        print(
+            "{} positions in {:.2f}s, {:.0f} per second".format(
+                sum(counts), elapsed, sum(counts) / elapsed
+            )
+        )
+        print(
+            "Legal actions of {} positions in {:.2f}s, {:.0f} per second".format(
+                sum(counts[:-1]),
+                perft.movegen_seconds,
+                sum(counts[:-1]) / max(perft.movegen_seconds, 1e-9),
+            )
+        )
+        if args.expect is not None and counts[-1] != args.expect:
+            sys.exit(
+                "Expected {} positions, counted {}".format(args.expect, counts[-1])
+            )
+    elif args.tournament or args.resume:
+        from batch import Tournament
+
+        logger.set_verbosity(-1)
+        if args.resume:
+            t = Tournament.resume(args.resume, args.workers)
+        else:
+            t = Tournament(
+                [STRATEGIES[name] for name in args.strategies],
+                args.seats,
+                seed=args.seed,
+                half_width=args.ci_half_width,
+                min_games=args.min_games,
+                max_games=args.max_games,
+                force_quit_after_round=args.force_quit_after_round,
+                workers=args.workers,
+                per_call_budget=args.call_budget,
+                per_game_budget=args.game_budget,
+                validate_every=args.validate_every,
+                map_spec=args.map_spec,
+                checkpoint_dir=args.checkpoint,
+                checkpoint_every=args.checkpoint_every,
+                factored=args.factored,
+            )
+        t.run()
+        print(t.summary())
+    elif args.renderer in [None, "pygame"] and args.gui:
+        play_gui(
+            args.force_quit_after_round,
+            args.speed,
+            args.export,
+            args.call_budget,
+            args.game_budget,
+            args.validate_every,
+            map_spec=args.map_spec,
+            factored=args.factored,
+        )
     else:
-        play_cli(args.force_quit_after_round, args.speed)
+        play_cli(
+            args.force_quit_after_round,
+            args.speed,
+            args.export,
+            args.call_budget,
+            args.game_budget,
+            args.validate_every,
+            args.renderer or "none",
+            map_spec=args.map_spec,
+            factored=args.factored,
+        )
@@ -0,0 +1,3 @@
+from .player import BotPlayer
+
+__all__ = ["BotPlayer"]
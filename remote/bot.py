@@ -0,0 +1,83 @@
+import argparse
+import asyncio
+import random
+import sys
+
+from .protocol import decode, encode, read_frame, write_frame
+
+
+def random_policy(message: dict) -> dict:
+    """Answers any request at random, a starting point for writing a real bot"""
+    kind = message["type"]
+    if kind == "discard":
+        hand = [res for res, n in enumerate(message["resources"]) for _ in range(n)]
+        discard = [0] * 5
+        for res in random.sample(hand, message["count"]):
+            discard[res] += 1
+        return {"resources": discard}
+    if kind == "accepts_trade":
+        return {"accept": random.random() < 0.5}
+    options = message["options"]
+    if kind == "do" and len(options) > 1 and random.random() < 0.7:
+        # prefer doing something over ending the turn
+        return {"choice": random.randrange(1, len(options))}
+    if kind == "do":
+        return {"choice": 0}
+    return {"choice": random.randrange(len(options))}
+
+
+async def play(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, policy):
+    """Answers requests on one connection until the server closes it, returns games won"""
+    wins = 0
+    seat = -1
+    while line := await reader.readline():
+        message = decode(line)
+        if message["type"] == "start":
+            seat = message["seat"]
+        elif message["type"] == "end":
+            wins += message["result"]["winner"] == seat
+        else:
+            writer.write(encode({"id": message["id"], **policy(message)}))
+            await writer.drain()
+    writer.close()
+    return wins
+
+
+def serve_stdio(policy) -> None:
+    """Bot side of `remote.pipe`, answers every request on stdin until stdin closes"""
+    stdin, stdout = sys.stdin.buffer, sys.stdout.buffer
+    while (message := read_frame(stdin)) is not None:
+        if "id" in message:
+            write_frame(stdout, {"id": message["id"], **policy(message)})
+
+
+async def main(args: argparse.Namespace) -> None:
+    async def connect():
+        if args.unix:
+            return await asyncio.open_unix_connection(args.unix)
+        return await asyncio.open_connection(args.host, args.port)
+
+    # many seats over one event loop, each its own connection
+    connections = [await connect() for _ in range(args.connections)]
+    wins = await asyncio.gather(
+        *[play(reader, writer, random_policy) for reader, writer in connections]
+    )
+    print("Won {} games over {} connections".format(sum(wins), len(connections)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Example CatanSim bot")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", default=None, metavar="PATH")
+    parser.add_argument("--connections", type=int, default=3)
+    parser.add_argument(
+        "--stdio",
+        action="store_true",
+        help="Serve length-prefixed requests on stdin/stdout instead of a socket",
+    )
+    args = parser.parse_args()
+    if args.stdio:
+        serve_stdio(random_policy)
+    else:
+        asyncio.run(main(args))
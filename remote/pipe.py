@@ -0,0 +1,159 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+import itertools
+import subprocess
+import threading
+
+from basic import GameResult
+from board import RandomBoard
+from game import Game
+from strategy import Player
+
+from .player import SEATING, BotPlayer
+from .protocol import describe_board, read_frame, write_frame
+
+
+class BotProcess:
+    """
+    External bot executable kept running across many games. Messages are length-prefixed
+    JSON over its stdin and stdout, each tagged with a request ID, so requests from
+    concurrent games are pipelined back to back and answers may come back in any order.
+    """
+
+    def __init__(self, command: list[str]) -> None:
+        self.process = subprocess.Popen(
+            command, stdin=subprocess.PIPE, stdout=subprocess.PIPE
+        )
+        self.write_lock = threading.Lock()
+        self.pending: dict[int, Future] = {}
+        self.ids = itertools.count()
+        self.alive = True
+        self.reader = threading.Thread(target=self.read_loop, daemon=True)
+        self.reader.start()
+
+    def read_loop(self) -> None:
+        while (message := read_frame(self.process.stdout)) is not None:
+            future = self.pending.pop(message.get("id", -1), None)
+            # answers to requests that already timed out are dropped
+            if future is not None:
+                future.set_result(message)
+        self.alive = False
+        for future in list(self.pending.values()):
+            future.set_exception(ConnectionError("Bot exited"))
+        self.pending.clear()
+
+    def send(self, message: dict) -> None:
+        if not self.alive:
+            raise ConnectionError("Bot exited")
+        try:
+            with self.write_lock:
+                write_frame(self.process.stdin, message)
+        except (BrokenPipeError, ValueError):
+            raise ConnectionError("Bot exited")
+
+    def request(self, message: dict, timeout: float) -> dict | None:
+        """Sends a request without waiting on any other in flight, and waits for its answer"""
+        request_id = next(self.ids)
+        future: Future = Future()
+        self.pending[request_id] = future
+        try:
+            self.send({"id": request_id, **message})
+            return future.result(timeout)
+        except (FutureTimeoutError, ConnectionError):
+            return None
+        finally:
+            self.pending.pop(request_id, None)
+
+    def close(self) -> None:
+        try:
+            self.process.stdin.close()
+        except BrokenPipeError:
+            pass
+        self.process.wait()
+
+
+class PipePlayer(BotPlayer):
+    """Seat played by a `BotProcess`, with the game ID on every message"""
+
+    def __init__(self, bot: BotProcess, game_id: int, timeout: float) -> None:
+        super().__init__()
+        self.bot = bot
+        self.game_id = game_id
+        self.timeout = timeout
+
+    def ask(self, message: dict) -> dict | None:
+        response = self.bot.request({"game": self.game_id, **message}, self.timeout)
+        if response is None:
+            self.timeouts += 1
+        return response
+
+    def notify(self, message: dict) -> None:
+        try:
+            self.bot.send({"game": self.game_id, **message})
+        except ConnectionError:
+            pass
+
+
+def play_pipe_game(
+    bot: BotProcess,
+    lineup: tuple[type[Player] | None, ...],
+    game_id: int,
+    timeout: float,
+    force_quit_after_round: int,
+) -> GameResult:
+    """Plays one game, with the bot in every seat of `lineup` that is None"""
+    with SEATING:
+        Player.reset_ids()
+        players = [
+            PipePlayer(bot, game_id, timeout) if strategy is None else strategy()
+            for strategy in lineup
+        ]
+    board = RandomBoard()
+    for seat, player in enumerate(players):
+        if isinstance(player, PipePlayer):
+            player.notify(
+                {
+                    "type": "start",
+                    "seat": seat,
+                    "player_id": player.player_id,
+                    "board": describe_board(board),
+                }
+            )
+    game = Game(players, board, None, force_quit_after_round, float("inf"))
+    try:
+        result = game.play()
+    except ValueError:
+        if game.rounds < force_quit_after_round:
+            raise
+        result = game.result()
+    for player in players:
+        if isinstance(player, PipePlayer):
+            player.notify({"type": "end", "result": result.__dict__})
+    return result
+
+
+def play_pipe_games(
+    command: list[str],
+    lineup: tuple[type[Player] | None, ...],
+    num_games: int,
+    concurrent_games: int = 16,
+    timeout: float = 1.0,
+    force_quit_after_round: int = 1000,
+) -> list[GameResult]:
+    """
+    Plays `num_games` games against one long-lived bot process, `concurrent_games` at a
+    time so their decisions share the pipe instead of each waiting for a fresh process
+    """
+    bot = BotProcess(command)
+    try:
+        with ThreadPoolExecutor(concurrent_games) as executor:
+            return list(
+                executor.map(
+                    lambda game_id: play_pipe_game(
+                        bot, lineup, game_id, timeout, force_quit_after_round
+                    ),
+                    range(num_games),
+                )
+            )
+    finally:
+        bot.close()
@@ -0,0 +1,134 @@
+import threading
+
+import numpy as np
+
+from basic import Action, GameStats
+from board import Board
+from strategy import Player
+
+from .protocol import action_from_dict, action_to_dict, observe
+
+# Player IDs come from a class counter, so seating a game cannot interleave between threads
+SEATING = threading.Lock()
+
+
+class BotPlayer(Player):
+    """
+    Seat whose decisions come from an external bot as protocol messages, see `protocol`.
+    Subclasses send the messages in `ask`. A bot that times out, disconnects or answers
+    with something illegal gets the default decision.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.timeouts = 0
+
+    def ask(self, message: dict) -> dict | None:
+        """The bot's answer to a request, None when there is none in time"""
+        raise NotImplementedError()
+
+    def choose(
+        self, kind: str, options: list[Action], board: Board | None = None, **extra
+    ) -> int:
+        """Index of the option the bot picks, 0 by default"""
+        message = {"type": kind, "options": [action_to_dict(a) for a in options]}
+        if board is not None:
+            message["state"] = observe(board, self)
+        response = self.ask({**message, **extra})
+        if response is None:
+            return 0
+        choice = response.get("choice")
+        if not isinstance(choice, int) or not 0 <= choice < len(options):
+            return 0
+        return choice
+
+    def settle(self, board: Board, second: bool) -> list[Action]:
+        options = [
+            (
+                Action(Action.SETTLE_INIT, pos=pos.pos, second=second),
+                Action(Action.BUILD_ROAD_INIT, pos=pos.pos, road_name=road_name),
+            )
+            for pos in board.vertices
+            if pos.can_settle()
+            for road_name in pos.get_available_roads()
+        ]
+        # each option is a settlement with one of its roads, sent as the road action
+        i = self.choose("settle", [road for _, road in options], board, second=second)
+        return list(options[i])
+
+    def discard_cards(self, num_to_discard: int) -> np.ndarray:
+        response = self.ask(
+            {
+                "type": "discard",
+                "count": num_to_discard,
+                "resources": self.resources.tolist(),
+            }
+        )
+        if response is not None:
+            discard = np.asarray(response.get("resources", []), dtype=np.int64)
+            if (
+                discard.shape == (5,)
+                and (discard >= 0).all()
+                and (discard <= self.resources).all()
+                and discard.sum() == num_to_discard
+            ):
+                return discard
+        return self.sample_resources(num_to_discard)
+
+    def choose_robber_action(self, board: Board) -> Action:
+        options = self.get_robber_options(board)
+        return options[self.choose("robber", options, board)]
+
+    def accepts_trade(self, propose_trade_action: Action) -> bool:
+        response = self.ask(
+            {
+                "type": "accepts_trade",
+                "trade": action_to_dict(propose_trade_action),
+                "resources": self.resources.tolist(),
+            }
+        )
+        return bool(response and response.get("accept"))
+
+    def finalizes_trade(
+        self, propose_trade_action: Action, players: list[int]
+    ) -> Action:
+        options = [
+            Action(
+                Action.TRADE,
+                with_player=player_id,
+                mine=propose_trade_action.params["mine"],
+                theirs=propose_trade_action.params["theirs"],
+            )
+            for player_id in players
+        ]
+        return options[self.choose("finalizes_trade", options)]
+
+    def do(self, board: Board, stats: GameStats) -> Action:
+        options = [Action(Action.DO_NOTHING)] + self.get_legal_actions(board, stats)
+        message = {
+            "type": "do",
+            "options": [action_to_dict(a) for a in options],
+            "state": observe(board, self),
+        }
+        response = self.ask(message)
+        if response is None:
+            return options[0]
+        if "trade" in response:
+            # trade proposals are open-ended, so they are the one action sent back in full
+            try:
+                trade = action_from_dict(response["trade"])
+                mine = np.bincount(trade.params["mine"], minlength=5)
+                if (
+                    trade.action == Action.PROPOSE_TRADE
+                    and len(mine) == 5
+                    and (mine <= self.resources).all()
+                    and all(res in range(5) for res in trade.params["theirs"])
+                ):
+                    return trade
+            except (KeyError, TypeError, ValueError):
+                pass
+            return options[0]
+        choice = response.get("choice")
+        if not isinstance(choice, int) or not 0 <= choice < len(options):
+            return options[0]
+        return options[choice]
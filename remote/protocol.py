@@ -0,0 +1,81 @@
+import json
+import struct
+
+import numpy as np
+
+from basic import Action
+from board import Board
+
+# Action parameters holding (row, col) tuples, sent as JSON lists
+POSITION_PARAMS = ["pos", "tile", "pos1", "pos2"]
+
+
+def action_to_dict(action: Action) -> dict:
+    return {"action": action.action, **action.params}
+
+
+def action_from_dict(data: dict) -> Action:
+    params = dict(data)
+    action = params.pop("action")
+    for name in POSITION_PARAMS:
+        if params.get(name) is not None:
+            params[name] = tuple(params[name])
+    return Action(int(action), **params)
+
+
+def encode(message: dict) -> bytes:
+    """One message per line"""
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+
+def decode(line: bytes) -> dict:
+    return json.loads(line)
+
+
+def describe_board(board: Board) -> dict:
+    """Static layout sent once per game, tiles in row-major order"""
+    return {
+        "tiles": [[tile.tile, tile.value] for row in board.tiles for tile in row],
+        "vertices": [list(pos.pos) for pos in board.vertices],
+        "edges": [[list(pos.pos), road_name] for pos, road_name in board.edges],
+    }
+
+
+def observe(board: Board, player) -> dict:
+    """What a seat can see when asked for a decision"""
+    return {
+        "vertex_owner": [
+            -1 if pos.fixture is None else pos.fixture for pos in board.vertices
+        ],
+        "vertex_type": [
+            -1 if pos.fixture_type is None else pos.fixture_type
+            for pos in board.vertices
+        ],
+        "edge_owner": [
+            -1 if getattr(pos, road_name) is None else getattr(pos, road_name)
+            for pos, road_name in board.edges
+        ],
+        "robber": -1 if board.robber is None else board.tile_indices[board.robber.pos],
+        "resources": np.asarray(player.resources).tolist(),
+        "cards": list(player.cards),
+        "unusable_cards": list(player.unusable_dev_cards),
+    }
+
+
+def write_frame(stream, message: dict) -> None:
+    """Writes a message prefixed with its length as 4 big-endian bytes, for pipes"""
+    data = json.dumps(message, separators=(",", ":")).encode()
+    stream.write(struct.pack(">I", len(data)) + data)
+    stream.flush()
+
+
+def read_frame(stream) -> dict | None:
+    """Reads one length-prefixed message, None once the stream is closed"""
+    header = stream.read(4)
+    if len(header) < 4:
+        return None
+    (size,) = struct.unpack(">I", header)
+    data = stream.read(size)
+    if len(data) < size:
+        return None
+    return json.loads(data)
@@ -0,0 +1,258 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import random
+import sys
+import traceback
+
+from basic import GameResult
+from board import RandomBoard
+from game import Game
+from strategy import Player
+
+from .player import SEATING, BotPlayer
+from .protocol import decode, describe_board, encode
+
+
+class Connection:
+    """One bot socket, matching each response to its request by ID"""
+
+    def __init__(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.pending: dict[int, asyncio.Future] = {}
+        self.next_id = 0
+        self.closed = asyncio.Event()
+        self.name = ""
+
+    async def read_loop(self) -> None:
+        try:
+            while line := await self.reader.readline():
+                message = decode(line)
+                future = self.pending.pop(message.get("id", -1), None)
+                # answers to requests that already timed out are dropped
+                if future is not None and not future.done():
+                    future.set_result(message)
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            self.closed.set()
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Bot disconnected"))
+            self.pending.clear()
+            self.writer.close()
+
+    async def send(self, message: dict) -> None:
+        if self.closed.is_set():
+            raise ConnectionError("Bot disconnected")
+        self.writer.write(encode(message))
+        await self.writer.drain()
+
+    async def request(self, message: dict, timeout: float) -> dict:
+        request_id = self.next_id
+        self.next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+        try:
+            await self.send({"id": request_id, **message})
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            self.pending.pop(request_id, None)
+
+
+class RemotePlayer(BotPlayer):
+    """
+    Seat played by a bot over a `Connection`. The game runs in a worker thread, and every
+    decision is sent to the event loop as an awaited request with a timeout.
+    """
+
+    def __init__(
+        self,
+        connection: Connection,
+        loop: asyncio.AbstractEventLoop,
+        timeout: float,
+    ) -> None:
+        super().__init__()
+        self.connection = connection
+        self.loop = loop
+        self.timeout = timeout
+
+    def ask(self, message: dict) -> dict | None:
+        future = asyncio.run_coroutine_threadsafe(
+            self.connection.request(message, self.timeout), self.loop
+        )
+        try:
+            return future.result()
+        except (asyncio.TimeoutError, ConnectionError):
+            self.timeouts += 1
+            return None
+
+
+class GameServer:
+    """
+    Hosts concurrent games between bots. Every connection waits in a lobby, each group of
+    `num_players` starts a game, and connections go back into the lobby when it ends.
+
+    One event loop multiplexes the sockets of all games, but each game is a thread of its
+    own that blocks while its bots answer, so at most `max_concurrent_games` run at once.
+    Each game draws from its own generator seeded by `seed` and its index, so a seeded
+    game plays out the same however many others run beside it. `logger` is shared by the
+    threads, keep it quiet while serving.
+    """
+
+    def __init__(
+        self,
+        num_players: int = 3,
+        timeout: float = 1.0,
+        max_concurrent_games: int = 64,
+        max_games: int | None = None,
+        force_quit_after_round: int = 1000,
+        seed: int | None = None,
+    ) -> None:
+        self.num_players = num_players
+        self.timeout = timeout
+        self.max_concurrent_games = max_concurrent_games
+        self.max_games = max_games
+        self.force_quit_after_round = force_quit_after_round
+        self.seed = seed
+        self.results: list[GameResult] = []
+        self.failures: list[str] = []  # errors of the games that raised
+        self.lobby: asyncio.Queue[Connection] = asyncio.Queue()
+        self.executor = ThreadPoolExecutor(max_concurrent_games)
+        self.games_started = 0
+        self.games_finished = 0
+        self.done = asyncio.Event()
+        self.connections: set[Connection] = set()
+
+    async def handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        connection = Connection(reader, writer)
+        self.connections.add(connection)
+        read_loop = asyncio.create_task(connection.read_loop())
+        await self.lobby.put(connection)
+        await read_loop
+        self.connections.discard(connection)
+
+    async def start_tcp(self, host: str, port: int) -> asyncio.AbstractServer:
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+    async def start_unix(self, path: str) -> asyncio.AbstractServer:
+        return await asyncio.start_unix_server(self.handle_connection, path)
+
+    def notify(
+        self,
+        connection: Connection,
+        message: dict,
+        loop: asyncio.AbstractEventLoop,
+    ) -> None:
+        """Sends a message that needs no answer from a game thread"""
+        try:
+            asyncio.run_coroutine_threadsafe(connection.send(message), loop).result()
+        except ConnectionError:
+            pass
+
+    def game_rng(self, game_index: int) -> random.Random:
+        if self.seed is None:
+            return random.Random()
+        return random.Random("{}-{}".format(self.seed, game_index))
+
+    def play_game(
+        self,
+        connections: list[Connection],
+        loop: asyncio.AbstractEventLoop,
+        rng: random.Random,
+    ) -> GameResult:
+        with SEATING:
+            Player.reset_ids()
+            players = [RemotePlayer(c, loop, self.timeout) for c in connections]
+        board = RandomBoard(rng=rng)
+        for seat, player in enumerate(players):
+            self.notify(
+                player.connection,
+                {
+                    "type": "start",
+                    "seat": seat,
+                    "player_id": player.player_id,
+                    "board": describe_board(board),
+                },
+                loop,
+            )
+        game = Game(
+            players,
+            board,
+            None,
+            self.force_quit_after_round,
+            float("inf"),
+            rng=rng,
+        )
+        try:
+            result = game.play()
+        except ValueError:
+            if game.rounds < self.force_quit_after_round:
+                raise
+            result = game.result()
+        for player in players:
+            self.notify(
+                player.connection, {"type": "end", "result": result.__dict__}, loop
+            )
+        return result
+
+    async def run_game(self, connections: list[Connection], game_index: int) -> None:
+        loop = asyncio.get_running_loop()
+        try:
+            result = await loop.run_in_executor(
+                self.executor,
+                self.play_game,
+                connections,
+                loop,
+                self.game_rng(game_index),
+            )
+            self.results.append(result)
+        except Exception as e:
+            # a broken game still counts, otherwise `serve` would wait for it forever
+            self.failures.append(repr(e))
+            print("Game failed:", file=sys.stderr)
+            traceback.print_exc()
+        finally:
+            self.games_finished += 1
+            for connection in connections:
+                if not connection.closed.is_set():
+                    await self.lobby.put(connection)
+            if self.max_games is not None and self.games_finished >= self.max_games:
+                self.done.set()
+
+    async def matchmake(self) -> None:
+        games: set[asyncio.Task] = set()
+        while self.max_games is None or self.games_started < self.max_games:
+            seated: list[Connection] = []
+            while len(seated) < self.num_players:
+                connection = await self.lobby.get()
+                if not connection.closed.is_set():
+                    seated.append(connection)
+            while len(games) >= self.max_concurrent_games:
+                await asyncio.wait(games, return_when=asyncio.FIRST_COMPLETED)
+                games = {task for task in games if not task.done()}
+            task = asyncio.create_task(self.run_game(seated, self.games_started))
+            self.games_started += 1
+            games.add(task)
+            task.add_done_callback(games.discard)
+
+    async def serve(self, server: asyncio.AbstractServer) -> list[GameResult]:
+        """
+        Runs games until `max_games` have finished, forever if it is None. Returns the
+        results of the games that did not raise, the others are in `failures`.
+        """
+        matchmaker = asyncio.create_task(self.matchmake())
+        async with server:
+            await self.done.wait()
+            matchmaker.cancel()
+            # hang up on the bots, then let their read loops wind down
+            for connection in list(self.connections):
+                connection.writer.close()
+            for connection in list(self.connections):
+                await connection.closed.wait()
+        self.executor.shutdown()
+        return self.results
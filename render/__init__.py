@@ -0,0 +1,18 @@
+from importlib import import_module
+
+from .base import Renderer
+
+# Front ends by name, each imported only once selected so headless runs never load pygame
+RENDERERS = {
+    "none": ("render.base", "Renderer"),
+    "terminal": ("render.terminal", "TerminalRenderer"),
+    "pygame": ("render.window", "PygameRenderer"),
+}
+
+
+def load_renderer(name: str) -> Renderer:
+    module, cls = RENDERERS[name]
+    return getattr(import_module(module), cls)()
+
+
+__all__ = ["Renderer", "RENDERERS", "load_renderer"]
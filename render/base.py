@@ -0,0 +1,22 @@
+from board import Board
+
+
+class Renderer:
+    """Front end showing a game as it is played. This one shows nothing, for headless runs."""
+
+    def start(self, board: Board) -> None:
+        pass
+
+    def poll(self) -> None:
+        """Called between decisions, e.g. to handle window events"""
+        pass
+
+    def add_messages(self, messages: list[str]) -> None:
+        pass
+
+    def update(self, board: Board) -> None:
+        pass
+
+    def finish(self, board: Board) -> None:
+        """Called once the game is over"""
+        pass
@@ -0,0 +1,61 @@
+import sys
+import time
+
+from basic import Tile
+from board import Board
+from strategy.player import colors
+
+from .base import Renderer
+
+CLEAR = "\x1b[H\x1b[2J"
+
+
+class TerminalRenderer(Renderer):
+    """
+    Redraws the tiles and every player's pieces as plain text, at most every `interval`
+    seconds so that fast games do not flood the terminal
+    """
+
+    def __init__(self, interval: float = 0.2) -> None:
+        self.interval = interval
+        self.last_drawn = 0.0
+
+    def draw(self, board: Board) -> None:
+        lines = []
+        for r, row in enumerate(board.tiles):
+            pad = " " * (abs(r - board.spec.radius) * 4)
+            cells = []
+            for tile in row:
+                name = Tile.to_name(tile.tile)[:5]
+                robber = "*" if tile is board.robber else " "
+                cells.append(
+                    "{:>5}{:>3}{}".format(
+                        name, "" if tile.value < 0 else tile.value, robber
+                    )
+                )
+            lines.append(pad + " ".join(cells))
+        pieces: dict[int, list[int]] = {}
+        for pos in board.vertices:
+            if pos.fixture is not None:
+                pieces.setdefault(pos.fixture, [0, 0, 0])[pos.fixture_type] += 1
+        for pos, road_name in board.edges:
+            owner = getattr(pos, road_name)
+            if owner is not None:
+                pieces.setdefault(owner, [0, 0, 0])[2] += 1
+        for player_id, (settlements, cities, roads) in sorted(pieces.items()):
+            lines.append(
+                "{:>7}: {} settlements, {} cities, {} roads".format(
+                    colors[player_id], settlements, cities, roads
+                )
+            )
+        clear = CLEAR if sys.stdout.isatty() else ""
+        print(clear + "\n".join(lines), flush=True)
+
+    def update(self, board: Board) -> None:
+        now = time.monotonic()
+        if now - self.last_drawn >= self.interval:
+            self.last_drawn = now
+            self.draw(board)
+
+    def finish(self, board: Board) -> None:
+        self.draw(board)
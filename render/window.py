@@ -0,0 +1,26 @@
+from board import Board
+from gui import add_messages, draw_gui, init_gui, quit_gui
+
+from .base import Renderer
+
+
+class PygameRenderer(Renderer):
+    """The pygame window of `gui`, which stays open after the game until it is closed"""
+
+    def start(self, board: Board) -> None:
+        init_gui()
+
+    def poll(self) -> None:
+        quit_gui()
+
+    def add_messages(self, messages: list[str]) -> None:
+        add_messages(messages)
+
+    def update(self, board: Board) -> None:
+        draw_gui(board)
+
+    def finish(self, board: Board) -> None:
+        while True:
+            # Wait for user to close the window
+            quit_gui()
+            draw_gui(board)
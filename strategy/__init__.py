@@ -1,5 +1,13 @@
 from .player import Player
 from .random import RandomStrategy
 from .heuristic import HeuristicStrategy
+from .value import ValueStrategy
+from .expectimax import ExpectimaxStrategy
 
-__all__ = ["Player", "RandomStrategy", "HeuristicStrategy"]
+__all__ = [
+    "Player",
+    "RandomStrategy",
+    "HeuristicStrategy",
+    "ValueStrategy",
+    "ExpectimaxStrategy",
+]
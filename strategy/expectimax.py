@@ -0,0 +1,297 @@
+import random
+
+import numpy as np
+
+from basic import Action, Cost, GameStats, Tile
+from board import Board
+import logger
+
+from .player import Player
+from .transposition import TranspositionTable
+
+# Probability of each 2d6 roll from 2 to 12
+ROLLS = np.arange(2, 13)
+ROLL_PROBABILITIES = (6 - np.abs(ROLLS - 7)) / 36
+
+# How much being able to afford each build is worth, indexed by `Cost`
+BUILD_VALUES = np.array([0.7, 3.0, 3.0, 1.5])
+VP_VALUE = 5.0
+# Rough worth of actions whose payoff the roll tables cannot see, e.g. reaching new vertices
+ACTION_VALUES = {
+    Action.BUILD_ROAD: 1.0,
+    Action.GET_DEV_CARD: 1.5,
+    Action.USE_KNIGHT: 0.5,
+    Action.USE_DEV_ROADS: 2.0,
+    Action.USE_MONOPOLY: 1.0,
+}
+
+
+class RollTables:
+    """
+    Static payout tables of one board. `tiles[t, k, r]` is the amount of resource `r` that a
+    settlement on tile `t` collects when roll `k` comes up, and `incidence[v, t]` marks the
+    tiles around vertex `v`.
+    """
+
+    def __init__(self, board: Board) -> None:
+        tiles = [tile for row in board.tiles for tile in row]
+        self.tiles = np.zeros((len(tiles), len(ROLLS), 5))
+        for t, tile in enumerate(tiles):
+            if tile.tile != Tile.DESERT:
+                self.tiles[t, tile.value - 2, tile.tile] = 1
+        self.incidence = np.zeros((len(board.vertices), len(tiles)))
+        for pos in board.vertices:
+            for tile in pos.adjacent_tiles:
+                self.incidence[pos.index, board.tile_indices[tile.pos]] = 1
+
+    def tile_weights(self, board: Board, player_id: int) -> np.ndarray:
+        """How many resources the player collects from each tile per matching roll"""
+        fixtures = np.zeros(len(board.vertices))
+        for pos in board.vertices:
+            if pos.fixture == player_id:
+                fixtures[pos.index] = pos.fixture_score
+        return fixtures @ self.incidence
+
+    def payouts(
+        self, tile_weights: np.ndarray, robber: int | None = None
+    ) -> np.ndarray:
+        """Resources collected on each roll, shape (11, 5)"""
+        if robber is not None:
+            tile_weights = tile_weights.copy()
+            tile_weights[robber] = 0
+        return np.tensordot(tile_weights, self.tiles, axes=1)
+
+
+def utility(resources: np.ndarray) -> np.ndarray:
+    """
+    Value of hands of resources, shape (..., 5), by how close each hand is to every build.
+    Evaluates any number of hands at once, so a chance node is one call.
+    """
+    have = np.minimum(resources[..., None, :], Cost.MATRIX).sum(axis=-1)
+    progress = have / Cost.MATRIX.sum(axis=1)
+    return (progress**2) @ BUILD_VALUES + 0.05 * resources.sum(axis=-1)
+
+
+def discarded(resources: np.ndarray) -> np.ndarray:
+    """Expected hands after a 7 forces a discard of half of every hand over 7 cards"""
+    total = resources.sum(axis=-1, keepdims=True)
+    keep = np.where(total > 7, 1 - (total // 2) / np.maximum(total, 1), 1)
+    return resources * keep
+
+
+def expected_utility(
+    resources: np.ndarray, payouts: np.ndarray, rolls: int
+) -> np.ndarray:
+    """
+    Expectimax chance nodes over the next `rolls` dice rolls for a batch of after-states,
+    `resources` of shape (n, 5) and `payouts` of shape (n, 11, 5). Every outcome sequence is
+    evaluated in one vectorized pass, a 7 costing the expected discard instead of a payout.
+    """
+    states = resources[:, None, :]
+    weights = np.ones((1,))
+    for _ in range(rolls):
+        # (n, outcomes so far, 11, 5)
+        nxt = states[:, :, None, :] + payouts[:, None, :, :]
+        seven = 7 - ROLLS[0]
+        nxt[:, :, seven, :] = discarded(states)
+        states = nxt.reshape(len(resources), -1, 5)
+        weights = np.outer(weights, ROLL_PROBABILITIES).ravel()
+    return utility(states) @ weights
+
+
+class ExpectimaxStrategy(Player):
+    # Looks a couple of dice rolls ahead, valuing each candidate by the expected hand it leads to
+
+    def __init__(self, rolls: int = 2, table: TranspositionTable | None = None) -> None:
+        super().__init__()
+        self.rolls = rolls
+        # turn decisions already made, kept for the whole game
+        self.table = table or TranspositionTable(1 << 12)
+        self.tables: RollTables | None = None
+        self.tables_board: Board | None = None
+
+    def interrupted(self) -> None:
+        # a search cut off mid-store can leave a bad entry, start over
+        self.table.clear()
+        self.tables = None
+        self.tables_board = None
+
+    def get_tables(self, board: Board) -> RollTables:
+        if self.tables_board is not board:
+            self.tables = RollTables(board)
+            self.tables_board = board
+        assert self.tables is not None
+        return self.tables
+
+    def robber_index(self, board: Board) -> int | None:
+        if board.robber is None:
+            return None
+        return board.tile_indices[board.robber.pos]
+
+    def after_state(
+        self, board: Board, tables: RollTables, weights: np.ndarray, action: Action
+    ) -> tuple[np.ndarray, np.ndarray, int]:
+        """Resources, tile weights and VPs gained right after taking an action"""
+        resources = self.resources.astype(float)
+        vp = 0
+        a = action.action
+        if a in [Action.SETTLE, Action.SETTLE_INIT, Action.BUILD_CITY]:
+            pos = board.get_position(action.params["pos"])
+            weights = weights + tables.incidence[pos.index]
+            vp = 1
+            if a == Action.SETTLE:
+                resources = resources - Cost.MATRIX[Cost.SETTLEMENT]
+            elif a == Action.BUILD_CITY:
+                resources = resources - Cost.MATRIX[Cost.CITY]
+        elif a == Action.BUILD_ROAD:
+            resources = resources - Cost.MATRIX[Cost.ROAD]
+        elif a == Action.GET_DEV_CARD:
+            resources = resources - Cost.MATRIX[Cost.DEV_CARD]
+        elif a in [Action.FOUR_TO_ONE, Action.THREE_TO_ONE, Action.TWO_TO_ONE]:
+            rate = {Action.FOUR_TO_ONE: 4, Action.THREE_TO_ONE: 3}.get(a, 2)
+            resources = resources.copy()
+            resources[action.params["source"]] -= rate
+            if action.params["dest"] is not None:
+                resources[action.params["dest"]] += 1
+        elif a == Action.TRADE_STEP:
+            # the whole exchange, whose first part took nothing yet
+            return self.after_state(
+                board,
+                tables,
+                weights,
+                Action(
+                    self.pending.action,
+                    source=self.pending.params["source"],
+                    dest=action.params["dest"],
+                ),
+            )
+        elif a == Action.USE_YEAR_OF_PLENTY:
+            resources = resources.copy()
+            resources[action.params["resource1"]] += 1
+            if action.params["resource2"] is not None:
+                resources[action.params["resource2"]] += 1
+        elif a == Action.PLENTY_STEP:
+            resources = resources.copy()
+            resources[action.params["resource"]] += 1
+        return resources, weights, vp
+
+    def evaluate(self, board: Board, actions: list[Action]) -> np.ndarray:
+        """Value of each action, the first part of a factored action valued by its best completion"""
+        whole: list[Action] = []
+        owners: list[int] = []
+        for i, action in enumerate(actions):
+            completions = self.completions(board, action) or [action]
+            whole += completions
+            owners += [i] * len(completions)
+        tables = self.get_tables(board)
+        weights = tables.tile_weights(board, self.player_id)
+        robber = self.robber_index(board)
+        resources = np.zeros((len(whole), 5))
+        payouts = np.zeros((len(whole), len(ROLLS), 5))
+        values = np.zeros(len(whole))
+        for i, action in enumerate(whole):
+            res, w, vp = self.after_state(board, tables, weights, action)
+            resources[i] = res
+            payouts[i] = tables.payouts(w, robber)
+            values[i] = VP_VALUE * vp + ACTION_VALUES.get(
+                self.completed_action(action), 0
+            )
+        scores = np.full(len(actions), -np.inf)
+        np.maximum.at(
+            scores, owners, values + expected_utility(resources, payouts, self.rolls)
+        )
+        return scores
+
+    def best_index(self, scores: np.ndarray) -> int:
+        best = np.flatnonzero(scores >= scores.max() - 1e-9)
+        return int(random.choice(best))
+
+    def best(self, actions: list[Action], scores: np.ndarray) -> Action:
+        return actions[self.best_index(scores)]
+
+    def settle(self, board: Board, second: bool) -> list[Action]:
+        settlements = [
+            Action(Action.SETTLE_INIT, pos=pos.pos, second=second)
+            for pos in board.vertices
+            if pos.can_settle()
+        ]
+        settlement = self.best(settlements, self.evaluate(board, settlements))
+        pos = board.get_position(settlement.params["pos"])
+        road_name = random.choice(pos.get_available_roads())
+        return [
+            settlement,
+            Action(Action.BUILD_ROAD_INIT, pos=pos.pos, road_name=road_name),
+        ]
+
+    def discard_cards(self, num_to_discard: int) -> np.ndarray:
+        # drop one card at a time, always the one whose loss hurts the hand the least
+        remaining = self.resources.copy()
+        discard = np.zeros(5, dtype=np.int64)
+        for _ in range(num_to_discard):
+            options = remaining - np.eye(5, dtype=np.int64)
+            scores = np.where(remaining > 0, utility(options), -np.inf)
+            res = int(scores.argmax())
+            remaining[res] -= 1
+            discard[res] += 1
+        return discard
+
+    def choose_robber_action(self, board: Board) -> Action:
+        # keep the robber off the tiles we collect from
+        robber_options = self.get_robber_options(board)
+        tables = self.get_tables(board)
+        weights = tables.tile_weights(board, self.player_id)
+        scores = np.array(
+            [
+                ROLL_PROBABILITIES
+                @ tables.payouts(weights, board.tile_indices[a.params["tile"]]).sum(
+                    axis=1
+                )
+                for a in robber_options
+            ]
+        )
+        return self.best(robber_options, scores)
+
+    def accepts_trade(self, propose_trade_action: Action) -> bool:
+        after = self.resources.copy()
+        for res in propose_trade_action.params["mine"]:
+            after[res] += 1
+        for res in propose_trade_action.params["theirs"]:
+            after[res] -= 1
+        return bool(utility(after) > utility(self.resources))
+
+    def finalizes_trade(
+        self, propose_trade_action: Action, players: list[int]
+    ) -> Action:
+        return Action(
+            Action.TRADE,
+            with_player=random.choice(players),
+            mine=propose_trade_action.params["mine"],
+            theirs=propose_trade_action.params["theirs"],
+        )
+
+    def do(
+        self,
+        board: Board,
+        stats: GameStats,
+    ) -> Action:
+        actions = [Action(Action.DO_NOTHING)] + self.get_legal_actions(board, stats)
+        # everything the decision depends on, the other players' hands do not matter
+        key = board.state_hash ^ stats.state_hash ^ self.state_hash
+        self.table.new_search()
+        # the hash does not cover the pending part of a factored action, so skip the table then
+        entry = self.table.lookup(key, self.rolls) if self.pending is None else None
+        if entry is not None and entry["action"] < len(actions):
+            i = int(entry["action"])
+            value = float(entry["value"])
+        else:
+            scores = self.evaluate(board, actions)
+            i = self.best_index(scores)
+            value = float(scores[i])
+            if self.pending is None:
+                self.table.store(key, value, self.rolls, i)
+        logger.debug(
+            "Player {} expects {:.2f} from {} over {} candidates".format(
+                self.player_id, value, actions[i], len(actions)
+            )
+        )
+        return actions[i]
@@ -1,9 +1,12 @@
-from collections import defaultdict
 import random
 from itertools import chain
 
-from basic import Action, Tile, Port, GameStats
+import numpy as np
+
+from basic import Action, Port, GameStats
 from board import Board, Position
+from board.features import DESERTS, RESOURCE_PIPS
+from board.paths import ROAD_DIRECTIONS, distance_table, next_road
 import logger
 
 from .player import Player
@@ -19,47 +22,43 @@ class HeuristicStrategy(Player):
         self.target_pos: tuple[int, int] = 0, 0
 
     def pos_to_score(self, board: Board) -> dict[tuple[int, int], float]:
-        controlled_resources_to_score: dict[int, int] = defaultdict(int)
-        for pos in chain(*board.positions):
-            if pos.fixture == self.player_id:
-                for tile in pos.adjacent_tiles:
-                    # score the tile based on how good it is
-                    controlled_resources_to_score[tile.tile] += 10 - abs(tile.value - 7)
+        features = Player.feature_cache.get(board)
+        resource_pips = features[:, RESOURCE_PIPS : RESOURCE_PIPS + 5]
+        positions = list(chain(*board.positions))
+        # score the resources we control based on how good their tiles are
+        controlled_resources_to_score = resource_pips[
+            [v for v, pos in enumerate(positions) if pos.fixture == self.player_id]
+        ].sum(axis=0)
         pos_to_score: dict[tuple[int, int], float] = {}
-        for pos in chain(*board.positions):
+        for v, pos in enumerate(positions):
             if pos.can_settle():
                 score = 0.0
-                adj_tile_to_count = defaultdict(int)
-                new_controlled_resources_to_score = controlled_resources_to_score.copy()
-                for tile in pos.adjacent_tiles:
-                    adj_tile_to_count[tile.tile] += 1
-                    new_controlled_resources_to_score[tile.tile] += 10 - abs(
-                        tile.value - 7
-                    )
-                for tile in pos.adjacent_tiles:
-                    if tile.tile == Tile.DESERT:
-                        # strongly penalize settling on desert
-                        score -= 3
+                new_controlled_resources_to_score = (
+                    controlled_resources_to_score + resource_pips[v]
+                )
+                for res in range(5):
+                    if not resource_pips[v, res]:
                         continue
                     multiplier = 1
                     # encourage settling on diverse resources
-                    if controlled_resources_to_score[tile.tile] == 0:
+                    if controlled_resources_to_score[res] == 0:
                         # we don't have this resource yet, so encourage it more
                         multiplier = 1.4
-                    if new_controlled_resources_to_score[tile.tile] > 10:
+                    if new_controlled_resources_to_score[res] > 10:
                         # we already have a lot of this resource, so encourage it less
                         multiplier = 0.7
-                    probability_score = 10 - abs(tile.value - 7)
-                    score += multiplier * probability_score
+                    score += multiplier * float(resource_pips[v, res])
+                # strongly penalize settling on desert
+                score -= 3 * float(features[v, DESERTS])
                 # encourage ports
                 if pos.adjacent_port is not None:
                     if pos.adjacent_port == Port.THREE_ONE:
                         score += 5
                     else:
                         # encourage settling on ports for resources we have a lot of
-                        resource_score = new_controlled_resources_to_score[
-                            pos.adjacent_port
-                        ]
+                        resource_score = float(
+                            new_controlled_resources_to_score[pos.adjacent_port]
+                        )
                         score += (resource_score + 1) * 0.6 + 4
                 score = max(
                     score, 0.1
@@ -87,40 +86,28 @@ class HeuristicStrategy(Player):
             f"Heuristic agent targets position {self.target_pos} with score {self.pos_to_score(board)[self.target_pos]:.2f} from distribution {self.pos_to_score(board)}"
         )
         if pos is None:
-            # pick the settlement that we own closest to our target position
-            owned_positions = [
-                p.pos for p in chain(*board.positions) if p.fixture == self.player_id
-            ]
-            pos = min(
-                owned_positions,
-                key=lambda p: abs(p[0] - self.target_pos[0])
-                + abs(p[1] - self.target_pos[1]),
-            )
-        road_name = None
-        x_dist = self.target_pos[0] - pos[0]
-        y_dist = self.target_pos[1] - pos[1]
-        road_name = ""
-        if abs(x_dist) > abs(y_dist):
-            road_name = "down_road" if x_dist > 0 else "up_road"
-            if road_name not in board.get_position(pos).get_available_roads():
-                road_name = ""
-        if not road_name:
-            road_name = "right_road" if y_dist > 0 else "left_road"
-        if road_name in board.get_position(pos).get_available_roads():
-            logger.debug(
-                f"Heuristic agent builds road {road_name} from position {pos} towards target {self.target_pos}"
-            )
-            return Action(action_id, pos=pos, road_name=road_name)
-        if board.get_position(pos).get_available_roads():
+            # extend our road network along the cheapest way to the target
+            road = next_road(board, self.player_id, self.target_pos)
+            if road is None:
+                return Action(Action.DO_NOTHING)
             logger.debug(
-                f"Heuristic agent builds random road from position {pos} towards target {self.target_pos}"
-            )
-            return Action(
-                action_id,
-                pos=pos,
-                road_name=random.choice(board.get_position(pos).get_available_roads()),
+                f"Heuristic agent builds road {road[1]} from position {road[0].pos} towards target {self.target_pos}"
             )
-        return Action(Action.DO_NOTHING)
+            return Action(action_id, pos=road[0].pos, road_name=road[1])
+        # the road has to start at `pos`, take the one leading closest to the target
+        position = board.get_position(pos)
+        road_names = position.get_available_roads()
+        if not road_names:
+            return Action(Action.DO_NOTHING)
+        distances = distance_table(board)[board.get_position(self.target_pos).index]
+        road_name = min(
+            road_names,
+            key=lambda name: distances[getattr(position, ROAD_DIRECTIONS[name]).index],
+        )
+        logger.debug(
+            f"Heuristic agent builds road {road_name} from position {pos} towards target {self.target_pos}"
+        )
+        return Action(action_id, pos=pos, road_name=road_name)
 
     def settle(self, board: Board, second: bool) -> list[Action]:
         (settle1,) = random.choices(
@@ -139,9 +126,8 @@ class HeuristicStrategy(Player):
             build_ideal_road_action,
         ]
 
-    def discard_cards(self, num_to_discard: int) -> list[int]:
-        cards = self.get_resource_cards()
-        return random.sample(range(len(cards)), num_to_discard)
+    def discard_cards(self, num_to_discard: int) -> np.ndarray:
+        return self.sample_resources(num_to_discard)
 
     def choose_robber_action(self, board: Board) -> Action:
         robber_options = self.get_robber_options(board)
@@ -167,22 +153,20 @@ class HeuristicStrategy(Player):
         board: Board,
         stats: GameStats,
     ) -> Action:
-        legal_actions = self.get_legal_actions(board, stats)
-        logger.debug(
-            "Player {} has legal actions {}".format(self.player_id, legal_actions)
-        )
+        # count the legal actions and only build the one drawn
+        categories = self.get_action_categories(board, stats)
+        num_legal = sum(count for count, _ in categories)
+        logger.debug("Player {} has {} legal actions".format(self.player_id, num_legal))
         r = random.random()
-        if (len(legal_actions) and r < 0.3) or (not len(legal_actions) and r < 0.7):
+        if (num_legal and r < 0.3) or (not num_legal and r < 0.7):
             # do nothing chance
             return Action(Action.DO_NOTHING)
-        elif not self.empty() and (
-            (len(legal_actions) and r < 0.5) or (not len(legal_actions))
-        ):
+        elif not self.empty() and ((num_legal and r < 0.5) or (not num_legal)):
             # propose trade chance
-            cards = self.get_resource_cards()
             # limit number of cards to give in trade to 3 to avoid too much trading
-            num_of_cards_to_give = min(random.randint(1, 3), len(cards))
-            cards_to_give = random.sample(cards, num_of_cards_to_give)
+            num_of_cards_to_give = min(random.randint(1, 3), self.num_resources())
+            give = self.sample_resources(num_of_cards_to_give)
+            cards_to_give = [res for res in range(5) for _ in range(give[res])]
             num_cards_wanted = random.randint(1, 3)
             cards_wanted = random.choices([0, 1, 2, 3, 4], k=num_cards_wanted)
             action = Action(
@@ -192,8 +176,8 @@ class HeuristicStrategy(Player):
                 theirs=cards_wanted,
             )
             return action
-        elif len(legal_actions):
+        elif num_legal:
             # do something else
-            return random.choice(legal_actions)
+            return self.sample_legal_action(board, stats, random, categories)
         else:
             return Action(Action.DO_NOTHING)
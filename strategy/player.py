@@ -1,9 +1,15 @@
-from collections import defaultdict
 from copy import deepcopy
 from abc import ABC, abstractmethod
+import random
+from typing import Callable
 
-from basic import Action, DevCard, GameStats, Port, Tile
+import numpy as np
+
+from basic import Action, Cost, DevCard, GameStats, Port, Tile, Zobrist
+from basic.zobrist import MAX_PLAYERS, count_key
 from board import Board
+from board.bitboard import nth_bit
+from board.features import FeatureCache
 from board.position import Position
 import logger
 
@@ -13,12 +19,18 @@ colors = ["red", "blue", "orange", "white", "green", "black"]
 class Player(ABC):
     # Class variable to keep track of number of players created, used for assigning player IDs and colors
     num_players = 0
+    # Static board features shared by every player, swap in a disk-backed cache for sweeps
+    feature_cache = FeatureCache()
+    # Offer Road Building, Year of Plenty and bank trades one part at a time, see `pending`
+    factored = False
+    # draws steals and default discards, a game with its own generator replaces it
+    rng = random
 
     def __init__(self) -> None:
         # Public attributes
         self.player_id = Player.num_players
         Player.num_players += 1
-        assert self.player_id in range(6)
+        assert self.player_id < MAX_PLAYERS, "At most {} players".format(MAX_PLAYERS)
         self.color = colors[self.player_id]
         self.roads_remaining = 15
         self.settlements_remaining = 5
@@ -28,9 +40,13 @@ class Player(ABC):
         self.longest_road_length = 1
 
         # Private attributes between game and player
-        self.resources = {0: 0, 1: 0, 2: 0, 3: 0, 4: 0}
+        self.resources = np.zeros(5, dtype=np.int64)  # count of each resource
         self.cards: list[int] = []
         self.unusable_dev_cards: list[int] = []  # Need to wait a turn before using
+        # Zobrist hash of the above, only change them through the methods that keep it in step
+        self.state_hash = 0
+        # First part of a factored action, the next decision completes it
+        self.pending: Action | None = None
 
     ###################
     # General Methods #
@@ -39,7 +55,7 @@ class Player(ABC):
     def __str__(self) -> str:
         return "Player {} (\n\tresources={},\n\troads_remaining={},\n\tsettlements_remaining={},\n\tcities_remaining={},\n\tdev_cards={},\n\tknights_played={},\n\tcontrolled_ports={},\n\tlongest_road_length={})".format(
             self.color,
-            {Tile.to_name(k): v for k, v in self.resources.items()},
+            self.resources_by_name(),
             self.roads_remaining,
             self.settlements_remaining,
             self.cities_remaining,
@@ -55,28 +71,111 @@ class Player(ABC):
 
     # Private attributes between game and player
     def empty(self) -> bool:
-        return sum(self.resources.values()) == 0
+        return not self.resources.any()
+
+    # Private attributes between game and player
+    def num_resources(self) -> int:
+        return int(self.resources.sum())
+
+    # Private attributes between game and player
+    def resources_by_name(self) -> dict[str, int]:
+        return {Tile.to_name(res): int(qty) for res, qty in enumerate(self.resources)}
+
+    # Private attributes between game and player
+    def random_resource(self) -> int | None:
+        """Picks one of self's resource cards uniformly at random straight from the counts, useful for actions like stealing a random card"""
+        total = self.num_resources()
+        if total == 0:
+            return None
+        card = self.rng.randrange(total)
+        return int(np.searchsorted(self.resources.cumsum(), card, "right"))
+
+    # Private attributes between game and player
+    def sample_resources(self, num: int) -> np.ndarray:
+        """Counts of `num` of self's resource cards drawn uniformly without replacement, useful for discards and trades"""
+        remaining = self.resources.copy()
+        sample = np.zeros(5, dtype=np.int64)
+        total = int(remaining.sum())
+        for _ in range(num):
+            res = np.searchsorted(
+                remaining.cumsum(), self.rng.randrange(total), "right"
+            )
+            remaining[res] -= 1
+            sample[res] += 1
+            total -= 1
+        return sample
 
     # Private attributes between game and player
-    def get_resource_cards(self) -> list[int]:
-        """Converts selfs resource cards from self's dictionary of counts to a list of cards, useful for actions like stealing a random card"""
-        resource_cards = []
-        for res in self.resources:
-            for _ in range(self.resources[res]):
-                resource_cards.append(res)
-        return resource_cards
+    def add_resource(self, resource: int, num: int = 1) -> None:
+        """Gives self `num` of a resource, or takes them away when negative"""
+        keys = Zobrist.RESOURCES[self.player_id][resource]
+        old = int(self.resources[resource])
+        self.resources[resource] = old + num
+        self.state_hash ^= count_key(keys, old) ^ count_key(keys, old + num)
 
     # Private attributes between game and player
-    def set_resource_cards(self, resource_cards: list[int]):
-        """Converts a list of cards to self's dictionary of counts, see `get_resource_cards`"""
-        self.resources = {0: 0, 1: 0, 2: 0, 3: 0, 4: 0}
-        for card in resource_cards:
-            self.resources[card] += 1
+    def add_resources(self, counts: np.ndarray) -> None:
+        for res in np.flatnonzero(counts):
+            self.add_resource(int(res), int(counts[res]))
+
+    # Private attributes between game and player
+    def pay(self, build: int) -> None:
+        self.add_resources(-Cost.MATRIX[build])
+
+    # Private attributes between game and player
+    def add_dev_card(self, card: int) -> None:
+        """Takes a newly bought card, usable from next turn"""
+        self._hash_dev_card(card, False)
+        self.unusable_dev_cards.append(card)
+        self._hash_dev_card(card, False)
+
+    # Private attributes between game and player
+    def use_dev_card(self, card: int) -> None:
+        self._hash_dev_card(card, True)
+        self.cards.remove(card)
+        self._hash_dev_card(card, True)
+        if card == DevCard.KNIGHT:
+            keys = Zobrist.KNIGHTS[self.player_id]
+            self.state_hash ^= count_key(keys, self.knights_played)
+            self.knights_played += 1
+            self.state_hash ^= count_key(keys, self.knights_played)
+
+    def _hash_dev_card(self, card: int, usable: bool) -> None:
+        """XORs the key of the current count of a card, call before and after changing it"""
+        cards = self.cards if usable else self.unusable_dev_cards
+        keys = Zobrist.DEV_CARDS[self.player_id][int(usable)][card]
+        self.state_hash ^= count_key(keys, cards.count(card))
+
+    def compute_state_hash(self) -> int:
+        """Hash of self's hand from scratch, which `state_hash` keeps equal to incrementally"""
+        h = count_key(Zobrist.KNIGHTS[self.player_id], self.knights_played)
+        for res, count in enumerate(self.resources):
+            h ^= count_key(Zobrist.RESOURCES[self.player_id][res], int(count))
+        for usable, cards in enumerate([self.unusable_dev_cards, self.cards]):
+            for card in set(cards):
+                keys = Zobrist.DEV_CARDS[self.player_id][usable][card]
+                h ^= count_key(keys, cards.count(card))
+        return h
+
+    @staticmethod
+    def reset_ids() -> None:
+        """Restarts player ID assignment, call before seating the players of a new game in the same process"""
+        Player.num_players = 0
+
+    def interrupted(self) -> None:
+        """Called when a decision was cut off by its time budget, to drop any state it left half-written"""
+        pass
 
     def turn_ended(self):
         """Call at end of turn to update any attributes that need to wait until the end of the turn, such as dev cards that were just bought"""
+        moved = set(self.unusable_dev_cards)
+        for card in moved:
+            self._hash_dev_card(card, False)
+            self._hash_dev_card(card, True)
         self.cards += self.unusable_dev_cards
         self.unusable_dev_cards = []
+        for card in moved:
+            self._hash_dev_card(card, True)
 
     ################################
     # Strategic Abstract Decisions #
@@ -87,7 +186,8 @@ class Player(ABC):
         raise NotImplementedError()
 
     @abstractmethod
-    def discard_cards(self, num_to_discard: int) -> list[int]:
+    def discard_cards(self, num_to_discard: int) -> np.ndarray:
+        """Returns the count of each resource to discard, summing to `num_to_discard`"""
         raise NotImplementedError()
 
     @abstractmethod
@@ -112,10 +212,52 @@ class Player(ABC):
     ) -> Action:
         raise NotImplementedError()
 
+    #####################
+    # Default Decisions #
+    #####################
+
+    def default_settle(self, board: Board, second: bool) -> list[Action]:
+        """First free vertex and its first free road, for decisions that run out of time"""
+        pos = next(pos for pos in board.vertices if pos.can_settle())
+        return [
+            Action(Action.SETTLE_INIT, pos=pos.pos, second=second),
+            Action(
+                Action.BUILD_ROAD_INIT,
+                pos=pos.pos,
+                road_name=pos.get_available_roads()[0],
+            ),
+        ]
+
+    def default_discard(self, num_to_discard: int) -> np.ndarray:
+        return self.sample_resources(num_to_discard)
+
+    def default_robber_action(self, board: Board) -> Action:
+        return self.get_robber_options(board)[0]
+
+    def default_finalizes_trade(
+        self, propose_trade_action: Action, players: list[int]
+    ) -> Action:
+        return Action(
+            Action.TRADE,
+            with_player=players[0],
+            mine=propose_trade_action.params["mine"],
+            theirs=propose_trade_action.params["theirs"],
+        )
+
     ########################
     # Verification Methods #
     ########################
 
+    def fast_vps(self, stats: GameStats) -> int:
+        """Same as `vps`, from the piece counts instead of a scan of the board"""
+        vp = 5 - self.settlements_remaining + 2 * (4 - self.cities_remaining)
+        vp += self.cards.count(DevCard.VP)
+        if stats.largest_army_player == self.player_id:
+            vp += 2
+        if stats.longest_road_player == self.player_id:
+            vp += 2
+        return vp
+
     def vps(self, board: Board, stats: GameStats):
         sources = {  # for pretty printing
             "largest_army": False,
@@ -147,9 +289,8 @@ class Player(ABC):
         return vp
 
     def check_all_ok(self):
-        for res in self.resources:
-            if self.resources[res] < 0:
-                raise ValueError("Cannot have negative resources")
+        if (self.resources < 0).any():
+            raise ValueError("Cannot have negative resources")
         if self.roads_remaining < 0:
             raise ValueError("Cannot build too many roads")
         if self.settlements_remaining < 0:
@@ -161,25 +302,13 @@ class Player(ABC):
     # Collecting Resources Methods #
     ################################
 
-    def on_7_roll(self):
-        resource_cards = self.get_resource_cards()
-        if len(resource_cards) > 7:
-            num_to_discard = len(resource_cards) // 2
-            discard_cards = self.discard_cards(num_to_discard)
-            new_cards = []
-            for i, card in enumerate(resource_cards):
-                if i in discard_cards:
-                    continue
-                new_cards.append(card)
-            self.set_resource_cards(new_cards)
-
     def collect_resource_from_tile(self, tile: Tile, pos: Position):
         if tile.has_knight:
             logger.debug(
                 "Player {} could NOT collect anything due to knight".format(self.color),
             )
         else:
-            self.resources[tile.tile] += pos.fixture_score
+            self.add_resource(tile.tile, pos.fixture_score)
             logger.debug(
                 "Player {} collects {} {}".format(
                     self.color,
@@ -194,73 +323,39 @@ class Player(ABC):
                 if tile.tile < 5 and tile.value == d6:
                     self.collect_resource_from_tile(tile, pos)
 
-    def handle_dice_roll(self, board: Board, d6: int):
-        if d6 == 7:
-            self.on_7_roll()
-        else:
-            self.collect_resources(board, d6)
-
     ########################
     # Capabilities Methods #
     ########################
 
     def can_accept_trade(self, propose_trade_action: Action) -> bool:
-        res_to_qty = defaultdict(int)
-        for res in propose_trade_action.params["theirs"]:
-            res_to_qty[res] += 1
-        for res in propose_trade_action.params["theirs"]:
-            if self.resources[res] < res_to_qty[res]:
-                return False
-        return True
+        theirs = np.bincount(propose_trade_action.params["theirs"], minlength=5)
+        return bool((self.resources >= theirs).all())
+
+    def affordable(self) -> np.ndarray:
+        """Whether self has the resources for each build, indexed by `Cost`"""
+        return (self.resources >= Cost.MATRIX).all(axis=1)
 
     def can_build_dev_card(self):
-        return (
-            self.has_resource(Tile.ROCK)
-            and self.has_resource(Tile.SHEEP)
-            and self.has_resource(Tile.WHEAT)
-        )
+        return bool(self.affordable()[Cost.DEV_CARD])
 
     def can_build_settlement(self):
-        return (
-            self.has_resource(Tile.WHEAT)
-            and self.has_resource(Tile.SHEEP)
-            and self.has_resource(Tile.TREE)
-            and self.has_resource(Tile.MUD)
-            and self.settlements_remaining
-        )
+        return self.affordable()[Cost.SETTLEMENT] and self.settlements_remaining
 
     def can_build_road(self):
-        return (
-            self.has_resource(Tile.MUD)
-            and self.has_resource(Tile.TREE)
-            and self.roads_remaining
-        )
+        return self.affordable()[Cost.ROAD] and self.roads_remaining
 
     def can_build_city(self):
-        return (
-            self.resources[Tile.ROCK] >= 3
-            and self.resources[Tile.WHEAT] >= 2
-            and self.cities_remaining
-        )
+        return self.affordable()[Cost.CITY] and self.cities_remaining
 
     #########################
     # Legal Actions Methods #
     #########################
 
     def get_settlement_options(self, board: Board) -> list[Action]:
-        options = []
-        for row in board.positions:
-            for pos in row:
-                owns_road = [
-                    pos.left_road == self.player_id,
-                    pos.right_road == self.player_id,
-                    pos.up_road == self.player_id,
-                    pos.down_road == self.player_id,
-                ]
-                owns_road = owns_road.count(True) == 1
-                if pos.can_settle() and owns_road:
-                    options.append(Action(Action.SETTLE, pos=pos.pos))
-        return options
+        return [
+            Action(Action.SETTLE, pos=pos.pos)
+            for pos in board.get_settlement_options(self.player_id)
+        ]
 
     def get_city_options(self, board: Board) -> list[Action]:
         options = []
@@ -277,90 +372,253 @@ class Player(ABC):
             for tile, steal_from_id in knight_options
         ]
 
-    def get_legal_actions(self, board: Board, stats: GameStats) -> list[Action]:
-        legal_actions = []
+    def get_pending_options(self, board: Board) -> list[Action]:
+        """Ways to complete the pending part of a factored action"""
+        a = self.pending.action
+        if a == Action.USE_DEV_ROADS:
+            return [
+                Action(Action.DEV_ROAD_STEP, pos=pos.pos, road_name=road_name)
+                for pos, road_name in board.get_road_options(self.player_id)
+            ]
+        if a == Action.USE_YEAR_OF_PLENTY:
+            # the second pick is never below the first, so each pair comes up once
+            return [
+                Action(Action.PLENTY_STEP, resource=res)
+                for res in range(self.pending.params["resource1"], 5)
+            ]
+        source = self.pending.params["source"]
+        return [
+            Action(Action.TRADE_STEP, dest=res) for res in range(5) if res != source
+        ]
+
+    def get_action_categories(
+        self, board: Board, stats: GameStats
+    ) -> list[tuple[int, Callable[[int], Action]]]:
+        """
+        Legal actions in `get_legal_actions` order, grouped by kind as (count, pick) where
+        `pick(i)` builds the i-th action of the group. Counting is cheap even where listing
+        is not, e.g. the pairs of roads of Road Building.
+        """
+        if self.pending is not None:
+            options = self.get_pending_options(board)
+            return [(len(options), options.__getitem__)]
+        categories = []
         if self.can_build_dev_card() and stats.num_dev_cards > 0:
-            legal_actions.append(Action(Action.GET_DEV_CARD))
+            categories.append((1, lambda i: Action(Action.GET_DEV_CARD)))
         if self.can_build_settlement():
-            settlement_options = self.get_settlement_options(board)
-            legal_actions += settlement_options
+            settlements = board.bitboard.settlement_options(self.player_id)
+            categories.append(
+                (
+                    settlements.bit_count(),
+                    lambda i: Action(
+                        Action.SETTLE, pos=board.vertices[nth_bit(settlements, i)].pos
+                    ),
+                )
+            )
+        road_options = board.get_road_options(self.player_id)
         if self.can_build_road():
-            legal_actions += [
-                Action(Action.BUILD_ROAD, pos=pos.pos, road_name=road_name)
-                for pos, road_name in board.get_road_options(self.player_id)
-            ]
+            categories.append(
+                (
+                    len(road_options),
+                    lambda i: Action(
+                        Action.BUILD_ROAD,
+                        pos=road_options[i][0].pos,
+                        road_name=road_options[i][1],
+                    ),
+                )
+            )
         if self.can_build_city():
             city_options = self.get_city_options(board)
-            legal_actions += city_options
-        # 4:1 or 3:1
+            categories.append((len(city_options), city_options.__getitem__))
+        # 4:1 or 3:1, then ports
+        exchanges = []
         has_3_to_1 = Port.THREE_ONE in self.controlled_ports
-        for res in self.resources:
+        for res in range(5):
             if has_3_to_1:
                 if self.resources[res] >= 3:
-                    for new_res in range(5):
-                        if new_res != res:
-                            legal_actions.append(
-                                Action(Action.THREE_TO_ONE, source=res, dest=new_res)
-                            )
+                    exchanges.append((Action.THREE_TO_ONE, res))
             else:
                 if self.resources[res] >= 4:
-                    for new_res in range(5):
-                        if new_res != res:
-                            legal_actions.append(
-                                Action(Action.FOUR_TO_ONE, source=res, dest=new_res)
-                            )
-        # Ports
+                    exchanges.append((Action.FOUR_TO_ONE, res))
         for port in self.controlled_ports:
             if port != Port.THREE_ONE and self.resources[port] >= 2:
-                for new_res in range(5):
-                    if new_res != port:
-                        legal_actions.append(
-                            Action(Action.TWO_TO_ONE, source=port, dest=new_res)
-                        )
+                exchanges.append((Action.TWO_TO_ONE, port))
+        if self.factored:
+            categories.append(
+                (
+                    len(exchanges),
+                    lambda i: Action(
+                        exchanges[i][0], source=exchanges[i][1], dest=None
+                    ),
+                )
+            )
+        else:
+
+            def exchange(i: int) -> Action:
+                action_type, source = exchanges[i // 4]
+                dest = i % 4
+                return Action(
+                    action_type, source=source, dest=dest if dest < source else dest + 1
+                )
+
+            categories.append((4 * len(exchanges), exchange))
         # Dev Cards
         if DevCard.KNIGHT in self.cards:
             knight_options = board.get_knight_options(self.player_id)
-            legal_actions += [
-                Action(Action.USE_KNIGHT, tile=tile.pos, steal_from_id=steal_from_id)
-                for tile, steal_from_id in knight_options
-            ]
+            categories.append(
+                (
+                    len(knight_options),
+                    lambda i: Action(
+                        Action.USE_KNIGHT,
+                        tile=knight_options[i][0].pos,
+                        steal_from_id=knight_options[i][1],
+                    ),
+                )
+            )
         if DevCard.MONOPOLY in self.cards:
-            for res in range(5):
-                legal_actions.append(Action(Action.USE_MONOPOLY, resource=res))
+            categories.append((5, lambda i: Action(Action.USE_MONOPOLY, resource=i)))
         if DevCard.PLENTY in self.cards:
-            for res1 in range(5):
-                for res2 in range(5):
-                    legal_actions.append(
-                        Action(
-                            Action.USE_YEAR_OF_PLENTY, resource1=res1, resource2=res2
-                        )
+            if self.factored:
+                categories.append(
+                    (
+                        5,
+                        lambda i: Action(
+                            Action.USE_YEAR_OF_PLENTY, resource1=i, resource2=None
+                        ),
                     )
-        if DevCard.ROADS in self.cards:
-            if self.roads_remaining >= 1:
-                for pos1, road1 in board.get_road_options(self.player_id):
-                    if self.roads_remaining >= 2:
-                        new_board = deepcopy(board)
-                        new_board.get_position(pos1.pos).build_road(
-                            road1, self.player_id
-                        )
-                        for pos2, road2 in new_board.get_road_options(self.player_id):
-                            legal_actions.append(
-                                Action(
-                                    Action.USE_DEV_ROADS,
-                                    pos1=pos1.pos,
-                                    road1=road1,
-                                    pos2=pos2.pos,
-                                    road2=road2,
-                                )
-                            )
-                    else:
-                        legal_actions.append(
-                            Action(
-                                Action.USE_DEV_ROADS,
-                                pos1=pos1.pos,
-                                road1=road1,
-                                pos2=None,
-                                road2=None,
-                            )
-                        )
-        return legal_actions
+                )
+            else:
+                categories.append(
+                    (
+                        25,
+                        lambda i: Action(
+                            Action.USE_YEAR_OF_PLENTY, resource1=i // 5, resource2=i % 5
+                        ),
+                    )
+                )
+        if DevCard.ROADS in self.cards and self.roads_remaining >= 1:
+            categories.append(self.get_dev_road_category(board, road_options))
+        return categories
+
+    def get_dev_road_category(
+        self, board: Board, road_options: list[tuple[Position, str]]
+    ) -> tuple[int, Callable[[int], Action]]:
+        if self.roads_remaining == 1 or self.factored:
+            # a single road left, or factored with the second road decided next
+            return (
+                len(road_options),
+                lambda i: Action(
+                    Action.USE_DEV_ROADS,
+                    pos1=road_options[i][0].pos,
+                    road1=road_options[i][1],
+                    pos2=None,
+                    road2=None,
+                ),
+            )
+        second_counts = board.bitboard.second_road_counts(self.player_id)
+
+        def pair(i: int) -> Action:
+            first = 0
+            while i >= second_counts[first]:
+                i -= second_counts[first]
+                first += 1
+            pos1, road1 = road_options[first]
+            bitboard = deepcopy(board.bitboard)
+            bitboard.build_road(board.edge_index(pos1.pos, road1), self.player_id)
+            v, road2 = bitboard.road_options(self.player_id)[i]
+            return Action(
+                Action.USE_DEV_ROADS,
+                pos1=pos1.pos,
+                road1=road1,
+                pos2=board.vertices[v].pos,
+                road2=road2,
+            )
+
+        return sum(second_counts), pair
+
+    def completions(self, board: Board, action: Action) -> list[Action] | None:
+        """
+        The whole actions that the first part of a factored action leaves open, so that
+        strategies can value the first part by its best completion. None for any other
+        action, including a Road Building with a single road to build.
+        """
+        if not self.factored:
+            return None
+        a = action.action
+        if a in [Action.FOUR_TO_ONE, Action.THREE_TO_ONE, Action.TWO_TO_ONE]:
+            if action.params["dest"] is not None:
+                return None
+            source = action.params["source"]
+            return [
+                Action(a, source=source, dest=res) for res in range(5) if res != source
+            ]
+        if a == Action.USE_YEAR_OF_PLENTY:
+            if action.params["resource2"] is not None:
+                return None
+            resource1 = action.params["resource1"]
+            return [
+                Action(a, resource1=resource1, resource2=res)
+                for res in range(resource1, 5)
+            ]
+        if a == Action.USE_DEV_ROADS:
+            if action.params["pos2"] is not None or self.roads_remaining < 2:
+                return None
+            pos1, road1 = action.params["pos1"], action.params["road1"]
+            bitboard = deepcopy(board.bitboard)
+            bitboard.build_road(board.edge_index(pos1, road1), self.player_id)
+            return [
+                Action(
+                    a,
+                    pos1=pos1,
+                    road1=road1,
+                    pos2=board.vertices[v].pos,
+                    road2=road2,
+                )
+                for v, road2 in bitboard.road_options(self.player_id)
+            ] or None
+        return None
+
+    def completed_action(self, action: Action) -> int:
+        """Type of the action a step of a factored action completes, the action's own type otherwise"""
+        if action.action == Action.DEV_ROAD_STEP:
+            return Action.USE_DEV_ROADS
+        if action.action == Action.PLENTY_STEP:
+            return Action.USE_YEAR_OF_PLENTY
+        if action.action == Action.TRADE_STEP:
+            return self.pending.action
+        return action.action
+
+    def get_legal_actions(self, board: Board, stats: GameStats) -> list[Action]:
+        """
+        Every action self can take now. A `factored` player gets the first part of Road
+        Building, Year of Plenty and bank trades, and after taking one only the ways to
+        complete it, see `get_pending_options`.
+        """
+        return [
+            pick(i)
+            for count, pick in self.get_action_categories(board, stats)
+            for i in range(count)
+        ]
+
+    def sample_legal_action(
+        self,
+        board: Board,
+        stats: GameStats,
+        rng: random.Random,
+        categories: list[tuple[int, Callable[[int], Action]]] | None = None,
+    ) -> Action | None:
+        """
+        Same as `rng.choice(self.get_legal_actions(board, stats))` without listing every
+        action, and drawing the same number so seeded games play out the same. `rng` may be
+        the `random` module itself. None when there is no legal action.
+        """
+        if categories is None:
+            categories = self.get_action_categories(board, stats)
+        total = sum(count for count, _ in categories)
+        if total == 0:
+            return None
+        i = rng.randrange(total)
+        for count, pick in categories:
+            if i < count:
+                return pick(i)
+            i -= count
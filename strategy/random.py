@@ -1,5 +1,7 @@
 import random
 
+import numpy as np
+
 from basic import Action, GameStats
 from board import Board
 import logger
@@ -18,9 +20,8 @@ class RandomStrategy(Player):
                     Action(Action.BUILD_ROAD_INIT, pos=pos.pos, road_name=road_name),
                 ]
 
-    def discard_cards(self, num_to_discard: int) -> list[int]:
-        cards = self.get_resource_cards()
-        return random.sample(range(len(cards)), num_to_discard)
+    def discard_cards(self, num_to_discard: int) -> np.ndarray:
+        return self.sample_resources(num_to_discard)
 
     def choose_robber_action(self, board: Board) -> Action:
         robber_options = self.get_robber_options(board)
@@ -46,22 +47,20 @@ class RandomStrategy(Player):
         board: Board,
         stats: GameStats,
     ) -> Action:
-        legal_actions = self.get_legal_actions(board, stats)
-        logger.debug(
-            "Player {} has legal actions {}".format(self.player_id, legal_actions)
-        )
+        # count the legal actions and only build the one drawn
+        categories = self.get_action_categories(board, stats)
+        num_legal = sum(count for count, _ in categories)
+        logger.debug("Player {} has {} legal actions".format(self.player_id, num_legal))
         r = random.random()
-        if (len(legal_actions) and r < 0.3) or (not len(legal_actions) and r < 0.7):
+        if (num_legal and r < 0.3) or (not num_legal and r < 0.7):
             # do nothing chance
             return Action(Action.DO_NOTHING)
-        elif not self.empty() and (
-            (len(legal_actions) and r < 0.5) or (not len(legal_actions))
-        ):
+        elif not self.empty() and ((num_legal and r < 0.5) or (not num_legal)):
             # propose trade chance
-            cards = self.get_resource_cards()
             # limit number of cards to give in trade to 3 to avoid too much trading
-            num_of_cards_to_give = min(random.randint(1, 3), len(cards))
-            cards_to_give = random.sample(cards, num_of_cards_to_give)
+            num_of_cards_to_give = min(random.randint(1, 3), self.num_resources())
+            give = self.sample_resources(num_of_cards_to_give)
+            cards_to_give = [res for res in range(5) for _ in range(give[res])]
             num_cards_wanted = random.randint(1, 3)
             cards_wanted = random.choices([0, 1, 2, 3, 4], k=num_cards_wanted)
             action = Action(
@@ -71,8 +70,8 @@ class RandomStrategy(Player):
                 theirs=cards_wanted,
             )
             return action
-        elif len(legal_actions):
+        elif num_legal:
             # do something else
-            return random.choice(legal_actions)
+            return self.sample_legal_action(board, stats, random, categories)
         else:
             return Action(Action.DO_NOTHING)
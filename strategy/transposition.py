@@ -0,0 +1,91 @@
+import numpy as np
+
+# One entry, 24 bytes. `action` is the index of the best action in the state's legal
+# action list, which is the same list every time the same state comes up.
+ENTRY = np.dtype(
+    [
+        ("key", np.uint64),  # state hash, 0 for an empty slot
+        ("value", np.float32),
+        ("visits", np.uint32),
+        ("action", np.int32),  # -1 when unknown
+        ("depth", np.int8),  # how far ahead the value looked
+        ("age", np.uint8),  # search the entry was last written in
+    ],
+    align=True,
+)
+
+
+class TranspositionTable:
+    """
+    Fixed-capacity cache of search results keyed by `Game.state_hash`. Slots are grouped in
+    buckets of `ways`; a full bucket replaces an entry from an older search first, then the
+    shallowest one. Keep one table for a whole game so work carries over between turns.
+    """
+
+    def __init__(self, capacity: int = 1 << 16, ways: int = 4) -> None:
+        self.ways = ways
+        self.num_buckets = max(1, capacity // ways)
+        self.entries = np.zeros(self.num_buckets * ways, dtype=ENTRY)
+        self.age = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.entries["key"]))
+
+    def bucket(self, key: int) -> range:
+        start = (key % self.num_buckets) * self.ways
+        return range(start, start + self.ways)
+
+    @staticmethod
+    def stored_key(key: int) -> int:
+        return key or 1  # 0 marks empty slots
+
+    def new_search(self) -> None:
+        """Call before each decision, so entries from earlier decisions age"""
+        self.age = (self.age + 1) % 256
+
+    def clear(self) -> None:
+        self.entries[:] = 0
+        self.hits = self.misses = 0
+
+    def lookup(self, key: int, min_depth: int = 0) -> np.void | None:
+        """Entry of the state searched at least `min_depth` deep, or None"""
+        stored = self.stored_key(key)
+        for i in self.bucket(stored):
+            entry = self.entries[i]
+            if int(entry["key"]) == stored and int(entry["depth"]) >= min_depth:
+                entry["visits"] += 1
+                entry["age"] = self.age
+                self.hits += 1
+                return entry
+        self.misses += 1
+        return None
+
+    def store(self, key: int, value: float, depth: int, action: int = -1) -> None:
+        stored = self.stored_key(key)
+        slots = self.bucket(stored)
+        victim = slots[0]
+        victim_score = None
+        for i in slots:
+            entry = self.entries[i]
+            if int(entry["key"]) == stored:
+                if depth < int(entry["depth"]):
+                    return  # keep the deeper result
+                victim = i
+                break
+            if not entry["key"]:
+                victim = i
+                break
+            # older searches go first, then shallower ones
+            score = (int(entry["age"]) == self.age, int(entry["depth"]))
+            if victim_score is None or score < victim_score:
+                victim, victim_score = i, score
+        entry = self.entries[victim]
+        visits = int(entry["visits"]) if int(entry["key"]) == stored else 0
+        entry["key"] = stored
+        entry["value"] = value
+        entry["visits"] = visits + 1
+        entry["action"] = action
+        entry["depth"] = depth
+        entry["age"] = self.age
@@ -0,0 +1,315 @@
+from abc import ABC, abstractmethod
+import random
+
+import numpy as np
+
+from basic import Action, Cost, GameStats
+from board import Board
+from board.features import NUM_FEATURES as NUM_VERTEX_FEATURES
+import logger
+
+from .player import Player
+
+# steps of factored actions share the column of the action they complete
+NUM_ACTION_TYPES = 17
+
+# Columns of a candidate action's feature vector
+RESOURCES = 0  # own resources after the action, one column per resource
+RESOURCE_DELTA = 5  # change in own resources, one column per resource
+PIECES = 10  # roads, settlements and cities remaining after the action
+VP_DELTA = 13  # victory points gained on the board
+ACTION_TYPE = 14  # one-hot action type
+TARGET = ACTION_TYPE + NUM_ACTION_TYPES  # static features of the vertex built on
+NUM_FEATURES = TARGET + NUM_VERTEX_FEATURES
+
+
+class Evaluator(ABC):
+    """Scores a batch of feature vectors, shape (candidates, NUM_FEATURES), in one pass"""
+
+    @abstractmethod
+    def __call__(self, features: np.ndarray) -> np.ndarray:
+        raise NotImplementedError()
+
+
+class LinearEvaluator(Evaluator):
+    def __init__(self, weights: np.ndarray, bias: float = 0.0) -> None:
+        assert weights.shape == (NUM_FEATURES,), "Expected one weight per feature"
+        self.weights = weights.astype(np.float32)
+        self.bias = np.float32(bias)
+
+    def __call__(self, features: np.ndarray) -> np.ndarray:
+        return features @ self.weights + self.bias
+
+
+class MLPEvaluator(Evaluator):
+    """Fully connected network with ReLU hidden layers and a single linear output"""
+
+    def __init__(self, layers: list[tuple[np.ndarray, np.ndarray]]) -> None:
+        assert layers[0][0].shape[0] == NUM_FEATURES, "Expected one input per feature"
+        assert layers[-1][0].shape[1] == 1, "Expected a single output"
+        self.layers = [(w.astype(np.float32), b.astype(np.float32)) for w, b in layers]
+
+    def __call__(self, features: np.ndarray) -> np.ndarray:
+        x = features
+        for w, b in self.layers[:-1]:
+            x = np.maximum(x @ w + b, 0)
+        w, b = self.layers[-1]
+        return (x @ w + b)[:, 0]
+
+
+def load_evaluator(path: str) -> Evaluator:
+    """
+    Loads an evaluator from an `.npz` file, either a linear one saved with arrays `weights`
+    and `bias`, or an MLP saved with arrays `w0`, `b0`, `w1`, `b1`, ... for each layer
+    """
+    data = np.load(path)
+    width = len(data["weights"]) if "weights" in data else len(data["w0"])
+    if width != NUM_FEATURES:
+        raise ValueError(
+            "{} has {} input features, this version expects {}".format(
+                path, width, NUM_FEATURES
+            )
+        )
+    if "weights" in data:
+        return LinearEvaluator(data["weights"], float(data.get("bias", 0.0)))
+    layers = []
+    while "w{}".format(len(layers)) in data:
+        i = len(layers)
+        layers.append((data["w{}".format(i)], data["b{}".format(i)]))
+    return MLPEvaluator(layers)
+
+
+def default_evaluator() -> LinearEvaluator:
+    """Hand-set weights that favour building and good vertices, a baseline until trained weights exist"""
+    weights = np.zeros(NUM_FEATURES, dtype=np.float32)
+    weights[RESOURCES : RESOURCES + 5] = 0.1
+    weights[VP_DELTA] = 4.0
+    weights[ACTION_TYPE + Action.DO_NOTHING] = 0.5
+    weights[ACTION_TYPE + Action.BUILD_ROAD] = 1.0
+    weights[ACTION_TYPE + Action.GET_DEV_CARD] = 2.0
+    weights[ACTION_TYPE + Action.USE_KNIGHT] = 1.5
+    weights[ACTION_TYPE + Action.USE_MONOPOLY] = 1.5
+    weights[ACTION_TYPE + Action.USE_YEAR_OF_PLENTY] = 1.5
+    weights[ACTION_TYPE + Action.USE_DEV_ROADS] = 2.0
+    weights[TARGET] = 0.2  # total pips
+    return LinearEvaluator(weights)
+
+
+def evaluate_batch(
+    evaluator: Evaluator, feature_matrices: list[np.ndarray]
+) -> list[np.ndarray]:
+    """Scores the candidates of many decision points, e.g. one per parallel game, in a single call"""
+    if not feature_matrices:
+        return []
+    scores = evaluator(np.concatenate(feature_matrices))
+    return np.split(scores, np.cumsum([len(m) for m in feature_matrices])[:-1])
+
+
+class ValueStrategy(Player):
+    # Scores every candidate action with a learned (or hand-set) evaluator and takes the best one
+
+    # `.npz` weights for instances built without an evaluator, see `load_evaluator`. Set
+    # before forking worker processes, which inherit it.
+    weights_path: str | None = None
+
+    def __init__(self, evaluator: Evaluator | None = None) -> None:
+        super().__init__()
+        if evaluator is None and ValueStrategy.weights_path is not None:
+            evaluator = load_evaluator(ValueStrategy.weights_path)
+        self.evaluator = evaluator or default_evaluator()
+
+    def target_vertex(self, board: Board, action: Action) -> int | None:
+        """Vertex an action builds on, the far end for roads"""
+        if action.action in [
+            Action.SETTLE,
+            Action.SETTLE_INIT,
+            Action.BUILD_CITY,
+        ]:
+            return board.get_position(action.params["pos"]).index
+        if action.action in [
+            Action.BUILD_ROAD,
+            Action.BUILD_ROAD_INIT,
+            Action.DEV_ROAD_STEP,
+        ]:
+            pos = board.get_position(action.params["pos"])
+            return getattr(pos, action.params["road_name"][: -len("_road")]).index
+        return None
+
+    def resource_delta(self, action: Action) -> np.ndarray:
+        delta = np.zeros(5, dtype=np.int64)
+        a = action.action
+        if a == Action.SETTLE:
+            delta -= Cost.MATRIX[Cost.SETTLEMENT]
+        elif a == Action.BUILD_CITY:
+            delta -= Cost.MATRIX[Cost.CITY]
+        elif a == Action.BUILD_ROAD:
+            delta -= Cost.MATRIX[Cost.ROAD]
+        elif a == Action.GET_DEV_CARD:
+            delta -= Cost.MATRIX[Cost.DEV_CARD]
+        elif a in [Action.FOUR_TO_ONE, Action.THREE_TO_ONE, Action.TWO_TO_ONE]:
+            rate = {Action.FOUR_TO_ONE: 4, Action.THREE_TO_ONE: 3}.get(a, 2)
+            delta[action.params["source"]] -= rate
+            if action.params["dest"] is not None:
+                delta[action.params["dest"]] += 1
+        elif a == Action.TRADE_STEP:
+            # the whole exchange, whose first part took nothing yet
+            return self.resource_delta(
+                Action(
+                    self.pending.action,
+                    source=self.pending.params["source"],
+                    dest=action.params["dest"],
+                )
+            )
+        elif a == Action.USE_YEAR_OF_PLENTY:
+            delta[action.params["resource1"]] += 1
+            if action.params["resource2"] is not None:
+                delta[action.params["resource2"]] += 1
+        elif a == Action.PLENTY_STEP:
+            delta[action.params["resource"]] += 1
+        return delta
+
+    def action_features(self, board: Board, actions: list[Action]) -> np.ndarray:
+        """Feature matrix of the candidate actions, one row per action"""
+        vertex_features = Player.feature_cache.get(board)
+        features = np.zeros((len(actions), NUM_FEATURES), dtype=np.float32)
+        pieces = np.array(
+            [self.roads_remaining, self.settlements_remaining, self.cities_remaining]
+        )
+        for i, action in enumerate(actions):
+            row = features[i]
+            delta = self.resource_delta(action)
+            row[RESOURCES : RESOURCES + 5] = self.resources + delta
+            row[RESOURCE_DELTA : RESOURCE_DELTA + 5] = delta
+            row[PIECES : PIECES + 3] = pieces
+            a = action.action
+            if a in [Action.BUILD_ROAD, Action.BUILD_ROAD_INIT, Action.DEV_ROAD_STEP]:
+                row[PIECES] -= 1
+            elif a == Action.USE_DEV_ROADS:
+                row[PIECES] -= 1 if action.params["pos2"] is None else 2
+            elif a in [Action.SETTLE, Action.SETTLE_INIT]:
+                row[PIECES + 1] -= 1
+                row[VP_DELTA] = 1
+            elif a == Action.BUILD_CITY:
+                row[PIECES + 1] += 1
+                row[PIECES + 2] -= 1
+                row[VP_DELTA] = 1
+            row[ACTION_TYPE + self.completed_action(action)] = 1
+            v = self.target_vertex(board, action)
+            if v is not None:
+                row[TARGET:] = vertex_features[v]
+        return features
+
+    def candidates(
+        self, board: Board, stats: GameStats
+    ) -> tuple[list[Action], np.ndarray, np.ndarray]:
+        """
+        Candidate actions of a turn decision, the feature rows to score for them, and the
+        candidate each row belongs to. A first part of a factored action gets a row per
+        completion. Stack the rows of many games for `evaluate_batch`, see `batch_do`.
+        """
+        actions = [Action(Action.DO_NOTHING)] + self.get_legal_actions(board, stats)
+        whole: list[Action] = []
+        owners: list[int] = []
+        for i, action in enumerate(actions):
+            completions = self.completions(board, action) or [action]
+            whole += completions
+            owners += [i] * len(completions)
+        return actions, self.action_features(board, whole), np.array(owners)
+
+    @staticmethod
+    def reduce(
+        actions: list[Action], owners: np.ndarray, row_scores: np.ndarray
+    ) -> np.ndarray:
+        """Score of each candidate from the scores of its rows, the best completion for first parts"""
+        scores = np.full(len(actions), -np.inf, dtype=np.float32)
+        np.maximum.at(scores, owners, row_scores)
+        return scores
+
+    def score(self, board: Board, stats: GameStats) -> tuple[list[Action], np.ndarray]:
+        """Candidate actions of a turn decision with their scores"""
+        actions, features, owners = self.candidates(board, stats)
+        return actions, self.reduce(actions, owners, self.evaluator(features))
+
+    def choose(self, actions: list[Action], scores: np.ndarray) -> Action:
+        action = self.best(actions, scores)
+        logger.debug(
+            "Player {} picks {} with value {:.2f} out of {} candidates".format(
+                self.player_id, action, scores.max(), len(actions)
+            )
+        )
+        return action
+
+    def best(self, actions: list[Action], scores: np.ndarray) -> Action:
+        best = np.flatnonzero(scores == scores.max())
+        return actions[random.choice(best)]
+
+    def settle(self, board: Board, second: bool) -> list[Action]:
+        settlements = [
+            Action(Action.SETTLE_INIT, pos=pos.pos, second=second)
+            for pos in board.vertices
+            if pos.can_settle()
+        ]
+        settlement = self.best(
+            settlements, self.evaluator(self.action_features(board, settlements))
+        )
+        pos = board.get_position(settlement.params["pos"])
+        roads = [
+            Action(Action.BUILD_ROAD_INIT, pos=pos.pos, road_name=road_name)
+            for road_name in pos.get_available_roads()
+        ]
+        road = self.best(roads, self.evaluator(self.action_features(board, roads)))
+        return [settlement, road]
+
+    def discard_cards(self, num_to_discard: int) -> np.ndarray:
+        # discard from whichever resource we hold the most of
+        remaining = self.resources.copy()
+        discard = np.zeros(5, dtype=np.int64)
+        for _ in range(num_to_discard):
+            res = remaining.argmax()
+            remaining[res] -= 1
+            discard[res] += 1
+        return discard
+
+    def choose_robber_action(self, board: Board) -> Action:
+        robber_options = self.get_robber_options(board)
+        return random.choice(robber_options)
+
+    def accepts_trade(self, propose_trade_action: Action) -> bool:
+        # accept trades that give us at least as many cards as we hand over
+        return len(propose_trade_action.params["mine"]) >= len(
+            propose_trade_action.params["theirs"]
+        )
+
+    def finalizes_trade(
+        self, propose_trade_action: Action, players: list[int]
+    ) -> Action:
+        return Action(
+            Action.TRADE,
+            with_player=random.choice(players),
+            mine=propose_trade_action.params["mine"],
+            theirs=propose_trade_action.params["theirs"],
+        )
+
+    def do(
+        self,
+        board: Board,
+        stats: GameStats,
+    ) -> Action:
+        return self.choose(*self.score(board, stats))
+
+
+def batch_do(
+    players: list[ValueStrategy], boards: list[Board], stats: list[GameStats]
+) -> list[Action]:
+    """
+    `player.do(board, stats)` for the same turn decision in many parallel games, scoring
+    every game's candidates in one call to the first player's evaluator, so the players
+    should all have the same weights.
+    """
+    evaluator = players[0].evaluator
+    decisions = [p.candidates(b, s) for p, b, s in zip(players, boards, stats)]
+    row_scores = evaluate_batch(evaluator, [features for _, features, _ in decisions])
+    return [
+        player.choose(actions, player.reduce(actions, owners, scores))
+        for player, (actions, _, owners), scores in zip(players, decisions, row_scores)
+    ]
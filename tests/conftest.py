@@ -0,0 +1,9 @@
+import os
+import sys
+
+# the packages live at the top of the repository rather than in an installed distribution
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import logger
+
+logger.set_verbosity(-1)
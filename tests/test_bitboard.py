@@ -0,0 +1,22 @@
+from copy import deepcopy
+
+import pytest
+
+from batch.perft import perft_position
+from strategy import HeuristicStrategy, RandomStrategy
+
+
+@pytest.mark.parametrize("seed", ["a", "b", "c"])
+@pytest.mark.parametrize("rounds", [0, 10, 25])
+def test_second_road_counts_match_building_each_road(seed, rounds):
+    game = perft_position(
+        (HeuristicStrategy, RandomStrategy, RandomStrategy), seed, rounds
+    )
+    bitboard = game.board.bitboard
+    for player in game.players:
+        expected = []
+        for _, _, e in bitboard.road_edges(player.player_id):
+            built = deepcopy(bitboard)
+            built.build_road(e, player.player_id)
+            expected.append(len(built.road_options(player.player_id)))
+        assert bitboard.second_road_counts(player.player_id) == expected
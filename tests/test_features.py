@@ -0,0 +1,42 @@
+import os
+import subprocess
+import sys
+
+from batch.tournament import seed_game
+from board import RandomBoard
+from board.features import FeatureCache, compute_vertex_features, feature_key
+from board.spec import EXTENSION, STANDARD
+
+
+def test_disk_store_holds_every_map(tmp_path):
+    boards = [RandomBoard(STANDARD), RandomBoard(EXTENSION)]
+    cache = FeatureCache(path=str(tmp_path), slots=16)
+    for board in boards:
+        assert (cache.get(board) == compute_vertex_features(board)).all()
+    cache.flush()
+    reopened = FeatureCache(path=str(tmp_path), slots=16)
+    for board in boards:
+        assert (reopened.get(board) == compute_vertex_features(board)).all()
+    assert reopened.disk_hits == 2 and reopened.misses == 0
+
+
+def test_key_depends_on_the_map():
+    assert feature_key(RandomBoard(STANDARD)) != feature_key(RandomBoard(EXTENSION))
+
+
+def test_key_is_the_same_in_another_process():
+    script = (
+        "from batch.tournament import seed_game\n"
+        "from board import RandomBoard\n"
+        "from board.features import feature_key\n"
+        "seed_game('key')\n"
+        "print(feature_key(RandomBoard()))\n"
+    )
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    # a different hash seed than this process, as another run would get
+    env = dict(os.environ, PYTHONHASHSEED="12345", PYTHONPATH=root)
+    output = subprocess.run(
+        [sys.executable, "-c", script], env=env, capture_output=True, check=True
+    ).stdout
+    seed_game("key")
+    assert int(output) == feature_key(RandomBoard())
@@ -0,0 +1,116 @@
+import asyncio
+from multiprocessing import Process
+import os
+import socket
+import threading
+import time
+
+from batch.jobs import (
+    DirectoryJobQueue,
+    Job,
+    LocalJobQueue,
+    RemoteJobQueue,
+    play_job,
+    run_worker,
+    serve_jobs,
+    sweep_config,
+)
+from batch.stats import BatchStats
+
+LINEUP = ["HeuristicStrategy", "RandomStrategy"]
+
+
+def config(num_games: int = 8, lease_seconds: float = 60.0) -> dict:
+    return sweep_config(
+        LINEUP,
+        num_games,
+        job_size=2,
+        seed=5,
+        force_quit_after_round=60,
+        lease_seconds=lease_seconds,
+    )
+
+
+def work(path: str, worker: str) -> None:
+    run_worker(DirectoryJobQueue(path), worker, poll=0.05)
+
+
+def test_directory_sweep_across_processes_matches_one_process(tmp_path):
+    queue = DirectoryJobQueue(str(tmp_path), config())
+    workers = [
+        Process(target=work, args=(str(tmp_path), "worker{}".format(i)))
+        for i in range(2)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+        assert worker.exitcode == 0
+    assert queue.finished()
+    assert len(queue.results()) == len(queue.jobs) == 4
+    single = play_job(queue.config, Job(0, 0, 8))
+    assert queue.failed() == single["failed"] == []
+    whole = DirectoryJobQueue(str(tmp_path)).stats()
+    assert whole.summary() == BatchStats.from_dict(single["stats"]).summary()
+
+
+def test_expired_lease_is_reissued():
+    queue = LocalJobQueue(config(lease_seconds=0.05))
+    first = queue.lease("a")
+    assert queue.lease("b").job_id != first.job_id
+    queue.renew(first)
+    assert queue.lease("c").job_id != first.job_id
+    time.sleep(0.1)
+    # the first two leases lapsed, so the earliest job goes out again
+    assert queue.lease("d").job_id == first.job_id
+    queue.complete(first, {"stats": {}, "failed": []})
+    time.sleep(0.1)
+    assert all(queue.lease("e").job_id != first.job_id for _ in range(3))
+
+
+def test_stale_directory_lease_is_taken_over(tmp_path):
+    queue = DirectoryJobQueue(str(tmp_path), config(lease_seconds=5.0))
+    held = queue.lease("a")
+    assert queue.lease("b").job_id != held.job_id
+    # a worker that stopped renewing, its lease file last touched long ago
+    stale = time.time() - 60
+    os.utime(queue.lease_path(held), (stale, stale))
+    other = DirectoryJobQueue(str(tmp_path))
+    assert other.lease("c").job_id == held.job_id
+    with open(other.lease_path(held)) as f:
+        assert f.read() == "c"
+    # a renewed lease is left alone
+    queue.renew(held)
+    assert other.lease("d").job_id != held.job_id
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_remote_queue_through_coordinator():
+    queue = LocalJobQueue(config(num_games=4))
+    port = free_port()
+    coordinator = threading.Thread(
+        target=lambda: asyncio.run(serve_jobs(queue, "127.0.0.1", port))
+    )
+    coordinator.start()
+    for _ in range(100):
+        try:
+            remote = RemoteJobQueue("127.0.0.1", port)
+            break
+        except ConnectionRefusedError:
+            time.sleep(0.05)
+    assert remote.config == queue.config
+    job = remote.lease("a")
+    remote.complete(job, play_job(remote.config, job))
+    assert len(remote.results()) == 1 and not remote.finished()
+    assert run_worker(remote, "a") == 1
+    coordinator.join(timeout=30)
+    assert queue.finished()
+    assert (
+        queue.stats().summary()
+        == BatchStats.from_dict(play_job(queue.config, Job(0, 0, 4))["stats"]).summary()
+    )
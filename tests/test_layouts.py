@@ -0,0 +1,43 @@
+import numpy as np
+
+from board.layouts import (
+    SYMMETRIES,
+    LayoutBatch,
+    canonical_hashes,
+    layout_hash,
+    layout_hashes,
+)
+
+
+def test_symmetries_are_distinct_permutations():
+    assert SYMMETRIES.shape == (12, 19)
+    for perm in SYMMETRIES:
+        assert sorted(perm) == list(range(19))
+    assert len({tuple(perm) for perm in SYMMETRIES}) == 12
+
+
+def test_canonical_hash_is_shared_by_symmetric_layouts():
+    batch = LayoutBatch.random(20, np.random.default_rng(0))
+    for tiles, values in zip(batch.tiles, batch.values):
+        exact = layout_hashes(tiles[SYMMETRIES], values[SYMMETRIES])
+        canonical = canonical_hashes(tiles[SYMMETRIES], values[SYMMETRIES])
+        assert len(set(canonical.tolist())) == 1
+        # a random layout has no symmetry of its own, so every variant hashes apart
+        assert len(set(exact.tolist())) == 12
+
+
+def test_unique_drops_rotations():
+    batch = LayoutBatch.random(5, np.random.default_rng(1))
+    rotated = LayoutBatch(
+        np.concatenate([batch.tiles, batch.tiles[:, SYMMETRIES[3]]]),
+        np.concatenate([batch.values, batch.values[:, SYMMETRIES[3]]]),
+    )
+    unique = rotated.unique()
+    assert len(unique) == 5
+    assert (unique.hashes == batch.hashes).all()
+
+
+def test_board_round_trips_its_layout_hash():
+    batch = LayoutBatch.random(3, np.random.default_rng(2))
+    for i in range(len(batch)):
+        assert layout_hash(batch.board(i)) == int(batch.hashes[i])
@@ -0,0 +1,104 @@
+from itertools import combinations
+
+import pytest
+
+from batch.perft import perft_position
+from board import RandomBoard
+from board.paths import distance_table, next_road, road_network, route, search
+from board.spec import STANDARD
+from strategy import HeuristicStrategy, RandomStrategy
+
+
+def board_with_top_road(length: int) -> RandomBoard:
+    """Player 0 settled at (0, 0) with roads along the top edge to (0, length)"""
+    board = RandomBoard(STANDARD)
+    board.add_settlement(board.get_position((0, 0)), 0)
+    for col in range(length):
+        board.get_position((0, col)).build_road("right_road", 0)
+    return board
+
+
+def test_distances_on_the_standard_map():
+    board = RandomBoard(STANDARD)
+    distances = distance_table(board)
+    assert distances.shape == (54, 54)
+    assert (distances == distances.T).all()
+    assert (distances == 1).sum() == 2 * len(board.edges) == 144
+    assert distances.max() == 11
+    # the top edge of the map is a single zig-zag of roads
+    top = [board.get_position((0, col)).index for col in range(7)]
+    assert [distances[top[0], v] for v in top] == list(range(7))
+    # the corners of every hex lie on a six-cycle
+    for row in board.tiles:
+        for tile in row:
+            corners = [
+                pos.index for pos in board.vertices if tile in pos.adjacent_tiles
+            ]
+            assert len(corners) == 6
+            assert sorted(distances[u, v] for u, v in combinations(corners, 2)) == (
+                [1] * 6 + [2] * 6 + [3] * 3
+            )
+
+
+def test_own_roads_cost_nothing():
+    board = board_with_top_road(3)
+    steps = route(board, 0, (0, 5))
+    assert [(pos.pos, road_name) for pos, road_name in steps] == [
+        ((0, 3), "right_road"),
+        ((0, 4), "right_road"),
+    ]
+    # starting from the settlement alone, the built roads are walked for free
+    assert route(board, 0, (0, 5), [board.get_position((0, 0))]) == steps
+    assert route(board, 0, (0, 2)) == []
+
+
+def test_opponents_block_the_way():
+    board = board_with_top_road(3)
+    board.add_settlement(board.get_position((0, 4)), 1)
+    assert route(board, 0, (0, 4)) is None
+    steps = route(board, 0, (0, 5))
+    assert len(steps) > 2
+    for pos, road_name in steps:
+        assert pos.pos != (0, 4)
+        assert getattr(pos, road_name.removesuffix("_road")).pos != (0, 4)
+    # opponent roads block too, sealing off the settlement's only two ways out
+    board = RandomBoard(STANDARD)
+    board.add_settlement(board.get_position((0, 0)), 0)
+    board.get_position((0, 1)).build_road("left_road", 1)
+    board.get_position((1, 1)).build_road("up_road", 1)
+    assert route(board, 0, (0, 5)) is None
+    assert next_road(board, 0, (0, 5)) is None
+
+
+def test_routes_follow_new_pieces():
+    board = board_with_top_road(3)
+    assert len(route(board, 0, (0, 6))) == 3
+    board.get_position((0, 3)).build_road("right_road", 0)
+    assert len(route(board, 0, (0, 6))) == 2
+    # a settlement in the way sends the route around below it
+    board.add_settlement(board.get_position((0, 5)), 1)
+    steps = route(board, 0, (0, 6))
+    assert len(steps) == 4 and steps[0][0].pos == (0, 4)
+    assert all(pos.pos != (0, 5) for pos, _ in steps)
+
+
+@pytest.mark.parametrize("seed", ["a", "b"])
+def test_next_road_extends_the_network(seed):
+    game = perft_position((HeuristicStrategy, RandomStrategy, RandomStrategy), seed, 15)
+    board = game.board
+    for player in game.players:
+        network = road_network(board, player.player_id)
+        for target in board.vertices:
+            steps = route(board, player.player_id, target.pos)
+            # the cached search from the whole network finds the same roads as one stopped at the target
+            cost, parent = search(board, player.player_id, network, target.index)
+            assert (steps is None) == (cost[target.index] == len(cost))
+            road = next_road(board, player.player_id, target.pos)
+            if not steps:
+                assert road is None
+                continue
+            assert road == steps[0]
+            pos, road_name = road
+            assert pos in network
+            assert getattr(pos, road_name) is None
+            assert len(steps) == cost[target.index]
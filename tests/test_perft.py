@@ -0,0 +1,15 @@
+import pytest
+
+from batch.perft import ROLLS, Perft, perft_position
+from strategy import HeuristicStrategy, RandomStrategy
+
+LINEUP = (HeuristicStrategy, RandomStrategy, RandomStrategy)
+
+
+@pytest.mark.parametrize(
+    "factored, counts", [(False, [11, 124, 2927]), (True, [11, 142, 1786])]
+)
+def test_counts_from_a_seeded_position(factored, counts):
+    # a change to legal action generation that changes these should be deliberate
+    game = perft_position(LINEUP, "1", 12, factored=factored)
+    assert Perft(ROLLS, "1").run(game, 2) == counts
@@ -0,0 +1,25 @@
+import numpy as np
+
+from batch.selfplay import HEAD, TAIL, SharedRing
+
+
+def test_ring_wraps_around_in_order():
+    dtype = np.dtype([("game", np.int32), ("step", np.int16)])
+    ring = SharedRing(dtype, 8)
+    try:
+        records = np.zeros(30, dtype=dtype)
+        records["game"] = np.arange(30)
+        records["step"] = -np.arange(30)
+        out = []
+        # pushes of 5 against pops of 3 start at every offset of the ring
+        for i in range(0, 30, 5):
+            ring.push(records[i : i + 5])
+            while ring.header[HEAD] - ring.header[TAIL] > 3:
+                out.append(ring.pop(3))
+        ring.close()
+        while not ring.drained:
+            out.append(ring.pop(3))
+        assert (np.concatenate(out) == records).all()
+        assert ring.pop(3).size == 0
+    finally:
+        ring.release(unlink=True)
@@ -0,0 +1,42 @@
+import asyncio
+
+from remote.bot import play
+from remote.server import GameServer
+
+
+def first_policy(message: dict) -> dict:
+    """Deterministic bot, so only the server's dice and shuffles vary between games"""
+    kind = message["type"]
+    if kind == "discard":
+        discard, left = [0] * 5, message["count"]
+        for res, n in enumerate(message["resources"]):
+            discard[res] = min(n, left)
+            left -= discard[res]
+        return {"resources": discard}
+    if kind == "accepts_trade":
+        return {"accept": False}
+    return {"choice": min(1, len(message["options"]) - 1)}
+
+
+async def serve_games(path: str, concurrent: int) -> list[tuple]:
+    game_server = GameServer(
+        num_players=2,
+        timeout=5.0,
+        max_concurrent_games=concurrent,
+        max_games=4,
+        force_quit_after_round=40,
+        seed=7,
+    )
+    server = await game_server.start_unix(path)
+    serving = asyncio.create_task(game_server.serve(server))
+    bots = [await asyncio.open_unix_connection(path) for _ in range(4)]
+    await asyncio.gather(*[play(r, w, first_policy) for r, w in bots])
+    results = await serving
+    return sorted((r.winner, r.rounds, tuple(r.vps)) for r in results)
+
+
+def test_seeded_games_replay_under_concurrency(tmp_path):
+    one_at_a_time = asyncio.run(serve_games(str(tmp_path / "a.sock"), 1))
+    side_by_side = asyncio.run(serve_games(str(tmp_path / "b.sock"), 2))
+    assert len(one_at_a_time) == 4
+    assert side_by_side == one_at_a_time
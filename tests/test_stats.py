@@ -0,0 +1,55 @@
+import json
+import random
+
+from basic import GameResult
+from batch.stats import BatchStats, RunningStat
+
+
+def results(n: int, seed: int = 0) -> list[GameResult]:
+    rng = random.Random(seed)
+    games = []
+    for _ in range(n):
+        vps = [rng.randint(2, 10) for _ in range(3)]
+        winner = None if rng.random() < 0.1 else rng.randrange(3)
+        games.append(
+            GameResult(
+                ["Random", "Heuristic", "Random"],
+                winner,
+                rng.randint(10, 80),
+                vps,
+                rng.choice([None, 0, 1, 2]),
+                rng.choice([None, 0, 1, 2]),
+                winner is None,
+            )
+        )
+    return games
+
+
+def test_running_stat_merge_matches_a_single_pass():
+    xs = [random.Random(1).randint(0, 100) for _ in range(50)]
+    whole, left, right = RunningStat(), RunningStat(), RunningStat()
+    for i, x in enumerate(xs):
+        whole.add(x)
+        (left if i < 20 else right).add(x)
+    left.merge(right)
+    assert abs(left.mean - whole.mean) < 1e-9
+    assert abs(left.std - whole.std) < 1e-9
+
+
+def test_batch_stats_round_trip_through_json():
+    stats = BatchStats()
+    for result in results(40):
+        stats.add(result)
+    copy = BatchStats.from_dict(json.loads(json.dumps(stats.to_dict())))
+    assert copy.to_dict() == stats.to_dict()
+    assert copy.summary() == stats.summary()
+
+
+def test_merged_halves_match_the_whole_batch():
+    games = results(60, seed=2)
+    whole, left, right = BatchStats(), BatchStats(), BatchStats()
+    for i, result in enumerate(games):
+        whole.add(result)
+        (left if i % 2 else right).add(result)
+    left.merge(right)
+    assert left.summary() == whole.summary()
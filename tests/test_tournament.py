@@ -0,0 +1,92 @@
+import pytest
+
+from basic import GameResult
+from batch.tournament import Matchup, Tournament, play_game, wilson_interval
+from strategy import HeuristicStrategy, RandomStrategy
+
+
+def result(winner: int) -> GameResult:
+    return GameResult(["A", "B"], winner, 10, [10, 2], None, None, False)
+
+
+def test_wilson_interval_matches_reference_values():
+    low, high = wilson_interval(8, 10)
+    assert low == pytest.approx(0.4902, abs=1e-4)
+    assert high == pytest.approx(0.9433, abs=1e-4)
+    assert wilson_interval(0, 10)[0] == 0.0
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+
+
+def test_wilson_interval_is_symmetric_and_narrows():
+    low, high = wilson_interval(50, 100)
+    assert low + high == pytest.approx(1.0)
+    assert high - low > wilson_interval(500, 1000)[1] - wilson_interval(500, 1000)[0]
+
+
+def test_should_stop_waits_for_balanced_rotations():
+    tournament = Tournament(
+        [HeuristicStrategy, RandomStrategy], [2], min_games=2, half_width=1.0
+    )
+    matchup: Matchup = tournament.matchups[0]
+    # two games of the first rotation finished out of order, none of the second
+    matchup.record(0, result(0))
+    matchup.record(2, result(0))
+    assert not tournament.should_stop(matchup)
+    matchup.record(1, result(1))
+    assert not tournament.should_stop(matchup)
+    matchup.record(3, result(1))
+    assert tournament.should_stop(matchup)
+
+
+def small_tournament(checkpoint_dir=None) -> Tournament:
+    return Tournament(
+        [HeuristicStrategy, RandomStrategy],
+        [2],
+        seed=3,
+        min_games=3,
+        max_games=8,
+        half_width=1.0,
+        force_quit_after_round=150,
+        workers=2,
+        checkpoint_dir=checkpoint_dir,
+    )
+
+
+def test_checkpoint_round_trips(tmp_path):
+    tournament = small_tournament(str(tmp_path))
+    matchup = tournament.matchups[0]
+    matchup.games_started = 3
+    matchup.record(0, result(0))
+    matchup.fail(1, "ValueError()")
+    matchup.arrived[2] = result(1), None
+    tournament.save_checkpoint()
+    resumed = Tournament.resume(str(tmp_path), workers=1)
+    assert resumed.workers == 1
+    assert resumed.summary() == tournament.summary()
+    loaded = resumed.matchups[0]
+    assert loaded.lineup == matchup.lineup
+    assert loaded.completed == {0, 1}
+    assert loaded.failures == [(1, "ValueError()")]
+    assert loaded.arrived[2][0].winner == 1
+
+
+def test_resumed_run_matches_uninterrupted_run(tmp_path):
+    uninterrupted = small_tournament()
+    uninterrupted.run()
+    # stopped with games 0, 1 and 3 in flight and game 2 finished ahead of its turn
+    interrupted = small_tournament(str(tmp_path))
+    matchup = interrupted.matchups[0]
+    matchup.games_started = 4
+    matchup.arrived[2] = (
+        play_game(
+            matchup.seating(2),
+            interrupted.game_seed(matchup, 2),
+            interrupted.force_quit_after_round,
+        ),
+        None,
+    )
+    interrupted.save_checkpoint()
+    resumed = Tournament.resume(str(tmp_path))
+    resumed.run()
+    assert resumed.summary() == uninterrupted.summary()
+    assert resumed.matchups[0].games_played == uninterrupted.matchups[0].games_played
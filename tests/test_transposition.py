@@ -0,0 +1,42 @@
+from strategy.transposition import TranspositionTable
+
+
+def test_deeper_result_is_kept():
+    table = TranspositionTable(capacity=4, ways=4)
+    table.store(7, 1.0, depth=3, action=2)
+    table.store(7, 5.0, depth=1, action=0)
+    entry = table.lookup(7)
+    assert (float(entry["value"]), int(entry["depth"]), int(entry["action"])) == (
+        1.0,
+        3,
+        2,
+    )
+    assert table.lookup(7, min_depth=4) is None
+    table.store(7, 2.0, depth=3)
+    assert float(table.lookup(7)["value"]) == 2.0
+    assert len(table) == 1
+
+
+def test_full_bucket_evicts_older_searches_then_shallower_entries():
+    table = TranspositionTable(capacity=4, ways=4)
+    table.store(1, 0.0, depth=1)
+    table.store(2, 0.0, depth=5)
+    table.new_search()
+    table.store(3, 0.0, depth=0)
+    table.store(4, 0.0, depth=2)
+    table.store(5, 0.0, depth=1)
+    assert table.lookup(1) is None and table.lookup(3) is not None
+    # the deep entry from the last search goes before a shallow one from this search
+    table.store(6, 0.0, depth=1)
+    assert table.lookup(2) is None
+    # now everything is from this search, the shallowest goes
+    table.store(8, 0.0, depth=9)
+    assert table.lookup(3) is None
+    assert all(table.lookup(key) is not None for key in [4, 5, 6, 8])
+
+
+def test_zero_key_does_not_mark_an_empty_slot():
+    table = TranspositionTable(capacity=4, ways=4)
+    table.store(0, 3.0, depth=1)
+    assert len(table) == 1
+    assert float(table.lookup(0)["value"]) == 3.0
@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from batch.perft import perft_position
+from strategy import RandomStrategy, ValueStrategy
+from strategy.value import (
+    NUM_FEATURES,
+    LinearEvaluator,
+    MLPEvaluator,
+    batch_do,
+    evaluate_batch,
+    load_evaluator,
+)
+
+
+def features(n: int) -> np.ndarray:
+    return np.random.default_rng(0).random((n, NUM_FEATURES), dtype=np.float32)
+
+
+def test_linear_weights_load_and_score_like_a_matmul(tmp_path):
+    rng = np.random.default_rng(1)
+    weights = rng.normal(size=NUM_FEATURES).astype(np.float32)
+    np.savez(tmp_path / "linear.npz", weights=weights, bias=0.5)
+    evaluator = load_evaluator(str(tmp_path / "linear.npz"))
+    assert isinstance(evaluator, LinearEvaluator)
+    x = features(7)
+    assert np.allclose(evaluator(x), x @ weights + 0.5)
+
+
+def test_mlp_weights_load_and_score_like_matmuls(tmp_path):
+    rng = np.random.default_rng(2)
+    w0, b0 = rng.normal(size=(NUM_FEATURES, 8)), rng.normal(size=8)
+    w1, b1 = rng.normal(size=(8, 1)), rng.normal(size=1)
+    np.savez(tmp_path / "mlp.npz", w0=w0, b0=b0, w1=w1, b1=b1)
+    evaluator = load_evaluator(str(tmp_path / "mlp.npz"))
+    assert isinstance(evaluator, MLPEvaluator)
+    x = features(7)
+    expected = (np.maximum(x @ w0 + b0, 0) @ w1 + b1)[:, 0]
+    assert np.allclose(evaluator(x), expected, atol=1e-4)
+
+
+@pytest.mark.parametrize(
+    "arrays",
+    [
+        {"weights": np.zeros(NUM_FEATURES + 3)},
+        {"w0": np.zeros((NUM_FEATURES - 1, 4)), "b0": np.zeros(4)},
+    ],
+)
+def test_weights_of_another_width_are_rejected(tmp_path, arrays):
+    np.savez(tmp_path / "old.npz", **arrays)
+    with pytest.raises(ValueError, match="input features"):
+        load_evaluator(str(tmp_path / "old.npz"))
+
+
+def test_batch_scores_split_by_decision_point():
+    evaluator = LinearEvaluator(np.arange(NUM_FEATURES, dtype=np.float32))
+    matrices = [features(3), features(5)[2:], features(1)]
+    scores = evaluate_batch(evaluator, matrices)
+    assert [len(s) for s in scores] == [3, 3, 1]
+    for s, m in zip(scores, matrices):
+        assert np.allclose(s, evaluator(m))
+
+
+def games(weights: np.ndarray, seeds: list[str]):
+    positions = []
+    for seed in seeds:
+        game = perft_position((ValueStrategy, RandomStrategy), seed, 8)
+        player = game.players[0]
+        player.evaluator = LinearEvaluator(weights)
+        # enough cards that every kind of build and exchange is a candidate
+        player.add_resources(np.full(5, 4))
+        positions.append((player, game.board, game.stats))
+    return positions
+
+
+def test_score_is_the_weighted_sum_of_each_candidate():
+    weights = np.random.default_rng(3).normal(size=NUM_FEATURES).astype(np.float32)
+    for player, board, stats in games(weights, ["a", "b"]):
+        actions, scores = player.score(board, stats)
+        assert len(actions) > 1
+        expected = player.action_features(board, actions) @ weights
+        assert np.allclose(scores, expected, atol=1e-5)
+
+
+def test_batched_decisions_match_one_at_a_time():
+    weights = np.random.default_rng(4).normal(size=NUM_FEATURES).astype(np.float32)
+    positions = games(weights, ["a", "b", "c", "d"])
+    players, boards, stats = zip(*positions)
+    batched = batch_do(list(players), list(boards), list(stats))
+    single = [player.do(board, s) for player, board, s in positions]
+    assert [repr(a) for a in batched] == [repr(a) for a in single]